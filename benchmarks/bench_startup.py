@@ -0,0 +1,109 @@
+"""
+Время запуска среды: от старта интерпретатора до первой отрисовки окна.
+
+Каждый замер - отдельный процесс python, чтобы импорты не брались из уже
+загруженных модулей. Выводит медиану по этапам: импорт PyQt6, импорт
+tetete, создание MainWindow, первая отрисовка и достройка панелей после
+неё (пины, первая вкладка монитора порта). Цель - окно на экране быстрее
+TARGET_MS.
+
+С --imports вместо замеров печатает самые долгие импорты (python -X importtime).
+
+Запуск: python benchmarks/bench_startup.py [--runs N] [--imports]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TARGET_MS = 500
+
+# Выполняется в дочернем процессе; печатает отметки времени этапов в мс от старта интерпретатора
+CHILD = r'''
+import json, sys, time
+started = time.perf_counter()
+marks = {}
+def mark(name):
+    marks[name] = (time.perf_counter() - started) * 1000
+from PyQt6.QtCore import QEvent, QObject, QTimer
+from PyQt6.QtWidgets import QApplication
+app = QApplication(sys.argv)
+mark('import PyQt6')
+import tetete
+mark('import tetete')
+window = tetete.MainWindow()
+mark('MainWindow()')
+
+class FirstPaint(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint and 'first paint' not in marks:
+            mark('first paint')
+        return False
+
+first_paint = FirstPaint()
+window.installEventFilter(first_paint)
+
+def finish():
+    if 'first paint' not in marks or not window.serial_monitor.readers():
+        QTimer.singleShot(1, finish)
+        return
+    mark('panels')
+    window.serial_monitor.shutdown()
+    app.quit()
+
+window.show()
+QTimer.singleShot(0, finish)
+app.exec()
+print(json.dumps(marks))
+'''
+
+
+def run_once():
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', CHILD], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    total = (time.perf_counter() - start) * 1000
+    marks = json.loads(output.strip().splitlines()[-1])
+    # Запуск самого интерпретатора: всё, что прошло до первой строки дочернего скрипта
+    marks['interpreter'] = total - marks['panels']
+    return marks
+
+
+def show_imports(limit=15):
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import tetete'], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if line.startswith('import time:') and '|' in line and 'self [us]' not in line:
+            own, cumulative, name = line[len('import time:'):].split('|')
+            rows.append((int(cumulative), int(own), name.rstrip()))
+    rows.sort(reverse=True)
+    print(f"{'модуль':<40} {'всего, мс':>10} {'сам, мс':>10}")
+    for cumulative, own, name in rows[:limit]:
+        print(f"{name:<40} {cumulative / 1000:10.1f} {own / 1000:10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Время запуска среды")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--imports', action='store_true', help="самые долгие импорты вместо замеров")
+    args = parser.parse_args()
+    if args.imports:
+        show_imports()
+        return
+
+    runs = [run_once() for _ in range(args.runs)]
+    stages = ['interpreter', 'import PyQt6', 'import tetete', 'MainWindow()', 'first paint', 'panels']
+    width = max(len(stage) for stage in stages)
+    for stage in stages:
+        print(f"{stage:<{width}}  {statistics.median(run[stage] for run in runs):8.1f} ms")
+    shown = statistics.median(run['interpreter'] + run['first paint'] for run in runs)
+    verdict = "OK" if shown < TARGET_MS else "медленнее цели"
+    print(f"окно на экране через {shown:.1f} ms (цель {TARGET_MS} ms): {verdict}")
+
+
+if __name__ == '__main__':
+    main()
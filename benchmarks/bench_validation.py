@@ -0,0 +1,78 @@
+"""
+Микробенчмарки проверок полей блоков.
+
+Сравнивает стоимость одного вызова для прежней реализации (re.match со
+строковым шаблоном на каждый вызов), предкомпилированных шаблонов без кэша
+и итоговых функций из validation.py с кэшем вердиктов, а также пакетную
+проверку validate_names/validate_literals.
+
+Запуск: python benchmarks/bench_validation.py
+"""
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rudiron_ide import validation  # noqa: E402
+
+NAMES = ["variable", "2variable", "_variable", "int", "var_123", "i0", "counter", "led_state"]
+LITERALS = ["123", "-5", '"hello"', "abc", "+42", '"x', "0", "1000"]
+NUMBER = 200000
+
+
+def legacy_is_valid_integer(value):
+    return bool(re.match(r'^[+-]?\d+$', value))
+
+
+def legacy_is_valid_cpp_variable_name(name):
+    if name in validation.cpp_keywords:
+        return False
+    if re.match(r'^i\d+$', name):
+        return False
+    return bool(re.match(r'^[a-zA-Z_]\w*$', name))
+
+
+def precompiled_is_valid_integer(value):
+    return validation.INTEGER_PATTERN.fullmatch(value) is not None
+
+
+def precompiled_is_valid_cpp_variable_name(name):
+    if name in validation.cpp_keywords or validation.LOOP_COUNTER_PATTERN.fullmatch(name):
+        return False
+    return validation.IDENTIFIER_PATTERN.fullmatch(name) is not None
+
+
+def per_call_ns(function, values):
+    def run():
+        for value in values:
+            function(value)
+    seconds = timeit.timeit(run, number=NUMBER // len(values))
+    return seconds / NUMBER * 1e9
+
+
+def main():
+    rows = [
+        ("is_valid_integer: re.match(str)", per_call_ns(legacy_is_valid_integer, LITERALS)),
+        ("is_valid_integer: precompiled", per_call_ns(precompiled_is_valid_integer, LITERALS)),
+        ("is_valid_integer: memoized", per_call_ns(validation.is_valid_integer, LITERALS)),
+        ("is_valid_cpp_variable_name: re.match(str)", per_call_ns(legacy_is_valid_cpp_variable_name, NAMES)),
+        ("is_valid_cpp_variable_name: precompiled", per_call_ns(precompiled_is_valid_cpp_variable_name, NAMES)),
+        ("is_valid_cpp_variable_name: memoized", per_call_ns(validation.is_valid_cpp_variable_name, NAMES)),
+    ]
+    batch_names = NAMES * 1000
+    batch_literals = LITERALS * 1000
+    batch_number = 50
+    names_seconds = timeit.timeit(lambda: validation.validate_names(batch_names), number=batch_number)
+    literals_seconds = timeit.timeit(lambda: validation.validate_literals(batch_literals), number=batch_number)
+    rows.append(("validate_names (per name)", names_seconds / (batch_number * len(batch_names)) * 1e9))
+    rows.append(("validate_literals (per literal)", literals_seconds / (batch_number * len(batch_literals)) * 1e9))
+
+    width = max(len(name) for name, _ in rows)
+    for name, ns in rows:
+        print(f"{name:<{width}}  {ns:8.1f} ns/call")
+
+
+if __name__ == '__main__':
+    main()
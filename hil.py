@@ -0,0 +1,11 @@
+"""
+Запуск автоматической проверки программы (см. rudiron_ide.hil).
+
+    python hil.py program.json tests.json --target pty
+"""
+import sys
+
+from rudiron_ide.hil import main
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Среда программирования платы Рудирон блоками.
+
+Модули пакета:
+
+    model       блоки на холсте (QGraphicsItem) и сборка цепочек из JSON
+    gui         рабочая область, панели и главное окно
+    serial      монитор последовательного порта
+    uploader    сохранение скетча и прошивка через arduino-cli
+    codegen     генерация скетча Arduino
+    validation  проверки имён, литералов и типов
+    analyzer, program, simulator, timing, pins, boards, ... - без Qt
+
+Сам пакет и модули без Qt можно импортировать в скриптах без PyQt6:
+программа читается из JSON, который сохраняет кнопка "Сохранить
+программу", проверяется тем же анализатором, что и в среде, и
+превращается в скетч тем же генератором.
+
+    import rudiron_ide
+
+    start = rudiron_ide.load_program('program.json')
+    text = rudiron_ide.generate_sketch(start)
+    rudiron_ide.upload(rudiron_ide.write_sketch(text), 'COM3')
+
+Имена из __all__ - стабильный интерфейс; внутреннее устройство модулей
+может меняться вместе со средой.
+"""
+import json
+import os
+
+from .analyzer import ERROR, Diagnostic, analyze_program
+from .codegen import GenerationError, generate_sketch as render_sketch
+from .program import chain_from_data, chain_to_data
+from .uploader import upload_to_board, write_sketch
+
+__all__ = ['ProgramError', 'load_program', 'save_program', 'check_program', 'generate_sketch', 'write_sketch',
+           'upload']
+
+
+class ProgramError(ValueError):
+    """Программа с ошибками; diagnostics - все найденные ошибки и предупреждения."""
+
+    def __init__(self, diagnostics):
+        self.diagnostics = diagnostics
+        errors = [f"{diagnostic.block.text}: {diagnostic.message}"
+                  for diagnostic in diagnostics if diagnostic.severity == ERROR]
+        super().__init__("Ошибки в программе:\n" + "\n".join(errors))
+
+
+def load_program(path):
+    """Прочитать программу из JSON; возвращает первый блок (обычно "Начало") или None."""
+    with open(path, encoding='utf-8') as file:
+        return chain_from_data(json.load(file))
+
+
+def save_program(start_block, path):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(chain_to_data(start_block), file, ensure_ascii=False, indent=2)
+
+
+def check_program(start_block):
+    """Проанализировать программу; возвращает Analysis (ok, diagnostics)."""
+    return analyze_program(start_block)
+
+
+def generate_sketch(start_block, manual_modes=None, fast_io=False):
+    """
+    Текст скетча .ino для программы.
+
+    manual_modes - режимы пинов, как на панели ПИНов (пин -> INPUT/OUTPUT).
+    Если в программе есть ошибки, бросает ProgramError.
+    """
+    analysis = analyze_program(start_block)
+    if not analysis.ok:
+        raise ProgramError(analysis.diagnostics)
+    try:
+        text, _ = render_sketch(start_block, analysis, manual_modes, fast_io=fast_io)
+    except GenerationError as e:
+        raise ProgramError(analysis.diagnostics + [Diagnostic(e.block, None, str(e))]) from e
+    return text
+
+
+def upload(sketch_path, port):
+    """Скомпилировать и прошить скетч через arduino-cli; возвращает True, если плата прошита."""
+    return bool(upload_to_board(port, os.path.abspath(sketch_path)))
@@ -0,0 +1,761 @@
+import heapq
+
+from .boards import DEFAULT_BOARD, MIN_TIMER_PERIOD_US
+from .validation import (
+    ARRAY, ARRAY_TYPES, AUTO_TYPE, BOOL, C_TYPES, FLOAT, FUNCTION, INT, NUMERIC, STRING, is_valid_analog_pin,
+    is_valid_cpp_variable_name, is_valid_integer, literal_type, parse_parameter, split_list,
+)
+
+
+class Symbol:
+    def __init__(self, name, type, block, ctype=None, size=None, params=None):
+        self.name = name
+        self.type = type  # INT, FLOAT, BOOL, STRING, ARRAY или FUNCTION
+        self.block = block  # Блок, в котором объявлена переменная
+        # CType, выбранный в блоке (для массива - тип элемента, для функции - тип результата),
+        # или None для "авто" и функции без результата
+        self.ctype = ctype
+        self.size = size  # длина массива
+        self.params = params  # параметры функции (Symbol)
+
+    def signature(self):
+        """То, от чего зависят использующие символ блоки: если не изменилось, их можно не перепроверять."""
+        params = tuple((param.name, param.ctype) for param in self.params) if self.params is not None else None
+        return self.name, self.type, self.ctype, self.size, params
+
+
+class SymbolTable:
+    """Таблица символов с вложенными областями видимости."""
+
+    def __init__(self):
+        self.scopes = [{}]
+
+    def push_scope(self):
+        self.scopes.append({})
+
+    def pop_scope(self):
+        self.scopes.pop()
+
+    def declare(self, name, type, block, ctype=None, size=None, params=None):
+        symbol = Symbol(name, type, block, ctype, size, params)
+        self.scopes[-1][name] = symbol
+        return symbol
+
+    def resolve(self, name):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+
+ERROR = "error"
+WARNING = "warning"
+
+# Блоки, которые записывают результат в переменную, и поле с её именем
+WRITE_TARGETS = {'Арифметика': 'text_field1', 'ЦЧтение': 'text_field1', 'АЧтение': 'text_field1', 'Слушай': 'text_field',
+                 'Из массива': 'text_field1', 'Пришла строка': 'text_field2', 'Пришло число': 'text_field2',
+                 'Вызов': 'text_field2'}
+
+# Диапазон значений, которые возвращают блоки чтения (Serial.read() даёт -1, если данных нет)
+READ_RANGES = {'ЦЧтение': (0, 1), 'АЧтение': (0, 1023), 'Слушай': (-1, 255), 'Оцифровка': (0, 1023)}
+
+# Массивы больше этого размера заметно съедают ОЗУ (у MDR32F9Q2 всего 32 КБ)
+ARRAY_RAM_WARNING = 8 * 1024
+
+# Одно преобразование АЦП (analogRead) занимает около 15 мкс
+MAX_SAMPLE_RATE = 50000
+
+# Блоки, которым не место в обработчике прерывания: ждут или работают с последовательным портом
+# Вызов тоже: тело функции может делать что угодно из этого
+NOT_IN_INTERRUPT = {'Сон', 'Слушай', 'Говори', 'Оцифровка', 'Отправить массив', 'Пришла строка', 'Пришло число',
+                    'Вызов'}
+
+# Имена, которые уже заняты функциями скетча
+RESERVED_FUNCTIONS = frozenset(('setup', 'loop'))
+
+
+def enclosing(info, text):
+    """BlockInfo ближайшего объемлющего блока с надписью text или None."""
+    parent = info.parent
+    while parent is not None and parent.block.text != text:
+        parent = parent.parent
+    return parent
+
+# Диапазон переменной "авто" с целым значением: это int
+AUTO_INT = C_TYPES['int32_t']
+
+
+def value_range(symbol):
+    """Диапазон значений целочисленной переменной или None, если он не ограничен."""
+    if symbol.ctype is not None:
+        return (symbol.ctype.min, symbol.ctype.max) if symbol.ctype.min is not None else None
+    if symbol.type == INT:
+        return AUTO_INT.min, AUTO_INT.max
+    if symbol.type == BOOL:
+        return 0, 1
+    return None
+
+
+class Diagnostic:
+    """
+    Ошибка или предупреждение: блок, поле ввода (имя виджета или None для всего блока) и сообщение.
+
+    Предупреждения не мешают генерации скетча.
+    """
+
+    def __init__(self, block, field, message, severity=ERROR):
+        self.block = block
+        self.field = field
+        self.message = message
+        self.severity = severity
+
+
+class BlockInfo:
+    """Результат анализа одного блока: значения полей и их типы."""
+
+    def __init__(self, block, fields, index, prev=None, parent=None):
+        self.block = block
+        self.index = index  # порядковый номер блока при обходе программы
+        self.prev = prev  # BlockInfo предыдущего блока в той же цепочке
+        self.parent = parent  # BlockInfo управляющего блока, в теле которого находится блок
+        self.reset(fields)
+
+    def reset(self, fields):
+        self.fields = fields
+        self.types = {}  # имя поля -> INT, FLOAT, BOOL, STRING или None
+        self.declares = None  # Symbol, если блок объявляет переменную
+        self.params = []  # Symbol параметров, которые видны в теле блока (у функции)
+        self.arguments = []  # у вызова: Symbol переменной для каждого аргумента или None для литерала
+        self.uses = {}  # имя поля -> Symbol использованной переменной
+        self.diagnostics = []
+
+
+class Analysis:
+    """Результаты одного прохода анализа по всей программе."""
+
+    def __init__(self):
+        self.blocks = {}  # блок -> BlockInfo, в порядке обхода
+        self.references = {}  # текст поля -> блоки, в полях которых он встречается
+        self.program_loop = None  # блок "Цикл программы", если он есть
+        self.timers = []  # блоки "Таймер" в порядке обхода; индекс - номер свободного таймера платы
+        self.functions = {}  # блок "Функция" -> Symbol объявленной функции
+
+    def __getitem__(self, block):
+        return self.blocks[block]
+
+    def __contains__(self, block):
+        return block in self.blocks
+
+    @property
+    def diagnostics(self):
+        """Все ошибки в порядке обхода программы."""
+        return [diagnostic for info in self.blocks.values() for diagnostic in info.diagnostics]
+
+    @property
+    def ok(self):
+        return not any(diagnostic.severity == ERROR
+                       for info in self.blocks.values() for diagnostic in info.diagnostics)
+
+    def add_references(self, info):
+        for text in info.fields.values():
+            for name in reference_names(text):
+                self.references.setdefault(name, set()).add(info.block)
+
+    def remove_references(self, info):
+        for text in info.fields.values():
+            for name in reference_names(text):
+                self.references.get(name, set()).discard(info.block)
+
+
+def reference_names(text):
+    """Текст поля и, для списков через запятую (аргументы, параметры), каждое имя из списка."""
+    names = {text}
+    for part in text.split(','):
+        words = part.split()
+        if words:
+            names.add(words[-1])
+    return names
+
+
+class Analyzer:
+    """
+    Однопроходный семантический анализ программы.
+
+    Обходит цепочку блоков от блока "Начало", разрешает имена переменных
+    с учётом областей видимости (тело условия, цикла или функции - отдельная область)
+    и один раз вычисляет типы всех полей. Генерация кода и проверки затем
+    пользуются сохранёнными результатами.
+    """
+
+    def __init__(self):
+        self.symbols = SymbolTable()
+        self.analysis = Analysis()
+        self.handlers = {
+            'Переменные': self.analyze_variable,
+            'Арифметика': self.analyze_arithmetic,
+            'Сон': self.analyze_delay,
+            'Условие': self.analyze_condition,
+            'Повтор': self.analyze_for_cycle,
+            'Цикл': self.analyze_while_cycle,
+            'Цикл программы': self.analyze_program_loop,
+            'ЦЧтение': self.analyze_read,
+            'АЧтение': self.analyze_read,
+            'ЦЗапись': self.analyze_digital_write,
+            'АЗапись': self.analyze_analog_write,
+            'Слушай': self.analyze_serial_read,
+            'Говори': self.analyze_serial_write,
+            'Массив': self.analyze_array,
+            'Из массива': self.analyze_array_get,
+            'В массив': self.analyze_array_set,
+            'Оцифровка': self.analyze_sample,
+            'Отправить массив': self.analyze_bulk_write,
+            'Каждые': self.analyze_every,
+            'Таймер': self.analyze_timer,
+            'Пришла строка': self.analyze_line_input,
+            'Пришло число': self.analyze_number_input,
+            'Функция': self.analyze_function,
+            'Вернуть': self.analyze_return,
+            'Вызов': self.analyze_call,
+        }
+
+    def run(self, start_block):
+        self.analyze_chain(start_block)
+        return self.analysis
+
+    def analyze_chain(self, block, parent=None):
+        prev = None
+        while block is not None:
+            info = BlockInfo(block, block.fields(), len(self.analysis.blocks), prev, parent)
+            self.analysis.blocks[block] = info
+            self.analysis.add_references(info)
+            self.analyze_block(info)
+            self.analyze_body(info)
+            prev = info
+            block = block.next_block
+
+    def analyze_block(self, info):
+        handler = self.handlers.get(info.block.text)
+        if handler is not None:
+            handler(info)
+        if enclosing(info, 'Таймер') is None:
+            return
+        if info.block.text in NOT_IN_INTERRUPT:
+            self.fail(info, None, f"Блок '{info.block.text}' нельзя ставить внутрь 'Таймер': "
+                                  f"обработчик прерывания должен выполняться мгновенно!")
+        for field, symbol in info.uses.items():
+            if symbol.type == STRING:
+                self.fail(info, field, "Строки нельзя использовать внутри 'Таймер': они выделяют память!")
+
+    def analyze_body(self, info):
+        child_blocks = getattr(info.block, 'child_blocks', [])
+        if not child_blocks:
+            return
+        self.symbols.push_scope()
+        for param in info.params:
+            self.symbols.scopes[-1][param.name] = param
+        self.analyze_chain(child_blocks[0], info)
+        self.symbols.pop_scope()
+
+    def symbols_before(self, info):
+        """Восстановить таблицу символов в точке перед блоком по сохранённым объявлениям."""
+        scopes = []
+        current = info
+        while current is not None:
+            scope = {}
+            if current is not info and current.declares is not None:
+                # Управляющий блок (функция) объявлен до своего тела: из тела видно его имя
+                scope[current.declares.name] = current.declares
+            prev = current.prev
+            while prev is not None:
+                # Идём назад, поэтому более раннее объявление перезаписывает позднее
+                if prev.declares is not None:
+                    scope[prev.declares.name] = prev.declares
+                prev = prev.prev
+            if current.parent is not None:
+                # Параметры функции объявлены раньше всего её тела
+                for param in current.parent.params:
+                    scope[param.name] = param
+            scopes.append(scope)
+            current = current.parent
+        symbols = SymbolTable()
+        symbols.scopes = list(reversed(scopes)) + [{}]
+        return symbols
+
+    def update_blocks(self, blocks):
+        """
+        Перепроверить блоки с изменёнными полями и зависящие от них.
+
+        Зависимые блоки - те, что ссылаются на имя переменной, объявление которой
+        изменилось. Блоки обрабатываются в порядке обхода программы, поэтому
+        каждый перепроверяется не более одного раза. Возвращает множество
+        перепроверенных блоков.
+        """
+        queue = []
+        for block in blocks:
+            if block in self.analysis:
+                heapq.heappush(queue, (self.analysis[block].index, id(block), block))
+        checked = set()
+        while queue:
+            index, _, block = heapq.heappop(queue)
+            if block in checked:
+                continue
+            checked.add(block)
+            info = self.analysis[block]
+            old_declares = info.declares
+            old_params = info.params
+            self.analysis.remove_references(info)
+            info.reset(block.fields())
+            self.analysis.add_references(info)
+            self.symbols = self.symbols_before(info)
+            self.analyze_block(info)
+
+            new_declares = info.declares
+            if old_declares is not None and new_declares is not None and \
+                    old_declares.signature() == new_declares.signature():
+                # Объявление не изменилось - зависимые блоки перепроверять не нужно
+                info.declares = old_declares
+                info.params = old_params
+                continue
+            names = {symbol.name for symbol in (old_declares, new_declares) if symbol is not None}
+            names.update(param.name for param in old_params + info.params)
+            if block.text == 'Функция':
+                # Тело функции зависит от её параметров и типа результата
+                for dependent in self.analysis.blocks.values():
+                    if dependent.index > index and enclosing(dependent, 'Функция') is info:
+                        heapq.heappush(queue, (dependent.index, id(dependent.block), dependent.block))
+            for name in names:
+                for dependent in self.analysis.references.get(name, ()):
+                    if self.analysis[dependent].index > index:
+                        heapq.heappush(queue, (self.analysis[dependent].index, id(dependent), dependent))
+        return checked
+
+    def fail(self, info, field, message):
+        info.diagnostics.append(Diagnostic(info.block, field, message))
+
+    def warn(self, info, field, message):
+        info.diagnostics.append(Diagnostic(info.block, field, message, WARNING))
+
+    def operand_type(self, info, field):
+        """Тип операнда: литерал или переменная (с учётом области видимости)."""
+        text = info.fields.get(field, '')
+        type = literal_type(text)
+        if type is None:
+            symbol = self.symbols.resolve(text)
+            if symbol is not None:
+                info.uses[field] = symbol
+            type = symbol.type if symbol is not None else None
+        info.types[field] = type
+        return type
+
+    def variable(self, info, field):
+        """Объявленная переменная, в которую блок записывает результат."""
+        symbol = self.symbols.resolve(info.fields.get(field, ''))
+        if symbol is not None:
+            info.uses[field] = symbol
+            info.types[field] = symbol.type
+        return symbol
+
+    def array(self, info, field):
+        """Объявленный массив, с которым работает блок."""
+        symbol = self.variable(info, field)
+        if symbol is None or symbol.type != ARRAY:
+            self.fail(info, field, f"'{info.fields.get(field, '')}' не является объявленным массивом!")
+            return None
+        return symbol
+
+    def check_index(self, info, field, array):
+        text = info.fields.get(field, '')
+        if self.operand_type(info, field) != INT:
+            self.fail(info, field, "Индекс массива должен быть целым числом или переменной!")
+        elif is_valid_integer(text) and array is not None and not 0 <= int(text) < array.size:
+            self.fail(info, field, f"Индекс {text} вне массива '{array.name}' (0..{array.size - 1})!")
+
+    def check_pin(self, info, field):
+        text = info.fields.get(field, '')
+        if is_valid_integer(text):
+            info.types[field] = INT
+            return is_valid_analog_pin(int(text))
+        return self.operand_type(info, field) == INT
+
+    def check_assignment(self, info, field, ctype, type):
+        """Можно ли записать значение поля (типа type) в переменную типа ctype."""
+        text = info.fields.get(field, '')
+        if ctype.kind == STRING:
+            if type != STRING:
+                self.fail(info, field, "Переменной типа String можно присвоить только строку или строковую переменную!")
+            return
+        if type not in NUMERIC:
+            self.fail(info, field, f"Переменной типа {ctype.name} можно присвоить только число или числовую переменную!")
+        elif type == FLOAT and ctype.kind != FLOAT:
+            self.fail(info, field, f"Дробное значение нельзя присвоить переменной типа {ctype.name}: выберите float!")
+        elif is_valid_integer(text):
+            if not ctype.fits(int(text)):
+                self.fail(info, field, f"Значение {text} не помещается в тип {ctype.name} ({ctype.min}..{ctype.max})!")
+        elif field in info.uses:
+            self.check_narrowing(info, field, ctype, value_range(info.uses[field]), f"Значение переменной '{text}'")
+
+    def check_narrowing(self, info, field, ctype, source_range, source):
+        # Сужение типа допустимо в C++, но значение может обрезаться
+        if ctype.min is None or source_range is None:
+            return
+        if source_range[0] < ctype.min or source_range[1] > ctype.max:
+            self.warn(info, field, f"{source} может не поместиться в тип {ctype.name} ({ctype.min}..{ctype.max})")
+
+    def check_new_name(self, info, field):
+        """Проверить имя объявляемой переменной или массива."""
+        name = info.fields[field]
+        if name == "" or not is_valid_cpp_variable_name(name):
+            self.fail(info, field, f"Название переменной '{name}' некорректно!")
+            return False
+        if self.symbols.resolve(name) is not None:
+            self.fail(info, field, f"Переменная '{name}' объявлена несколько раз!")
+            return False
+        return True
+
+    def analyze_variable(self, info):
+        name = info.fields['text_field1']
+        valid_name = self.check_new_name(info, 'text_field1')
+        ctype = C_TYPES.get(info.fields.get('combo_box', AUTO_TYPE))
+        type = self.operand_type(info, 'text_field2')
+        if type in (None, FUNCTION) or (type == ARRAY and ctype is None):
+            self.fail(info, 'text_field2',
+                      f"Значение переменной '{name}' должно быть числом, true/false, переменной или строкой из латинских символов!")
+        elif ctype is not None:
+            self.check_assignment(info, 'text_field2', ctype, type)
+        elif 'text_field2' in info.uses:
+            # auto копирует тип переменной-источника
+            ctype = info.uses['text_field2'].ctype
+        if valid_name:
+            # Объявляем даже при ошибке в значении, чтобы не плодить ошибки в местах использования
+            type = ctype.kind if ctype is not None else type if type not in (None, ARRAY, FUNCTION) else INT
+            info.declares = self.symbols.declare(name, type, info.block, ctype)
+
+    def analyze_arithmetic(self, info):
+        target = self.variable(info, 'text_field1')
+        if target is None:
+            self.fail(info, 'text_field1', f"Переменная {info.fields['text_field1']} не объявлена!")
+        elif target.type not in NUMERIC:
+            self.fail(info, 'text_field1', f"Переменная {target.name} должна быть числовой!")
+        left = self.operand_type(info, 'text_field2')
+        right = self.operand_type(info, 'text_field3')
+        if left not in NUMERIC:
+            self.fail(info, 'text_field2', "Значение левого операнда должно быть числом или числовой переменной!")
+        if right not in NUMERIC:
+            self.fail(info, 'text_field3', "Значение правого операнда должно быть числом или числовой переменной!")
+        if FLOAT not in (left, right):
+            return
+        if info.fields.get('combo_box') == '%':
+            self.fail(info, 'combo_box', "Остаток от деления определён только для целых чисел!")
+        elif target is not None and target.type in (INT, BOOL):
+            self.fail(info, 'text_field1',
+                      f"Результат с дробными числами нельзя записать в целочисленную переменную {target.name}!")
+
+    def analyze_delay(self, info):
+        if self.operand_type(info, 'text_field') != INT:
+            self.fail(info, 'text_field', "Продолжительность сна должна быть целым числом или переменной!")
+        if enclosing(info, 'Каждые') is not None:
+            self.warn(info, None, "Сон внутри 'Каждые' задерживает все остальные задачи: "
+                                  "для паузы лучше поставить ещё один блок 'Каждые'")
+
+    def analyze_comparison(self, info, operands_message, types_message):
+        # Массив целиком сравнивать нельзя - только его элементы
+        left = self.operand_type(info, 'text_field')
+        left = None if left in (ARRAY, FUNCTION) else left
+        right = self.operand_type(info, 'text_field2')
+        right = None if right in (ARRAY, FUNCTION) else right
+        if left is None:
+            self.fail(info, 'text_field', operands_message)
+        if right is None:
+            self.fail(info, 'text_field2', operands_message)
+        if left is not None and right is not None and left != right and not {left, right} <= NUMERIC:
+            self.fail(info, 'text_field2', types_message)
+
+    def analyze_condition(self, info):
+        self.analyze_comparison(info, "Условия применимы только для переменных, целых чисел и строк!",
+                                "Оба операнда условия должны быть одного типа!")
+
+    def analyze_for_cycle(self, info):
+        if self.operand_type(info, 'text_field2') != INT:
+            self.fail(info, 'text_field2', "Количеством повторов должно быть целое число или переменная!")
+
+    def analyze_while_cycle(self, info):
+        self.analyze_comparison(info, "Циклы с условием применимы только для переменных, целых чисел и строк!",
+                                "Оба операнда цикла с условием должны быть одного типа!")
+
+    def analyze_program_loop(self, info):
+        if info.parent is not None:
+            self.fail(info, None, "Блок 'Цикл программы' можно ставить только в основную программу, не внутрь других блоков!")
+        elif self.analysis.program_loop not in (None, info.block):
+            self.fail(info, None, "В программе может быть только один блок 'Цикл программы'!")
+        else:
+            self.analysis.program_loop = info.block
+        if info.block.next_block is not None:
+            self.fail(info, None, "Блок 'Цикл программы' должен быть последним: после него программа не продолжается!")
+
+    def analyze_read(self, info):
+        if info.block.text == 'ЦЧтение':
+            target_message = "Необходимо указать корректную переменную для записи результата цифрового чтения!"
+            pin_message = "Необходимо указать корректный цифровой пин для чтения!"
+        else:
+            target_message = "Необходимо указать корректную переменную для записи результата аналогового чтения!"
+            pin_message = "Необходимо указать корректный аналоговый пин для чтения!"
+        target = self.variable(info, 'text_field1')
+        if target is None or target.type not in ((INT, BOOL) if info.block.text == 'ЦЧтение' else (INT,)):
+            self.fail(info, 'text_field1', target_message)
+        else:
+            self.check_read_range(info, 'text_field1', target)
+        if not self.check_pin(info, 'text_field2'):
+            self.fail(info, 'text_field2', pin_message)
+
+    def analyze_digital_write(self, info):
+        if not self.check_pin(info, 'text_field'):
+            self.fail(info, 'text_field', "Необходимо указать корректный цифровой пин для записи!")
+
+    def analyze_analog_write(self, info):
+        if not self.check_pin(info, 'text_field1'):
+            self.fail(info, 'text_field1', "Необходимо указать корректный аналоговый пин для записи!")
+        if self.operand_type(info, 'text_field2') != INT:
+            self.fail(info, 'text_field2', "Значение для аналоговой записи должно быть целым числом или переменной!")
+
+    def analyze_serial_read(self, info):
+        target = self.variable(info, 'text_field')
+        if target is None or target.type != INT:
+            self.fail(info, 'text_field',
+                      "Необходимо указать корректную переменную для записи результата чтения серийного порта!")
+        else:
+            self.check_read_range(info, 'text_field', target)
+
+    def check_read_range(self, info, field, target):
+        if target.ctype is not None:
+            self.check_narrowing(info, field, target.ctype, READ_RANGES[info.block.text], "Результат чтения")
+
+    def analyze_array(self, info):
+        name = info.fields['text_field1']
+        valid_name = self.check_new_name(info, 'text_field1')
+        ctype = C_TYPES[info.fields.get('combo_box', ARRAY_TYPES[0])]
+        text = info.fields.get('text_field2', '')
+        # Размер массива в C++ должен быть известен при компиляции
+        size = int(text) if is_valid_integer(text) else 0
+        info.types['text_field2'] = INT if is_valid_integer(text) else None
+        if size <= 0:
+            self.fail(info, 'text_field2', "Размер массива должен быть положительным целым числом!")
+        elif ctype.size * size > ARRAY_RAM_WARNING:
+            self.warn(info, 'text_field2',
+                      f"Массив '{name}' займёт {ctype.size * size} байт ОЗУ: памяти контроллера может не хватить")
+        if valid_name:
+            info.declares = self.symbols.declare(name, ARRAY, info.block, ctype, max(size, 1))
+
+    def analyze_array_get(self, info):
+        target = self.variable(info, 'text_field1')
+        array = self.array(info, 'text_field2')
+        self.check_index(info, 'text_field3', array)
+        if target is None or target.type not in NUMERIC:
+            self.fail(info, 'text_field1', "Необходимо указать числовую переменную для записи элемента массива!")
+        elif array is not None and array.ctype.kind == FLOAT and target.type != FLOAT:
+            self.fail(info, 'text_field1',
+                      f"Дробный элемент массива нельзя записать в целочисленную переменную {target.name}!")
+        elif array is not None and target.ctype is not None:
+            self.check_narrowing(info, 'text_field1', target.ctype, (array.ctype.min, array.ctype.max)
+                                 if array.ctype.min is not None else None, "Элемент массива")
+
+    def analyze_array_set(self, info):
+        array = self.array(info, 'text_field1')
+        self.check_index(info, 'text_field2', array)
+        type = self.operand_type(info, 'text_field3')
+        if type is None:
+            self.fail(info, 'text_field3', "Значение элемента должно быть числом или переменной!")
+        elif array is not None:
+            self.check_assignment(info, 'text_field3', array.ctype, type)
+
+    def analyze_sample(self, info):
+        array = self.array(info, 'text_field1')
+        if array is not None:
+            self.check_narrowing(info, 'text_field1', array.ctype, READ_RANGES['Оцифровка'], "Результат чтения")
+        if not self.check_pin(info, 'text_field2'):
+            self.fail(info, 'text_field2', "Необходимо указать корректный аналоговый пин для чтения!")
+        text = info.fields.get('text_field3', '')
+        if self.operand_type(info, 'text_field3') != INT:
+            self.fail(info, 'text_field3', "Частота оцифровки должна быть целым числом (Гц) или переменной!")
+        elif is_valid_integer(text) and int(text) <= 0:
+            self.fail(info, 'text_field3', "Частота оцифровки должна быть больше нуля!")
+        elif is_valid_integer(text) and int(text) > MAX_SAMPLE_RATE:
+            self.warn(info, 'text_field3', f"АЦП не успеет: больше {MAX_SAMPLE_RATE} отсчётов в секунду не получится")
+
+    def analyze_bulk_write(self, info):
+        self.array(info, 'text_field')
+
+    def analyze_line_input(self, info):
+        target = self.variable(info, 'text_field2')
+        # В const char* (тип "авто" для строки) нельзя скопировать принятый текст
+        if target is None or target.ctype is None or target.ctype.name != 'String':
+            self.fail(info, 'text_field2', "Строку можно принять только в объявленную переменную типа String!")
+
+    def analyze_number_input(self, info):
+        target = self.variable(info, 'text_field2')
+        if target is None or target.type not in (INT, FLOAT):
+            self.fail(info, 'text_field2', "Число можно принять только в объявленную числовую переменную!")
+
+    def analyze_every(self, info):
+        text = info.fields.get('text_field2', '')
+        if self.operand_type(info, 'text_field2') != INT:
+            self.fail(info, 'text_field2', "Период должен быть целым числом (мс) или переменной!")
+        elif is_valid_integer(text) and int(text) <= 0:
+            self.fail(info, 'text_field2', "Период должен быть больше нуля!")
+        if enclosing(info, 'Цикл программы') is None:
+            self.fail(info, None, "Блок 'Каждые' работает только внутри блока 'Цикл программы'!")
+
+    def analyze_timer(self, info):
+        board = DEFAULT_BOARD
+        text = info.fields.get('text_field2', '')
+        # Период нужен при генерации: из него вычисляются настройки регистров таймера
+        info.types['text_field2'] = INT if is_valid_integer(text) else None
+        if not is_valid_integer(text) or not MIN_TIMER_PERIOD_US <= int(text) <= board.max_timer_period_us:
+            self.fail(info, 'text_field2', f"Период таймера должен быть целым числом от {MIN_TIMER_PERIOD_US} "
+                                           f"до {board.max_timer_period_us} мкс!")
+        if info.parent is not None:
+            self.fail(info, None, "Блок 'Таймер' можно ставить только в основную программу, не внутрь других блоков!")
+            return
+        if info.block not in self.analysis.timers:
+            self.analysis.timers.append(info.block)
+        if self.analysis.timers.index(info.block) >= len(board.timers):
+            self.fail(info, None, f"На плате свободно только {len(board.timers)} аппаратных таймера!")
+
+    def analyze_serial_write(self, info):
+        type = self.operand_type(info, 'text_field')
+        if type in (None, ARRAY, FUNCTION) or (type == STRING and 'text_field' not in info.uses):
+            self.fail(info, 'text_field', "Записать в последовательный порт можно только число или значение переменной!")
+
+    def analyze_function(self, info):
+        name = info.fields.get('text_field', '')
+        ctype = C_TYPES.get(info.fields.get('combo_box', ''))
+        if info.parent is not None:
+            self.fail(info, None, "Блок 'Функция' можно ставить только в основную программу, не внутрь других блоков!")
+        params = []
+        for text in split_list(info.fields.get('text_field1', '')):
+            type_name, param = parse_parameter(text)
+            if type_name not in C_TYPES:
+                self.fail(info, 'text_field1', f"Параметр '{text}' нужно записать как 'тип имя' или 'имя' "
+                                               f"(тип: {', '.join(C_TYPES)})!")
+            elif not is_valid_cpp_variable_name(param):
+                self.fail(info, 'text_field1', f"Название параметра '{param}' некорректно!")
+            elif any(symbol.name == param for symbol in params):
+                self.fail(info, 'text_field1', f"Параметр '{param}' указан несколько раз!")
+            else:
+                params.append(Symbol(param, C_TYPES[type_name].kind, info.block, C_TYPES[type_name]))
+        info.params = params
+        if ctype is not None:
+            child_blocks = getattr(info.block, 'child_blocks', [])
+            if not child_blocks or child_blocks[-1].text != 'Вернуть':
+                self.warn(info, None, f"Функция '{name}' должна вернуть {ctype.name}: "
+                                      f"поставьте в конец её тела блок 'Вернуть'")
+        if not is_valid_cpp_variable_name(name) or name in RESERVED_FUNCTIONS:
+            self.fail(info, 'text_field', f"Название функции '{name}' некорректно!")
+        elif self.symbols.resolve(name) is not None:
+            self.fail(info, 'text_field', f"Имя '{name}' уже занято другой функцией или переменной!")
+        else:
+            # Объявляем до тела: функция может вызывать сама себя
+            info.declares = self.symbols.declare(name, FUNCTION, info.block, ctype, params=params)
+            self.analysis.functions[info.block] = info.declares
+
+    def analyze_return(self, info):
+        function = enclosing(info, 'Функция')
+        text = info.fields.get('text_field', '')
+        if function is None:
+            self.fail(info, None, "Блок 'Вернуть' можно ставить только внутрь блока 'Функция'!")
+            return
+        ctype = C_TYPES.get(function.fields.get('combo_box', ''))
+        if ctype is None:
+            if text:
+                self.fail(info, 'text_field', "Функция без результата ничего не возвращает: оставьте поле пустым!")
+        elif not text:
+            self.fail(info, 'text_field', f"Функция должна вернуть значение типа {ctype.name}!")
+        else:
+            self.check_assignment(info, 'text_field', ctype, self.operand_type(info, 'text_field'))
+
+    def analyze_call(self, info):
+        name = info.fields.get('text_field', '')
+        function = self.symbols.resolve(name)
+        if function is None or function.type != FUNCTION:
+            self.fail(info, 'text_field', f"Функция '{name}' не объявлена выше по программе!")
+            function = None
+        else:
+            info.uses['text_field'] = function
+        arguments = split_list(info.fields.get('text_field1', ''))
+        params = function.params if function is not None else [None] * len(arguments)
+        if len(arguments) != len(params):
+            self.fail(info, 'text_field1', f"Функция '{name}' принимает параметров: {len(params)}, "
+                                           f"а передано {len(arguments)}!")
+        info.arguments = [self.argument(info, text, param) for text, param in zip(arguments, params)]
+        if not info.fields.get('text_field2', ''):
+            return
+        target = self.variable(info, 'text_field2')
+        if target is None:
+            self.fail(info, 'text_field2', f"Переменная {info.fields['text_field2']} не объявлена!")
+        elif function is not None and function.ctype is None:
+            self.fail(info, 'text_field2', f"Функция '{name}' ничего не возвращает: оставьте поле результата пустым!")
+        elif function is not None:
+            self.check_result(info, 'text_field2', target, function.ctype)
+
+    def argument(self, info, text, param):
+        """Проверить аргумент вызова; возвращает Symbol переданной переменной или None."""
+        type = literal_type(text)
+        symbol = None
+        if type is None:
+            symbol = self.symbols.resolve(text)
+            type = symbol.type if symbol is not None else None
+        if type in (None, ARRAY, FUNCTION):
+            self.fail(info, 'text_field1', f"Аргумент '{text}' должен быть числом, строкой или переменной!")
+        elif param is None:
+            pass
+        elif param.ctype.kind == STRING:
+            if type != STRING:
+                self.fail(info, 'text_field1', f"В параметр '{param.name}' типа String можно передать только строку!")
+        elif type not in NUMERIC:
+            self.fail(info, 'text_field1', f"В параметр '{param.name}' типа {param.ctype.name} можно передать "
+                                           f"только число или числовую переменную!")
+        elif type == FLOAT and param.ctype.kind != FLOAT:
+            self.fail(info, 'text_field1', f"Дробное значение нельзя передать в параметр '{param.name}' "
+                                           f"типа {param.ctype.name}!")
+        elif is_valid_integer(text) and not param.ctype.fits(int(text)):
+            self.fail(info, 'text_field1', f"Значение {text} не помещается в параметр '{param.name}' "
+                                           f"типа {param.ctype.name}!")
+        return symbol
+
+    def check_result(self, info, field, target, ctype):
+        """Можно ли записать результат функции типа ctype в переменную target."""
+        if (target.type == STRING) != (ctype.kind == STRING) or target.type not in NUMERIC | {STRING}:
+            self.fail(info, field, f"Результат типа {ctype.name} нельзя записать в переменную {target.name}!")
+        elif ctype.kind == STRING and (target.ctype is None or target.ctype.name != 'String'):
+            # В const char* (тип "авто" для строки) нельзя скопировать String
+            self.fail(info, field, "Строку можно записать только в переменную типа String!")
+        elif ctype.kind == FLOAT and target.type != FLOAT:
+            self.fail(info, field, f"Дробный результат нельзя записать в целочисленную переменную {target.name}!")
+        elif target.ctype is not None:
+            self.check_narrowing(info, field, target.ctype, (ctype.min, ctype.max) if ctype.min is not None else None,
+                                 "Результат функции")
+
+
+def find_constants(analysis):
+    """Переменные, объявленные целым литералом и больше нигде не изменяемые: Symbol -> значение."""
+    constants = {}
+    written = set()
+    for info in analysis.blocks.values():
+        if info.block.text == 'Переменные' and info.declares is not None and \
+                is_valid_integer(info.fields.get('text_field2', '')):
+            constants[info.declares] = int(info.fields['text_field2'])
+        if info.block.text in WRITE_TARGETS:
+            written.add(info.uses.get(WRITE_TARGETS[info.block.text]))
+    return {symbol: value for symbol, value in constants.items() if symbol not in written}
+
+
+def constant_value(info, field, constants):
+    """Значение поля, если оно известно до запуска: целый литерал или переменная-константа."""
+    text = info.fields.get(field, '')
+    if is_valid_integer(text):
+        return int(text)
+    return constants.get(info.uses.get(field))
+
+
+def analyze_program(start_block):
+    """Проанализировать программу, начиная с блока "Начало"."""
+    return Analyzer().run(start_block)
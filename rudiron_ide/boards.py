@@ -0,0 +1,222 @@
+import glob
+import math
+import os
+import re
+import sys
+
+# Период таймера задаётся 16-битными PSG (делитель) и ARR (счёт до)
+TIMER_RANGE = 2 ** 16
+# Меньший период прерывание не успеет обработать
+MIN_TIMER_PERIOD_US = 10
+
+# Выводы JTAG-A (PB0-PB4) и JTAG-B (PD0-PD4): порт -> маска битов. MDR SPL никогда не меняет их
+# при записи в RXTX, иначе отладчик теряет связь с контроллером; быстрый режим их тоже не трогает
+MDR32F9QX_JTAG = {'B': 0x1F, 'D': 0x1F}
+
+# Элемент таблицы пинов варианта ядра: MDR_PORTA, PORT_Pin_0 (как в MDR SPL) или PA0 / PA_0
+SPL_PIN_PATTERN = re.compile(r'MDR_PORT([A-F])\b.*?PORT_Pin_(\d+)', re.DOTALL)
+SHORT_PIN_PATTERN = re.compile(r'\bP([A-F])_?(\d{1,2})\b')
+ARRAY_PATTERN = re.compile(r'\[\s*\w*\s*\]\s*=\s*\{(.*?)\}\s*;', re.DOTALL)
+COMMENT_PATTERN = re.compile(r'//[^\n]*|/\*.*?\*/', re.DOTALL)
+# Меньше пинов не бывает ни у одной платы: такой массив - не таблица пинов
+MIN_VARIANT_PINS = 8
+
+
+class Board:
+    """
+    Описание платы для генератора кода.
+
+    ports - соответствие номера пина Arduino порту и биту GPIO: по нему
+    быстрый режим ввода-вывода обращается к регистрам порта напрямую, минуя
+    digitalRead/digitalWrite. Если не задано, читается из таблицы пинов
+    варианта ядра, установленного в arduino-cli; без ядра таблица пустая и
+    все пины идут через вызовы Arduino. jtag - выводы отладчика (порт ->
+    маска), которые быстрый режим не трогает.
+
+    timers - аппаратные таймеры, свободные для блоков "Таймер", в порядке
+    выдачи: номер таймера и бит его тактирования в RST_CLK->PER_CLOCK.
+
+    usb_ids и usb_keywords - по ним монитор порта узнаёт подключённую плату:
+    пары (VID, PID) и слова из описания, производителя или названия USB-устройства.
+    """
+
+    def __init__(self, fqbn, name, ports=None, timers=(), clock_mhz=80, usb_ids=(), usb_keywords=(), jtag=None):
+        self.fqbn = fqbn
+        self.name = name
+        self.known_ports = ports  # None - прочитать из варианта ядра при первом обращении
+        self.jtag = dict(jtag or {})
+        self.timers = list(timers)
+        self.clock_mhz = clock_mhz  # частота тактирования таймеров (HCLK)
+        self.usb_ids = set(usb_ids)
+        self.usb_keywords = [keyword.lower() for keyword in usb_keywords]
+
+    @property
+    def ports(self):
+        if self.known_ports is None:
+            self.known_ports = variant_ports(self.fqbn)
+        return self.known_ports
+
+    def fast_pin(self, pin):
+        """Порт и бит пина для быстрого режима или None (пин не описан или занят JTAG)."""
+        if pin not in self.ports:
+            return None
+        port, bit = self.ports[pin]
+        if self.jtag.get(port, 0) >> bit & 1:
+            return None
+        return port, bit
+
+    @property
+    def max_timer_period_us(self):
+        return TIMER_RANGE * TIMER_RANGE // self.clock_mhz
+
+    def timer_handler(self, index):
+        """Имя обработчика прерывания для index-го свободного таймера."""
+        number, _ = self.timers[index]
+        return f"Timer{number}_IRQHandler"
+
+    def timer_setup(self, index, period_us):
+        """Строки setup(), которые запускают index-й таймер с прерыванием каждые period_us мкс."""
+        number, clock_bit = self.timers[index]
+        ticks = period_us * self.clock_mhz
+        prescaler = max(1, math.ceil(ticks / TIMER_RANGE))
+        timer = f"MDR_TIMER{number}"
+        return [
+            f"MDR_RST_CLK->PER_CLOCK |= (1UL << {clock_bit});",
+            # Делитель BRG = 1 и разрешение тактовой частоты таймера
+            f"MDR_RST_CLK->TIM_CLOCK = (MDR_RST_CLK->TIM_CLOCK & ~(0xFFUL << {8 * (number - 1)})) | "
+            f"(1UL << {23 + number});",
+            f"{timer}->CNTRL = 0;",
+            f"{timer}->CNT = 0;",
+            f"{timer}->PSG = {prescaler - 1};",
+            f"{timer}->ARR = {round(ticks / prescaler) - 1};",
+            f"{timer}->STATUS = 0;",
+            f"{timer}->IE = (1UL << 1);",  # событие CNT == ARR
+            f"NVIC_EnableIRQ(Timer{number}_IRQn);",
+            f"{timer}->CNTRL = 1;",  # CNT_EN
+        ]
+
+    def timer_clear(self, index):
+        """Сброс флага прерывания в начале обработчика."""
+        number, _ = self.timers[index]
+        return f"MDR_TIMER{number}->STATUS = 0;"
+
+    def port_write(self, pin, high):
+        """Запись в пин через регистр порта или None, если пин не описан или занят JTAG."""
+        if self.fast_pin(pin) is None:
+            return None
+        port, bit = self.ports[pin]
+        # У портов MDR32F9Qx нет отдельных регистров установки/сброса: меняем бит в RXTX.
+        # Как в PORT_SetBits/PORT_ResetBits из MDR SPL, биты JTAG при этом записываются нулями
+        jtag = self.jtag.get(port, 0)
+        if high:
+            if jtag:
+                return f"MDR_PORT{port}->RXTX = (MDR_PORT{port}->RXTX & ~{jtag:#x}UL) | (1UL << {bit});"
+            return f"MDR_PORT{port}->RXTX |= (1UL << {bit});"
+        if jtag:
+            return f"MDR_PORT{port}->RXTX &= ~((1UL << {bit}) | {jtag:#x}UL);"
+        return f"MDR_PORT{port}->RXTX &= ~(1UL << {bit});"
+
+    def port_read(self, pin):
+        """Выражение чтения пина через регистр порта или None, если пин не описан или занят JTAG."""
+        if self.fast_pin(pin) is None:
+            return None
+        port, bit = self.ports[pin]
+        return f"((MDR_PORT{port}->RXTX >> {bit}) & 1UL)"
+
+
+def arduino_data_dirs():
+    """Папки данных arduino-cli, в которых могут быть установлены ядра."""
+    if os.environ.get('ARDUINO_DIRECTORIES_DATA'):
+        return [os.environ['ARDUINO_DIRECTORIES_DATA']]
+    home = os.path.expanduser('~')
+    if sys.platform == 'win32':
+        return [os.path.join(os.environ.get('LOCALAPPDATA', home), 'Arduino15')]
+    if sys.platform == 'darwin':
+        return [os.path.join(home, 'Library', 'Arduino15')]
+    return [os.path.join(home, '.arduino15')]
+
+
+def find_variant(fqbn):
+    """Папка варианта платы fqbn в установленном ядре или None."""
+    vendor, architecture, board_id = fqbn.split(':')[:3]
+    prefix = f"{board_id}.build.variant="
+    for data_dir in arduino_data_dirs():
+        # Самая новая версия ядра - последняя по имени папки
+        for platform in sorted(glob.glob(os.path.join(data_dir, 'packages', vendor, 'hardware', architecture, '*')),
+                               reverse=True):
+            try:
+                with open(os.path.join(platform, 'boards.txt'), encoding='utf-8', errors='replace') as file:
+                    variants = [line.strip()[len(prefix):] for line in file if line.strip().startswith(prefix)]
+            except OSError:
+                continue
+            if variants and os.path.isdir(os.path.join(platform, 'variants', variants[0])):
+                return os.path.join(platform, 'variants', variants[0])
+    return None
+
+
+def split_entries(text):
+    """Элементы инициализатора массива верхнего уровня (запятые внутри {} не делят)."""
+    entries, depth, start = [], 0, 0
+    for i, char in enumerate(text):
+        if char in '{(':
+            depth += 1
+        elif char in '})':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            entries.append(text[start:i])
+            start = i + 1
+    if text[start:].strip():
+        entries.append(text[start:])
+    return entries
+
+
+def parse_pin_table(source):
+    """
+    Номер пина Arduino -> (порт, бит) из исходника варианта ядра.
+
+    Таблица пинов - первый массив, каждый элемент которого называет порт и бит;
+    номер пина - позиция элемента. Элементы без порта (например, NC) пропускаются.
+    """
+    source = COMMENT_PATTERN.sub('', source)
+    for array in ARRAY_PATTERN.finditer(source):
+        entries = split_entries(array.group(1))
+        ports = {}
+        for pin, entry in enumerate(entries):
+            match = SPL_PIN_PATTERN.search(entry) or SHORT_PIN_PATTERN.search(entry)
+            if match is not None:
+                ports[pin] = (match.group(1), int(match.group(2)))
+        if len(ports) >= MIN_VARIANT_PINS and len(ports) >= len(entries) // 2:
+            return ports
+    return {}
+
+
+def variant_ports(fqbn):
+    """Таблица пинов платы из установленного ядра; пустая, если ядро не найдено."""
+    variant = find_variant(fqbn)
+    if variant is None:
+        return {}
+    paths = [os.path.join(variant, name) for name in ('variant.cpp', 'variant.c', 'pins_arduino.h', 'variant.h')]
+    paths += sorted(set(glob.glob(os.path.join(variant, '*.[ch]*'))) - set(paths))
+    for path in paths:
+        try:
+            with open(path, encoding='utf-8', errors='replace') as file:
+                ports = parse_pin_table(file.read())
+        except OSError:
+            continue
+        if ports:
+            return ports
+    return {}
+
+
+# Рудирон Бутерброд R916 (К1986ВЕ92QI): таблица пинов берётся из варианта ядра Rudiron.
+# TIMER1 оставлен ядру (analogWrite); блокам "Таймер" выдаются TIMER2 и TIMER3.
+BUTERBROD_R916 = Board(
+    'Rudiron:MDR32F9Qx:buterbrodR916',
+    'Рудирон Бутерброд R916',
+    timers=[(2, 15), (3, 16)],
+    usb_keywords=['rudiron', 'рудирон', 'buterbrod'],
+    jtag=MDR32F9QX_JTAG,
+)
+
+BOARDS = {board.fqbn: board for board in (BUTERBROD_R916,)}
+DEFAULT_BOARD = BUTERBROD_R916
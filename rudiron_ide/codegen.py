@@ -0,0 +1,321 @@
+"""
+Генерация скетча Arduino из программы, без Qt.
+
+Генератор работает с любыми блоками, у которых есть text, fields(),
+next_block и child_blocks: с блоками на холсте и со снимками
+program.ProgramNode. Поэтому скетч можно собрать из сохранённой программы
+в скрипте, не импортируя PyQt6.
+"""
+from collections import defaultdict
+
+from .boards import DEFAULT_BOARD
+from .pins import plan_pin_modes
+from .sketch import Sketch
+from .timing import BAUD_RATE
+from .validation import ARRAY_TYPES, AUTO_TYPE, split_list
+
+# Неблокирующее чтение строки: байты копятся между проходами loop(), строка готова
+# после '\r' или '\n' (подходит любой конец строки из окна отправки)
+SERIAL_LINE_LENGTH = 64
+SERIAL_POLL_HELPER = f"""const char* serial_poll_line(){{
+static char buffer[{SERIAL_LINE_LENGTH} + 1];
+static unsigned int length = 0;
+while (Serial.available() > 0){{
+char c = (char)Serial.read();
+if (c == '\\r' || c == '\\n'){{
+if (length == 0){{
+continue;
+}}
+buffer[length] = '\\0';
+length = 0;
+return buffer;
+}}
+if (length < {SERIAL_LINE_LENGTH}){{
+buffer[length++] = c;
+}}
+}}
+return nullptr;
+}}
+"""
+SERIAL_LINE_HELPER = """bool serial_read_line(String &value){
+const char* line = serial_poll_line();
+if (line == nullptr){
+return false;
+}
+value = line;
+return true;
+}
+"""
+SERIAL_NUMBER_HELPER = """template <typename T> bool serial_read_number(T &value){
+const char* line = serial_poll_line();
+if (line == nullptr){
+return false;
+}
+char* end;
+double number = strtod(line, &end);
+if (end == line){
+return false;
+}
+value = (T)number;
+return true;
+}
+"""
+# Блоки приёма из порта: функция скетча, которая читает значение, и её текст
+SERIAL_INPUT_HELPERS = {'Пришла строка': ('serial_read_line', SERIAL_LINE_HELPER),
+                        'Пришло число': ('serial_read_number', SERIAL_NUMBER_HELPER)}
+
+
+class GenerationError(Exception):
+    """Блок программы, который не удалось перевести в код."""
+
+    def __init__(self, block):
+        self.block = block
+        super().__init__(f"Блок '{block.text}' не удалось перевести в код C++")
+
+
+class CodeGenerator:
+    """
+    Код C++ для цепочки блоков.
+
+    Обработчик блока получает блок, значения его полей и глубину вложенности
+    (от неё зависят имена счётчиков) и возвращает код блока или None, если
+    блок нельзя сгенерировать: "Таймер" и "Функция" требуют скетч с
+    результатами анализа. Части скетча вне setup() (глобальные переменные,
+    функции, loop()) блоки добавляют в sketch.
+    """
+
+    def __init__(self, sketch=None):
+        self.sketch = sketch
+        self.failed_block = None  # самый вложенный блок, из-за которого chain вернул None
+        self.handlers = {
+            'Переменные': self.generate_variable,
+            'Арифметика': self.generate_arithmetic,
+            'Сон': self.generate_delay,
+            'Условие': self.generate_condition,
+            'Повтор': self.generate_for_cycle,
+            'Цикл': self.generate_while_cycle,
+            'Цикл программы': self.generate_program_loop,
+            'ЦЧтение': self.generate_digital_read,
+            'АЧтение': self.generate_analog_read,
+            'ЦЗапись': self.generate_digital_write,
+            'АЗапись': self.generate_analog_write,
+            'Слушай': self.generate_serial_read,
+            'Говори': self.generate_serial_write,
+            'Массив': self.generate_array,
+            'Из массива': self.generate_array_get,
+            'В массив': self.generate_array_set,
+            'Оцифровка': self.generate_sample,
+            'Отправить массив': self.generate_bulk_write,
+            'Каждые': self.generate_every,
+            'Таймер': self.generate_timer,
+            'Пришла строка': self.generate_serial_input,
+            'Пришло число': self.generate_serial_input,
+            'Функция': self.generate_function,
+            'Вернуть': self.generate_return,
+            'Вызов': self.generate_call,
+        }
+
+    def chain(self, block, depth=0):
+        """Код цепочки блоков начиная с block; None, если какой-то блок не генерируется."""
+        parts = []
+        while block is not None:
+            handler = self.handlers.get(block.text)
+            if handler is not None:
+                # Отсутствующее поле - пустая строка, как пустое поле ввода
+                code = handler(block, defaultdict(str, block.fields()), depth)
+                if code is None:
+                    if self.failed_block is None:
+                        self.failed_block = block
+                    return None
+                parts.append(code)
+            block = block.next_block
+        return ''.join(parts)
+
+    def body(self, block, depth):
+        """Код тела управляющего блока."""
+        child_blocks = getattr(block, 'child_blocks', [])
+        return self.chain(child_blocks[0], depth + 1) if child_blocks else ''
+
+    def hoisted(self, depth):
+        # Переменные основной программы нужны и в loop(), обработчиках и функциях: объявляем глобально
+        return self.sketch is not None and self.sketch.hoist_globals and depth == 0
+
+    def analyzed(self):
+        return self.sketch is not None and self.sketch.analysis is not None
+
+    def generate_variable(self, block, fields, depth):
+        name = fields['text_field1']
+        if self.hoisted(depth):
+            # В setup() только присваиваем
+            self.sketch.add_global(f"{self.sketch.cpp_type(block)} {name};")
+            return f"{name} = {fields['text_field2']};\n"
+        type_name = fields['combo_box'] or AUTO_TYPE
+        return f"{'auto' if type_name == AUTO_TYPE else type_name} {name} = {fields['text_field2']};\n"
+
+    def generate_arithmetic(self, block, fields, depth):
+        # '//' в C++ - комментарий; деление целых и так целочисленное
+        operation = '/' if fields['combo_box'] == '//' else fields['combo_box']
+        return f"{fields['text_field1']} = {fields['text_field2']} {operation} {fields['text_field3']};\n"
+
+    def generate_delay(self, block, fields, depth):
+        return f"delay({fields['text_field']});\n"
+
+    def block_with_body(self, header, block, depth, footer='}\n'):
+        body = self.body(block, depth)
+        if body is None:
+            return None
+        return header + body + footer
+
+    def generate_condition(self, block, fields, depth):
+        return self.block_with_body(f"if ({fields['text_field']} {fields['combo_box']} {fields['text_field2']}){{\n",
+                                    block, depth)
+
+    def generate_for_cycle(self, block, fields, depth):
+        counter = f"i{depth}"
+        return self.block_with_body(f"for (int {counter} = 0; {counter} < {fields['text_field2']}; ++{counter}){{\n",
+                                    block, depth)
+
+    def generate_while_cycle(self, block, fields, depth):
+        return self.block_with_body(
+            f"while ({fields['text_field']} {fields['combo_box']} {fields['text_field2']}){{\n", block, depth)
+
+    def generate_program_loop(self, block, fields, depth):
+        body = self.body(block, depth)
+        if body is None:
+            return None
+        if self.sketch is None:
+            return 'while (true){\n' + body + '}\n'
+        self.sketch.loop_code = body
+        return ''
+
+    def generate_every(self, block, fields, depth):
+        due = f"task{depth}_due"
+        # static инициализируется при первом проходе: первый запуск сразу, дальше строго по периоду
+        header = ('{\n'
+                  f'static unsigned long {due} = millis();\n'
+                  f'if ((long)(millis() - {due}) >= 0){{\n'
+                  f"{due} += {fields['text_field2']};\n")
+        return self.block_with_body(header, block, depth, '}\n}\n')
+
+    def generate_timer(self, block, fields, depth):
+        # Обработчик прерывания - отдельная функция, поэтому нужен скетч с проверенной программой
+        if not self.analyzed() or block not in self.sketch.analysis.timers:
+            return None
+        board = self.sketch.board
+        index = self.sketch.analysis.timers.index(block)
+        body = self.body(block, depth)
+        if body is None:
+            return None
+        handler = f'extern "C" void {board.timer_handler(index)}(void){{\n'
+        self.sketch.add_helper(('timer', index), handler + board.timer_clear(index) + '\n' + body + '}\n')
+        return ''.join(line + '\n' for line in board.timer_setup(index, int(fields['text_field2'])))
+
+    def generate_serial_input(self, block, fields, depth):
+        helper, code = SERIAL_INPUT_HELPERS[block.text]
+        if self.sketch is not None:
+            self.sketch.add_helper('serial_poll_line', SERIAL_POLL_HELPER)
+            self.sketch.add_helper(helper, code)
+        return self.block_with_body(f"if ({helper}({fields['text_field2']})){{\n", block, depth)
+
+    def generate_digital_read(self, block, fields, depth):
+        if self.sketch is not None and self.sketch.fast_io:
+            port_read = self.sketch.board.port_read(self.sketch.constant(block, 'text_field2'))
+            if port_read is not None:
+                return f"{fields['text_field1']} = {port_read};\n"
+        return f"{fields['text_field1']} = digitalRead({fields['text_field2']});\n"
+
+    def generate_analog_read(self, block, fields, depth):
+        return f"{fields['text_field1']} = analogRead({fields['text_field2']});\n"
+
+    def generate_digital_write(self, block, fields, depth):
+        level = fields['combo_box'] or 'LOW'
+        if self.sketch is not None and self.sketch.fast_io:
+            port_write = self.sketch.board.port_write(self.sketch.constant(block, 'text_field'), level == 'HIGH')
+            if port_write is not None:
+                return port_write + '\n'
+        return f"digitalWrite({fields['text_field']}, {level});\n"
+
+    def generate_analog_write(self, block, fields, depth):
+        return f"analogWrite({fields['text_field1']}, {fields['text_field2']});\n"
+
+    def generate_serial_read(self, block, fields, depth):
+        return f"{fields['text_field']} = Serial.read();\n"
+
+    def generate_serial_write(self, block, fields, depth):
+        return f"Serial.print({fields['text_field']});\n"
+
+    def generate_array(self, block, fields, depth):
+        declaration = f"{fields['combo_box'] or ARRAY_TYPES[0]} {fields['text_field1']}[{fields['text_field2']}]"
+        if self.hoisted(depth):
+            # Глобальный массив и так заполнен нулями
+            self.sketch.add_global(declaration + ';')
+            return ''
+        return declaration + ' = {};\n'
+
+    def generate_array_get(self, block, fields, depth):
+        return f"{fields['text_field1']} = {fields['text_field2']}[{fields['text_field3']}];\n"
+
+    def generate_array_set(self, block, fields, depth):
+        return f"{fields['text_field1']}[{fields['text_field2']}] = {fields['text_field3']};\n"
+
+    def generate_sample(self, block, fields, depth):
+        buffer = fields['text_field1']
+        counter = f"i{depth}"
+        # Отсчёты по расписанию micros(), а не через delay(): время самого analogRead не копится
+        return ('{\n'
+                f'unsigned long {counter}_due = micros();\n'
+                f'for (int {counter} = 0; {counter} < (int)(sizeof({buffer}) / sizeof({buffer}[0])); ++{counter}){{\n'
+                f'while ((long)(micros() - {counter}_due) < 0){{\n}}\n'
+                f"{buffer}[{counter}] = analogRead({fields['text_field2']});\n"
+                f"{counter}_due += 1000000UL / ({fields['text_field3']});\n"
+                '}\n'
+                '}\n')
+
+    def generate_bulk_write(self, block, fields, depth):
+        buffer = fields['text_field']
+        return f"Serial.write((const uint8_t*){buffer}, sizeof({buffer}));\n"
+
+    def generate_function(self, block, fields, depth):
+        # Функция - отдельная часть скетча, поэтому нужен скетч с проверенной программой
+        if not self.analyzed() or block not in self.sketch.analysis.functions:
+            return None
+        function = self.sketch.analysis.functions[block]
+        body = self.body(block, depth)
+        if body is None:
+            return None
+        result = function.ctype.name if function.ctype is not None else 'void'
+        params = ', '.join(f"{param.ctype.name} {param.name}" for param in function.params)
+        self.sketch.add_helper(('function', function.name), f"{result} {function.name}({params}){{\n{body}}}\n")
+        # В основной программе от блока ничего не остаётся
+        return ''
+
+    def generate_return(self, block, fields, depth):
+        value = fields['text_field']
+        return f"return {value};\n" if value else "return;\n"
+
+    def generate_call(self, block, fields, depth):
+        call = f"{fields['text_field']}({', '.join(split_list(fields['text_field1']))})"
+        target = fields['text_field2']
+        return f"{target} = {call};\n" if target else f"{call};\n"
+
+
+def generate_sketch(start_block, analysis, manual_modes=None, board=DEFAULT_BOARD, fast_io=False):
+    """
+    Текст скетча .ino для проверенной программы и план режимов пинов.
+
+    manual_modes - режимы, явно выбранные на панели ПИНов (пин -> INPUT/OUTPUT).
+    Возвращает (текст, PinPlan); если какой-то блок не переводится в код,
+    бросает GenerationError с этим блоком.
+    """
+    sketch = Sketch(analysis, board, fast_io)
+    generator = CodeGenerator(sketch)
+    setup_code = generator.chain(start_block)
+    if setup_code is None:
+        raise GenerationError(generator.failed_block)
+    # pinMode только для пинов, которые использует программа или которые явно настроены на панели
+    pin_plan = plan_pin_modes(analysis, manual_modes)
+    sketch.setup_prologue.append(f"Serial.begin({BAUD_RATE});")
+    sketch.setup_prologue.append("delay(10);")
+    sketch.setup_prologue.extend(pin_plan.prologue())
+    sketch.setup_code = setup_code
+    return sketch.render(), pin_plan
@@ -0,0 +1,1047 @@
+"""
+Главное окно среды: рабочая область с блоками, палитра, панель ПИНов,
+симулятор, диагностика и запуск программы на плате.
+"""
+import json
+import sys
+
+from PyQt6.QtWidgets import (
+    QApplication, QCheckBox, QWidget, QGraphicsView, QGraphicsScene, QVBoxLayout, QHBoxLayout, QLabel,
+    QPushButton, QMessageBox, QLineEdit, QGraphicsProxyWidget, QComboBox, QScrollArea, QDialog,
+    QListWidget, QListWidgetItem, QFileDialog, QMenu, QInputDialog
+)
+from PyQt6.QtGui import QColor, QPen, QPainter, QIcon, QKeySequence, QImage, QShortcut
+from PyQt6.QtCore import Qt, QRectF, QPointF, QTimer, QObject, QThread, QMimeData, pyqtSignal
+
+from .analyzer import WARNING, Analyzer
+from .history import FieldsEdit, History, affected_blocks
+from .model import PALETTE, Block, StartBlock, build_chain, create_block, layout_chain, stack_blocks
+from .navigation import DEFINITION, BlockIndex, ReferenceIndex, RenameError, block_references, plan_rename
+from .program import chain_to_data, snapshot_chain
+from .serial import SIMULATION_SPEEDS, SerialMonitorWidget
+from .simulator import Simulator, SimulationError, SimulationStopped, VirtualClock, VirtualSerial
+from .timing import estimate_timing, format_duration
+from .codegen import GenerationError, generate_sketch
+from .pins import PANEL_MODES
+from .validation import PINS
+
+
+def show_message_box(text, title="Внимание"):
+    message_box = QMessageBox()
+    message_box.setWindowTitle(title)
+    message_box.setText(text)
+    message_box.setStandardButtons(QMessageBox.StandardButton.Yes)
+    message_box.setIcon(QMessageBox.Icon.Warning)
+    message_box.exec()
+
+
+class PopupWindow(QDialog):
+    def __init__(self, title, text, width=300, height=50):
+        super().__init__()
+        self.setWindowTitle(title)
+        self.resize(width, height)
+
+        # Добавляем элементы в окно
+        layout = QVBoxLayout()
+        label = QLabel(text)
+        close_button = QPushButton("Закрыть")
+
+        # Закрытие окна по нажатию кнопки
+        close_button.clicked.connect(self.close)
+
+        layout.addWidget(label)
+        layout.addWidget(close_button)
+        self.setLayout(layout)
+
+
+# Формат блоков в буфере обмена (JSON со стопками из chain_to_data)
+BLOCKS_MIME_TYPE = 'application/x-rudiron-blocks'
+# Сдвиг вставленных блоков относительно скопированных
+PASTE_OFFSET = 30
+
+
+# Поле вокруг блоков, на которое можно прокрутить холст
+WORKSPACE_MARGIN = 200
+MINIMAP_SIZE = (200, 150)
+# Обзор перерисовывается не чаще, чем раз в столько мс
+MINIMAP_DELAY_MS = 200
+# Больше изменившихся областей за раз объединяются в одну
+MINIMAP_MAX_REGIONS = 32
+MINIMAP_BACKGROUND = QColor('#F4F4F4')
+
+
+# Фон полей с найденным именем или пином
+REFERENCE_COLOR = '#FFE066'
+
+
+def update_field_style(widget):
+    """Стиль поля из двух независимых подсветок: ошибки (рамка) и найденного имени (фон)."""
+    style = ''
+    color = widget.property('diagnostic_color')
+    if color:
+        style += f'border: 2px solid {color};'
+    if widget.property('reference'):
+        style += f'background: {REFERENCE_COLOR};'
+    widget.setStyleSheet(style)
+
+
+class Workspace(QGraphicsView):
+    block_fields_changed = pyqtSignal(object)
+    structure_changed = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setScene(QGraphicsScene(self))
+        self.setSceneRect(0, 0, 800, 600)
+        self.setRenderHint(QPainter.RenderHint.Antialiasing)
+        self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
+        self.setDragMode(QGraphicsView.DragMode.RubberBandDrag)
+        self._pan = False
+        self._last_pan_point = QPointF()
+        self.history = History(self.scene())
+        self.paste_count = 0  # вставки одного и того же содержимого сдвигаются всё дальше
+        # Индекс для поиска блоков; после изменений структуры сверяется с холстом при следующем поиске
+        self.block_index = BlockIndex()
+        self.reference_index = ReferenceIndex()
+        self.index_stale = True
+        self.highlighted_references = []
+        self.structure_changed.connect(self.structure_edited)
+        self.block_fields_changed.connect(self.block_index.update)
+        self.block_fields_changed.connect(self.reference_index.update)
+        self.minimap = Minimap(self)
+
+    def structure_edited(self):
+        self.index_stale = True
+        self.update_scene_rect()
+
+    def update_scene_rect(self):
+        """Холст растёт вместе с программой: по нему можно прокручивать, его целиком показывает обзор."""
+        margin = WORKSPACE_MARGIN
+        rect = self.scene().itemsBoundingRect().adjusted(-margin, -margin, margin, margin)
+        self.setSceneRect(rect.united(QRectF(0, 0, 800, 600)))
+
+    def sync_indexes(self):
+        if self.index_stale:
+            blocks = [item for item in self.scene().items() if isinstance(item, Block)]
+            self.block_index.sync(blocks)
+            self.reference_index.sync(blocks)
+            self.index_stale = False
+
+    def find_blocks(self, query):
+        """Блоки на холсте, подходящие под запрос, сверху вниз."""
+        self.sync_indexes()
+        found = [block for block in self.block_index.search(query) if block.scene() is self.scene()]
+        return sorted(found, key=lambda block: (block.scenePos().y(), block.scenePos().x()))
+
+    def find_references(self, key):
+        """Упоминания имени (или номера пина): сначала объявления, затем использования сверху вниз."""
+        self.sync_indexes()
+        found = [reference for reference in self.reference_index.find(key) if reference.block.scene() is self.scene()]
+        return sorted(found, key=lambda reference: (reference.kind != DEFINITION, reference.block.scenePos().y(),
+                                                    reference.block.scenePos().x()))
+
+    def highlight_references(self, references):
+        """Подсветить поля с найденным именем; снимается только прежняя подсветка, а не весь холст."""
+        self.clear_reference_highlight()
+        for reference in references:
+            widget = getattr(reference.block, reference.field)
+            widget.setProperty('reference', True)
+            update_field_style(widget)
+            self.highlighted_references.append(widget)
+
+    def clear_reference_highlight(self):
+        for widget in self.highlighted_references:
+            widget.setProperty('reference', False)
+            update_field_style(widget)
+        self.highlighted_references = []
+
+    def reference_menu(self, block):
+        menu = QMenu(self)
+        keys = []
+        for key, reference in block_references(block):
+            if key not in keys:
+                keys.append(key)
+        for key in keys:
+            if isinstance(key, int):
+                menu.addAction(f"Найти пин {key}", lambda key=key: self.search_references(key))
+            else:
+                menu.addAction(f"Найти '{key}'", lambda key=key: self.search_references(key))
+                menu.addAction(f"Переименовать '{key}'...", lambda key=key: self.ask_rename(block, key))
+        return menu
+
+    def search_references(self, key):
+        search_widget = self.window().findChild(BlockSearchWidget)
+        if search_widget is not None:
+            search_widget.show_references(key)
+
+    def ask_rename(self, block, old):
+        new, ok = QInputDialog.getText(self, "Переименование", f"Новое имя для '{old}':", text=old)
+        if ok and new != old:
+            self.rename(block, old, new)
+
+    def rename(self, block, old, new):
+        """
+        Переименовать переменную, массив или функцию, упомянутую в блоке block, одним шагом истории.
+
+        Меняются только упоминания того же объявления: одноимённые переменные
+        других функций и областей видимости остаются как были.
+        """
+        start_block = StartBlock.start_block
+        if start_block is None or start_block.scene() is not self.scene():
+            QMessageBox.warning(self, "Переименование", "Для переименования нужен блок 'Начало'")
+            return False
+        try:
+            edits = plan_rename(start_block, block, old, new, self.find_references(old))
+        except RenameError as e:
+            QMessageBox.warning(self, "Переименование", str(e))
+            return False
+        if edits:
+            self.history.execute(FieldsEdit("Переименование", edits))
+        self.search_references(new)
+        return True
+
+    def show_block(self, block):
+        """Показать блок в центре рабочей области и выделить его; свёрнутые блоки вокруг него разворачиваются."""
+        parent = block.parent_block
+        while parent is not None:
+            if getattr(parent, 'collapsed', False):
+                parent.toggle_collapsed()
+            parent = parent.parent_block
+        self.centerOn(block)
+        self.scene().clearSelection()
+        block.setSelected(True)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        # Обзор - в правом нижнем углу видимой области, поверх холста
+        viewport = self.viewport().geometry()
+        self.minimap.move(viewport.right() - self.minimap.width() - 8, viewport.bottom() - self.minimap.height() - 8)
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.StandardKey.Undo):
+            self.undo()
+            event.accept()
+        elif event.matches(QKeySequence.StandardKey.Redo):
+            self.redo()
+            event.accept()
+        elif isinstance(self.scene().focusItem(), QGraphicsProxyWidget):
+            # Копирование и вставка в поле блока - это работа с текстом поля
+            super().keyPressEvent(event)
+        elif event.matches(QKeySequence.StandardKey.Copy):
+            self.copy_selection()
+            event.accept()
+        elif event.matches(QKeySequence.StandardKey.Cut):
+            self.cut_selection()
+            event.accept()
+        elif event.matches(QKeySequence.StandardKey.Paste):
+            self.paste()
+            event.accept()
+        elif event.key() == Qt.Key.Key_D and event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            self.duplicate_selection()
+            event.accept()
+        elif event.key() == Qt.Key.Key_Delete:
+            selected_items = [item for item in self.scene().selectedItems()
+                              if isinstance(item, Block) and item.scene() is not None]
+            if selected_items:
+                affected = set()
+                for item in selected_items:
+                    affected |= affected_blocks(item)
+                self.history.begin("Удаление", affected)
+                for item in selected_items:
+                    # Remove the item from the scene (вложенный блок мог уйти вместе с родителем)
+                    if item.scene() is not None:
+                        item.suicide()
+                self.history.commit()
+            event.accept()
+        else:
+            super().keyPressEvent(event)
+
+    def undo(self):
+        if self.history.undo() is not None:
+            self.structure_changed.emit()
+
+    def redo(self):
+        if self.history.redo() is not None:
+            self.structure_changed.emit()
+
+    def selected_stacks(self):
+        """
+        Выделенные блоки, с которых начинаются копируемые части стопок, сверху вниз.
+
+        Копируется блок вместе со всем, что под ним; выделенный блок внутри уже
+        копируемой части отдельно не берётся.
+        """
+        selected = [item for item in self.scene().selectedItems() if isinstance(item, Block)]
+        covered = set()
+        for block in selected:
+            covered.update(stack_blocks(block)[1:])
+        roots = [block for block in selected if block not in covered]
+        return sorted(roots, key=lambda block: (block.scenePos().y(), block.scenePos().x()))
+
+    def stacks_data(self, roots):
+        return {'stacks': [{'x': root.scenePos().x(), 'y': root.scenePos().y(), 'blocks': chain_to_data(root)}
+                           for root in roots]}
+
+    def copy_selection(self):
+        roots = self.selected_stacks()
+        if not roots:
+            return False
+        mime = QMimeData()
+        text = json.dumps(self.stacks_data(roots), ensure_ascii=False)
+        mime.setData(BLOCKS_MIME_TYPE, text.encode('utf-8'))
+        mime.setText(text)
+        QApplication.clipboard().setMimeData(mime)
+        self.paste_count = 0
+        return True
+
+    def cut_selection(self):
+        roots = self.selected_stacks()
+        if not self.copy_selection():
+            return
+        affected = set()
+        for root in roots:
+            affected |= affected_blocks(root)
+        self.history.begin("Вырезание", affected)
+        for root in roots:
+            self.remove_stack(root)
+        self.history.commit()
+        self.structure_changed.emit()
+
+    def remove_stack(self, root):
+        """Убрать со сцены блок и всё, что под ним."""
+        if root.prev_block is not None:
+            root.prev_block.next_block = None
+            root.prev_block = None
+        if root.parent_block is not None:
+            root.parent_block.remove_child_block(root)
+        block = root
+        while block is not None:
+            if StartBlock.start_block is block:
+                StartBlock.start_block = None
+            if block.scene() is not None:
+                self.scene().removeItem(block)
+            block = block.next_block
+
+    def paste(self):
+        mime = QApplication.clipboard().mimeData()
+        if mime.hasFormat(BLOCKS_MIME_TYPE):
+            raw = bytes(mime.data(BLOCKS_MIME_TYPE)).decode('utf-8')
+        elif mime.hasText():
+            raw = mime.text()
+        else:
+            return
+        try:
+            data = json.loads(raw)
+            stacks = data['stacks']
+        except (ValueError, TypeError, KeyError):
+            return  # в буфере обмена не блоки
+        self.paste_count += 1
+        self.insert_stacks(stacks, PASTE_OFFSET * self.paste_count, "Вставка")
+
+    def duplicate_selection(self):
+        roots = self.selected_stacks()
+        if roots:
+            self.insert_stacks(self.stacks_data(roots)['stacks'], PASTE_OFFSET, "Дублирование")
+
+    def insert_stacks(self, stacks, offset, description):
+        """
+        Создать стопки из данных chain_to_data со сдвигом offset.
+
+        Блоки сначала создаются и связываются, а размеры и положения
+        считаются одним проходом в конце, без пересчёта после каждого блока.
+        """
+        created = []
+        heads = []
+        for stack in stacks:
+            try:
+                head = build_chain(stack['blocks'], created)
+            except KeyError:
+                continue  # блок, которого нет в палитре
+            if head is not None:
+                heads.append((head, stack['x'] + offset, stack['y'] + offset))
+        if not heads:
+            return
+        self.history.begin(description, [])
+        self.history.include(created)
+        self.scene().clearSelection()
+        for head, x, y in heads:
+            layout_chain(head, x, y)
+            block = head
+            while block is not None:
+                self.scene().addItem(block)
+                block = block.next_block
+            head.setSelected(True)
+        for block in created:
+            block.watch_fields()
+        self.history.commit()
+        self.structure_changed.emit()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.MiddleButton:
+            self._pan = True
+            self.setCursor(Qt.CursorShape.ClosedHandCursor)
+            self._last_pan_point = event.pos()
+            event.accept()
+        else:
+            super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if self._pan:
+            delta = self.mapToScene(event.pos()) - self.mapToScene(self._last_pan_point)
+            self._last_pan_point = event.pos()
+            self.setTransformationAnchor(QGraphicsView.ViewportAnchor.NoAnchor)
+            self.translate(-delta.x(), -delta.y())
+            event.accept()
+        else:
+            super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.MouseButton.MiddleButton:
+            self._pan = False
+            self.setCursor(Qt.CursorShape.ArrowCursor)
+            event.accept()
+        else:
+            super().mouseReleaseEvent(event)
+
+
+class Minimap(QWidget):
+    """
+    Обзор всего холста в углу рабочей области.
+
+    Картинка сцены в низком разрешении рисуется один раз и хранится. Когда
+    сцена меняется, перерисовываются только изменившиеся области, и не
+    чаще раза в MINIMAP_DELAY_MS. Рамка показывает видимую часть холста;
+    щелчок или перетаскивание по обзору переносит туда рабочую область.
+    """
+
+    def __init__(self, workspace):
+        super().__init__(workspace)
+        self.workspace = workspace
+        self.setFixedSize(*MINIMAP_SIZE)
+        self.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.image = None
+        self.bounds = QRectF()  # часть сцены, которую показывает картинка
+        self.scale = 1.0
+        self.offset = QPointF()
+        self.dirty = []  # изменившиеся области сцены, ещё не перерисованные
+        self.render_timer = QTimer(self)
+        self.render_timer.setSingleShot(True)
+        self.render_timer.setInterval(MINIMAP_DELAY_MS)
+        self.render_timer.timeout.connect(self.render_dirty)
+        workspace.scene().changed.connect(self.scene_changed)
+        workspace.horizontalScrollBar().valueChanged.connect(self.update)
+        workspace.verticalScrollBar().valueChanged.connect(self.update)
+
+    def scene_changed(self, regions):
+        self.dirty.extend(regions)
+        if len(self.dirty) > MINIMAP_MAX_REGIONS:
+            united = QRectF()
+            for region in self.dirty:
+                united = united.united(region)
+            self.dirty = [united]
+        # Не перезапускаем таймер: при непрерывном перетаскивании обзор всё равно обновляется
+        if not self.render_timer.isActive():
+            self.render_timer.start()
+
+    def to_minimap(self, rect):
+        return QRectF(self.offset.x() + (rect.x() - self.bounds.x()) * self.scale,
+                      self.offset.y() + (rect.y() - self.bounds.y()) * self.scale,
+                      rect.width() * self.scale, rect.height() * self.scale)
+
+    def to_scene(self, point):
+        return QPointF(self.bounds.x() + (point.x() - self.offset.x()) / self.scale,
+                       self.bounds.y() + (point.y() - self.offset.y()) / self.scale)
+
+    def render_all(self):
+        self.bounds = self.workspace.sceneRect()
+        self.scale = min(self.width() / self.bounds.width(), self.height() / self.bounds.height())
+        self.offset = QPointF((self.width() - self.bounds.width() * self.scale) / 2,
+                              (self.height() - self.bounds.height() * self.scale) / 2)
+        self.image = QImage(self.size(), QImage.Format.Format_ARGB32_Premultiplied)
+        self.image.fill(MINIMAP_BACKGROUND)
+        self.render_region(self.bounds)
+
+    def render_dirty(self):
+        if self.image is None or self.workspace.sceneRect() != self.bounds:
+            self.render_all()
+        else:
+            for region in self.dirty:
+                self.render_region(region)
+        self.dirty = []
+        self.update()
+
+    def render_region(self, region):
+        # Целые пиксели картинки, иначе на границах областей остаются полосы
+        target = QRectF(self.to_minimap(region.intersected(self.bounds)).toAlignedRect())
+        if target.isEmpty():
+            return
+        source = QRectF(self.to_scene(target.topLeft()), self.to_scene(target.bottomRight()))
+        painter = QPainter(self.image)
+        painter.setClipRect(target)
+        painter.fillRect(target, MINIMAP_BACKGROUND)
+        self.workspace.scene().render(painter, target, source, Qt.AspectRatioMode.IgnoreAspectRatio)
+        painter.end()
+
+    def paintEvent(self, event):
+        if self.image is None:
+            self.render_dirty()
+        painter = QPainter(self)
+        painter.drawImage(0, 0, self.image)
+        visible = self.workspace.mapToScene(self.workspace.viewport().rect()).boundingRect()
+        painter.setPen(QPen(QColor('red'), 1))
+        painter.drawRect(self.to_minimap(visible.intersected(self.bounds)))
+        painter.setPen(QPen(Qt.GlobalColor.darkGray, 1))
+        painter.drawRect(0, 0, self.width() - 1, self.height() - 1)
+        painter.end()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self.workspace.centerOn(self.to_scene(event.position()))
+            event.accept()
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() & Qt.MouseButton.LeftButton:
+            self.workspace.centerOn(self.to_scene(event.position()))
+            event.accept()
+
+
+class BlockPalette(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        self.parent = parent
+
+        for text, color in PALETTE:
+            button = QPushButton(text)
+            button.setStyleSheet(
+                f'background-color: {color.name()}; color: white; font-weight: bold;')
+            button.clicked.connect(
+                lambda checked, t=text, c=color: self.add_block_to_workspace(t, c))
+            layout.addWidget(button)
+
+    def add_block_to_workspace(self, text, color):
+        history = self.parent.workspace.history
+        # Новый блок "Начало" убирает прежний - это часть того же шага
+        if text == 'Начало' and StartBlock.start_block is not None:
+            history.begin("Добавление", affected_blocks(StartBlock.start_block))
+        else:
+            history.begin("Добавление", [])
+        block = create_block(text, color)
+        history.include([block])
+        self.parent.workspace.scene().addItem(block)
+        block.setPos(100, 100)
+        block.watch_fields()
+        history.commit()
+        block.notify_structure_changed()
+
+
+class PinConfigurationWidget(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pin_comboboxes = {}
+        self.setupUI()
+
+    def setupUI(self):
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel('<h2>ПИНы</h2>'))
+
+        # Scroll area
+        scroll_area = QScrollArea()
+        scroll_area.setWidgetResizable(True)
+        scroll_content = QWidget()
+        self.scroll_layout = QVBoxLayout(scroll_content)
+        self.scroll_layout.addStretch()
+        scroll_content.setLayout(self.scroll_layout)
+        scroll_area.setWidget(scroll_content)
+
+        scroll_area.setFixedWidth(200)
+
+        layout.addWidget(scroll_area)
+        self.setLayout(layout)
+
+    def build_rows(self):
+        """Строки пинов создаются после первого показа окна (или при первом обращении), а не при запуске."""
+        if self.pin_comboboxes:
+            return
+        for index, pin_number in enumerate(PINS):
+            h_layout = QHBoxLayout()
+            label = QLabel(f"Pin{pin_number}")
+            combobox = QComboBox()
+            combobox.addItems(list(PANEL_MODES))
+            self.pin_comboboxes[pin_number] = combobox
+            h_layout.addWidget(label)
+            h_layout.addWidget(combobox)
+            self.scroll_layout.insertLayout(index, h_layout)
+
+    def get_pin_configurations(self):
+        self.build_rows()
+        pin_numbers = sorted(self.pin_comboboxes.keys())
+        pin_configs = [self.pin_comboboxes[pin].currentText() for pin in pin_numbers]
+        return pin_configs
+
+    def get_manual_modes(self):
+        """Пины, режим которых явно выбран на панели: пин -> INPUT/OUTPUT."""
+        self.build_rows()
+        modes = {}
+        for pin, combobox in self.pin_comboboxes.items():
+            mode = PANEL_MODES[combobox.currentText()]
+            if mode is not None:
+                modes[pin] = mode
+        return modes
+
+
+class LiveValidator(QObject):
+    """
+    Живая проверка программы во время редактирования.
+
+    Правки полей копятся и после короткой паузы перепроверяются инкрементально:
+    только изменённые блоки и блоки, зависящие от изменённых объявлений.
+    Изменения структуры (соединение, отсоединение, удаление блоков) приводят
+    к полному повторному анализу.
+    """
+
+    def __init__(self, workspace, diagnostics_widget, delay=300, parent=None):
+        super().__init__(parent)
+        self.diagnostics_widget = diagnostics_widget
+        self.analyzer = None
+        self.dirty_blocks = set()
+        self.structure_dirty = True
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay)
+        self.timer.timeout.connect(self.validate)
+        workspace.block_fields_changed.connect(self.block_changed)
+        workspace.structure_changed.connect(self.structure_changed)
+
+    def block_changed(self, block):
+        self.dirty_blocks.add(block)
+        self.timer.start()
+
+    def structure_changed(self):
+        self.structure_dirty = True
+        self.timer.start()
+
+    def validate(self, full=False):
+        """Выполнить отложенную проверку; возвращает актуальный результат анализа или None."""
+        self.timer.stop()
+        start_block = StartBlock.start_block
+        if start_block is None or start_block.scene() is None:
+            self.analyzer = None
+            self.diagnostics_widget.set_diagnostics([])
+            return None
+        if full or self.structure_dirty or self.analyzer is None:
+            self.analyzer = Analyzer()
+            self.analyzer.run(start_block)
+        elif self.dirty_blocks:
+            self.analyzer.update_blocks(self.dirty_blocks)
+        self.dirty_blocks = set()
+        self.structure_dirty = False
+        self.diagnostics_widget.set_diagnostics(self.analyzer.analysis.diagnostics)
+        return self.analyzer.analysis
+
+
+class SimulationRunner(QThread):
+    """Выполнение симулятора в отдельном потоке, чтобы не блокировать интерфейс."""
+    pin_written = pyqtSignal(str)
+    finished_with = pyqtSignal(str)
+
+    # Сколько записей в пины показывать, чтобы быстрый цикл не завалил консоль
+    max_logged_writes = 1000
+
+    def __init__(self, simulator, parent=None):
+        super().__init__(parent)
+        self.simulator = simulator
+        self.logged_writes = 0
+
+    def run(self):
+        self.simulator.pins.on_write = self.log_write
+        try:
+            self.simulator.run()
+            message = (f"Симуляция завершена: {self.simulator.clock.millis()} мс виртуального времени, "
+                       f"{self.simulator.steps} шагов.")
+        except SimulationStopped:
+            message = "Симуляция остановлена."
+        except SimulationError as e:
+            message = f"Ошибка симуляции: {e}"
+        self.finished_with.emit(message)
+
+    def log_write(self, time_ms, function, pin, value):
+        self.logged_writes += 1
+        if self.logged_writes <= self.max_logged_writes:
+            self.pin_written.emit(f"[{time_ms} мс] {function}({pin}, {value})")
+        elif self.logged_writes == self.max_logged_writes + 1:
+            self.pin_written.emit("... дальнейшие записи в пины не показываются")
+
+
+class BlockSearchWidget(QWidget):
+    """
+    Поиск блока по надписи, значению поля или имени переменной.
+
+    Ввод сразу показывает первый подходящий блок, Enter - следующий,
+    Shift+Enter - предыдущий. Из меню блока сюда же попадают все упоминания
+    переменной или пина (show_references), их поля подсвечиваются.
+    """
+
+    def __init__(self, workspace, parent=None):
+        super().__init__(parent)
+        self.workspace = workspace
+        self.matches = []
+        self.position = -1
+        self.reference = None  # имя или пин, упоминания которого показаны, или None для поиска по словам
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.input = QLineEdit()
+        self.input.setPlaceholderText("Найти блок: поле, переменная или надпись (Ctrl+F)")
+        self.input.setClearButtonEnabled(True)
+        self.input.textChanged.connect(self.search)
+        self.input.returnPressed.connect(self.show_next)
+        for keys in ("Shift+Return", "Shift+Enter"):
+            QShortcut(QKeySequence(keys), self.input, lambda: self.show_next(-1),
+                      context=Qt.ShortcutContext.WidgetShortcut)
+        self.count_label = QLabel()
+        layout.addWidget(self.input)
+        layout.addWidget(self.count_label)
+        # Блоки могли измениться с прошлого поиска: ищем заново по тому же запросу
+        workspace.structure_changed.connect(self.refresh)
+        workspace.block_fields_changed.connect(self.fields_changed)
+
+    def focus(self):
+        self.input.setFocus()
+        self.input.selectAll()
+
+    def search(self, text):
+        if self.reference is not None:
+            self.reference = None
+            self.workspace.clear_reference_highlight()
+        self.matches = self.workspace.find_blocks(text) if text.strip() else []
+        self.position = -1
+        self.show_next()
+
+    def show_references(self, key):
+        self.input.blockSignals(True)
+        self.input.setText(str(key))
+        self.input.blockSignals(False)
+        self.reference = key
+        self.find_references()
+        self.position = -1
+        self.show_next()
+
+    def find_references(self):
+        references = self.workspace.find_references(self.reference)
+        self.workspace.highlight_references(references)
+        self.matches = list(dict.fromkeys(reference.block for reference in references))
+
+    def fields_changed(self, block):
+        # Упоминание могло появиться или пропасть; поиск по словам обновляется при смене запроса
+        if self.reference is not None:
+            self.refresh()
+
+    def refresh(self):
+        if self.reference is not None:
+            self.find_references()
+            self.position = min(self.position, len(self.matches) - 1)
+            self.update_label()
+        elif self.input.text().strip():
+            self.matches = self.workspace.find_blocks(self.input.text())
+            self.position = min(self.position, len(self.matches) - 1)
+            self.update_label()
+
+    def show_next(self, step=1):
+        if self.matches:
+            self.position = (self.position + step) % len(self.matches)
+            self.workspace.show_block(self.matches[self.position])
+            # Развёрнутые блоки и прокрутка не должны забирать ввод у строки поиска
+            self.input.setFocus()
+        self.update_label()
+
+    def update_label(self):
+        if not self.input.text().strip():
+            self.count_label.setText('')
+        elif not self.matches:
+            self.count_label.setText("не найдено")
+        else:
+            self.count_label.setText(f"{self.position + 1} из {len(self.matches)}")
+
+
+class DiagnosticsWidget(QWidget):
+    """Немодальный список ошибок программы с подсветкой блоков на холсте."""
+
+    def __init__(self, workspace, parent=None):
+        super().__init__(parent)
+        self.workspace = workspace
+        self.diagnostics = []
+        self.highlighted_blocks = set()
+        self.highlighted_fields = []
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.list_widget = QListWidget()
+        self.list_widget.setWordWrap(True)
+        self.list_widget.setMaximumHeight(110)
+        self.list_widget.itemClicked.connect(self.show_diagnostic)
+        layout.addWidget(self.list_widget)
+        self.setLayout(layout)
+
+    def set_diagnostics(self, diagnostics):
+        """Показать все ошибки разом и подсветить соответствующие блоки и поля."""
+        self.clear_highlight()
+        self.list_widget.clear()
+        self.diagnostics = list(diagnostics)
+        for diagnostic in self.diagnostics:
+            self.list_widget.addItem(QListWidgetItem(f"{diagnostic.block.text}: {diagnostic.message}"))
+            color = 'orange' if diagnostic.severity == WARNING else 'red'
+            if diagnostic.block not in self.highlighted_blocks:
+                diagnostic.block.setPen(QPen(QColor(color), 3))
+                self.highlighted_blocks.add(diagnostic.block)
+            widget = getattr(diagnostic.block, diagnostic.field, None) if diagnostic.field else None
+            if widget is not None:
+                widget.setProperty('diagnostic_color', color)
+                update_field_style(widget)
+                widget.setToolTip(diagnostic.message)
+                self.highlighted_fields.append(widget)
+        self.setVisible(bool(self.diagnostics))
+
+    def clear_highlight(self):
+        for block in self.highlighted_blocks:
+            if block.scene() is not None:
+                block.setPen(QPen(Qt.GlobalColor.black))
+        for widget in self.highlighted_fields:
+            widget.setProperty('diagnostic_color', None)
+            update_field_style(widget)
+            widget.setToolTip('')
+        self.highlighted_blocks = set()
+        self.highlighted_fields = []
+
+    def show_diagnostic(self, item):
+        """Перейти к блоку с ошибкой и поставить курсор в проблемное поле."""
+        diagnostic = self.diagnostics[self.list_widget.row(item)]
+        if diagnostic.block.scene() is None:
+            return
+        self.workspace.show_block(diagnostic.block)
+        widget = getattr(diagnostic.block, diagnostic.field, None) if diagnostic.field else None
+        if widget is not None:
+            widget.setFocus()
+
+
+class MainWindow(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle('Rudiron visual programming')
+        self.setWindowIcon(QIcon('ico.png'))
+        self.setGeometry(100, 100, 1000, 600)
+        self.started = False
+        self.setupUI()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self.started:
+            self.started = True
+            # Панель пинов и монитор порта достраиваются, когда окно уже на экране
+            QTimer.singleShot(0, self.finish_startup)
+
+    def finish_startup(self):
+        self.pin_config_widget.build_rows()
+        self.serial_monitor.start()
+
+    def setupUI(self):
+        # Основной вертикальный макет
+        main_layout = QVBoxLayout(self)
+
+        # Верхний горизонтальный макет для существующих компонентов
+        top_layout = QHBoxLayout()
+
+        # Block Palette
+        self.palette = BlockPalette(self)
+
+        # Workspace
+        self.workspace = Workspace(self)
+
+        # Run Button
+        self.run_button = QPushButton('Запуск')
+        self.run_button.setStyleSheet('font-size: 16px; height: 40px;')
+        self.run_button.clicked.connect(self.run_program)
+
+        # Симуляция на компьютере без загрузки на плату
+        self.simulation = None
+        self.simulate_button = QPushButton('Симуляция')
+        self.simulate_button.clicked.connect(self.simulate_program)
+        self.speed_combo = QComboBox()
+        self.speed_combo.addItems(list(SIMULATION_SPEEDS))
+
+        # Цифровые пины с постоянным номером - через регистры порта вместо digitalRead/digitalWrite
+        self.fast_io_checkbox = QCheckBox('Быстрый ввод-вывод')
+
+        # Оценка времени выполнения без загрузки на плату
+        self.timing_button = QPushButton('Оценка времени')
+        self.timing_button.clicked.connect(self.estimate_program_timing)
+        self.annotated_blocks = []
+
+        # Программа в JSON: для автоматических тестов (hil.py)
+        self.save_button = QPushButton('Сохранить программу')
+        self.save_button.clicked.connect(self.save_program)
+
+        # Размещение элементов слева
+        left_layout = QVBoxLayout()
+        left_layout.addWidget(QLabel('<h2>Блоки</h2>'))
+        left_layout.addWidget(self.palette)
+        left_layout.addStretch()
+        left_layout.addWidget(self.fast_io_checkbox)
+        left_layout.addWidget(self.timing_button)
+        left_layout.addWidget(self.save_button)
+        left_layout.addWidget(self.speed_combo)
+        left_layout.addWidget(self.simulate_button)
+        left_layout.addWidget(self.run_button)
+
+        # Pin Configuration Widget
+        self.pin_config_widget = PinConfigurationWidget()
+
+        # Список ошибок под рабочей областью
+        self.diagnostics_widget = DiagnosticsWidget(self.workspace)
+        self.diagnostics_widget.setVisible(False)
+        # Поиск блоков над рабочей областью
+        self.search_widget = BlockSearchWidget(self.workspace)
+        QShortcut(QKeySequence.StandardKey.Find, self, self.search_widget.focus)
+        center_layout = QVBoxLayout()
+        center_layout.addWidget(self.search_widget)
+        center_layout.addWidget(self.workspace)
+        center_layout.addWidget(self.diagnostics_widget)
+        self.live_validator = LiveValidator(self.workspace, self.diagnostics_widget, parent=self)
+
+        # Добавление в верхний горизонтальный макет
+        top_layout.addLayout(left_layout)
+        top_layout.addLayout(center_layout)
+        top_layout.addWidget(self.pin_config_widget)
+
+        # Добавление верхнего макета в основной вертикальный макет
+        main_layout.addLayout(top_layout)
+
+        # Монитор портов в нижней части: вкладка на каждое подключение
+        self.serial_monitor = SerialMonitorWidget(self)
+        main_layout.addWidget(self.serial_monitor)
+
+        self.setLayout(main_layout)
+
+    @property
+    def serial_reader(self):
+        """Вкладка монитора, выбранная сейчас: с ней работают загрузка и симуляция."""
+        return self.serial_monitor.current_reader()
+
+    def simulate_program(self):
+        if self.simulation is not None and self.simulation.isRunning():
+            self.simulation.simulator.stop()
+            return
+        analysis = self.live_validator.validate(full=True)
+        if analysis is None:
+            QMessageBox.information(self, "Program", f"Для запуска программы необходим блок 'Начало'")
+            return
+        if not analysis.ok:
+            return
+        virtual_serial = VirtualSerial()
+        clock = VirtualClock(SIMULATION_SPEEDS[self.speed_combo.currentText()])
+        # Программа с "Циклом программы" или таймером не завершается сама - её останавливает пользователь
+        max_steps = None if analysis.program_loop is not None or analysis.timers else 1000000
+        simulator = Simulator(snapshot_chain(StartBlock.start_block), clock=clock, serial=virtual_serial,
+                              max_steps=max_steps)
+        # Вывод симуляции - во вкладку, выбранную в момент запуска
+        self.simulation_reader = self.serial_reader
+        self.simulation_reader.attach_port(virtual_serial)
+        self.simulation = SimulationRunner(simulator, self)
+        self.simulation.pin_written.connect(self.simulation_reader.log)
+        self.simulation.finished_with.connect(self.simulation_finished)
+        self.simulate_button.setText('Остановить')
+        self.simulation.start()
+
+    def estimate_program_timing(self):
+        """Подписать каждый блок его долей во времени одного прохода программы."""
+        for block in self.annotated_blocks:
+            block.set_annotation('')
+        self.annotated_blocks = []
+        analysis = self.live_validator.validate(full=True)
+        if analysis is None:
+            QMessageBox.information(self, "Program", f"Для запуска программы необходим блок 'Начало'")
+            return
+        if not analysis.ok:
+            return
+        report = estimate_timing(StartBlock.start_block, fast_io=self.fast_io_checkbox.isChecked())
+        for cost in report.blocks.values():
+            text = f"{format_duration(cost.inclusive_us)} ({cost.share:.0%})"
+            if cost.block.text == 'Повтор':
+                text += f", ×{cost.iterations}"
+            elif cost.block.text in ('Цикл', 'Цикл программы'):
+                text += ", за итерацию"
+            elif cost.block.text == 'Каждые':
+                text += ", когда подошло время"
+            elif cost.block.text in report.interrupt_load:
+                text += f", прерывание: {report.interrupt_load[cost.block]:.1%} процессора"
+            cost.block.set_annotation(text)
+            self.annotated_blocks.append(cost.block)
+        summary = f"Оценка времени прохода программы: {format_duration(report.total_us)}"
+        if report.per_loop_iteration:
+            summary = f"Оценка времени: setup() и одна итерация loop() - {format_duration(report.total_us)}"
+        if not report.exact:
+            summary += (" (оценка приблизительная: число итераций некоторых циклов или глубина рекурсии "
+                        "неизвестны, посчитано по одной итерации без рекурсии)")
+        if report.interrupt_load:
+            summary += f"; прерывания таймеров занимают {sum(report.interrupt_load.values()):.1%} времени процессора"
+        self.serial_reader.log(summary)
+
+    def save_program(self):
+        """Сохранить программу в JSON, чтобы проверить её через hil.py."""
+        if StartBlock.start_block is None:
+            QMessageBox.information(self, "Program", f"Для запуска программы необходим блок 'Начало'")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Сохранить программу", "program.json", "JSON (*.json)")
+        if not path:
+            return
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(chain_to_data(StartBlock.start_block), file, ensure_ascii=False, indent=2)
+
+    def simulation_finished(self, message):
+        # Забираем вывод, который таймер чтения ещё не успел показать
+        self.simulation_reader.read_serial_data()
+        self.simulation_reader.log(message)
+        self.simulate_button.setText('Симуляция')
+
+    def run_program(self):
+        try:
+            # Find all top-level blocks
+            block = [item for item in self.workspace.scene().items()
+                     if isinstance(item, StartBlock)]
+            # Sort blocks by their vertical position
+            if len(block) == 0:
+                QMessageBox.information(self, "Program", f"Для запуска программы необходим блок 'Начало'")
+                return
+
+            # Один проход анализа по всей программе вместо проверок внутри generate_code
+            analysis = self.live_validator.validate(full=True)
+            if not analysis.ok:
+                return
+            try:
+                rendered_rudiron_code, pin_plan = generate_sketch(block[0], analysis,
+                                                                  self.pin_config_widget.get_manual_modes(),
+                                                                  fast_io=self.fast_io_checkbox.isChecked())
+            except GenerationError as e:
+                QMessageBox.warning(self, "Program", str(e))
+                return
+            self.diagnostics_widget.set_diagnostics(analysis.diagnostics + pin_plan.warnings)
+            QMessageBox.information(
+                self, "Program", f"Ваша программа успешно сгенерированна!")
+            print(rendered_rudiron_code)
+            from .uploader import reset_arduino, upload_to_board, write_sketch
+            write_sketch(rendered_rudiron_code)
+            raise Exception
+            self.serial_reader.disconnect_serial()
+            reset_arduino(self.serial_reader.port_combo.currentText())
+            upload_to_board(self.serial_reader.port_combo.currentText())
+            self.serial_reader.connect_serial()
+        except Exception as e:
+            print(e)
+
+
+def main():
+    app = QApplication(sys.argv)
+    window = MainWindow()
+    window.show()
+    return app.exec()
@@ -0,0 +1,337 @@
+"""
+Автоматическая проверка программы из блоков через последовательный порт.
+
+Программа запускается на плате (после прошивки) или в симуляторе, затем
+тест отправляет в порт данные и ждёт ожидаемый вывод с ограничениями по
+времени. Для каждого теста считаются задержки ответов и скорость приёма.
+
+Симулятор можно подключить через псевдотерминал (Linux, macOS): тогда тест
+работает с ним через pyserial, как с настоящей платой, и запускается на
+CI-сервере без подключённого контроллера.
+
+    python hil.py program.json tests.json --target pty
+    python hil.py program.json tests.json --target board --port COM3
+
+На плату прошивается скетч, сгенерированный из той же программы; --sketch
+прошивает вместо него готовый скетч .ino.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+from .analyzer import analyze_program
+from .codegen import GenerationError, generate_sketch
+from .program import chain_from_data
+from .simulator import SimulationError, SimulationStopped, Simulator, VirtualClock, VirtualSerial
+from .timing import BAUD_RATE
+from .uploader import upload_to_board, write_sketch
+
+# Под каким именем сохраняется скетч, сгенерированный для --target board
+SKETCH_NAME = 'hil'
+
+
+class Send:
+    def __init__(self, data, terminator='\n'):
+        self.data = data
+        self.terminator = terminator
+
+
+class Expect:
+    """Ждать текст в выводе: не позже within_ms и не раньше after_ms после последней отправки."""
+
+    def __init__(self, text, within_ms=1000, after_ms=0):
+        self.text = text
+        self.within_ms = within_ms
+        self.after_ms = after_ms
+
+
+class Pause:
+    def __init__(self, ms):
+        self.ms = ms
+
+
+class SerialTest:
+    def __init__(self, name, steps, min_throughput=None):
+        self.name = name
+        self.steps = steps
+        self.min_throughput = min_throughput  # байт/с, ниже - тест не пройден
+
+
+class TestResult:
+    def __init__(self, name):
+        self.name = name
+        self.passed = True
+        self.message = ''
+        self.latencies_ms = []  # задержка каждого Expect от последней отправки
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.duration_s = 0.0
+
+    def fail(self, message):
+        self.passed = False
+        self.message = message
+
+    @property
+    def throughput(self):
+        """Скорость приёма, байт/с."""
+        return self.bytes_received / self.duration_s if self.duration_s else 0.0
+
+    def summary(self):
+        status = "OK  " if self.passed else "FAIL"
+        text = f"{status} {self.name}: принято {self.bytes_received} Б за {self.duration_s:.3f} с " \
+               f"({self.throughput:.0f} Б/с)"
+        if self.latencies_ms:
+            latencies = self.latencies_ms
+            text += f", задержка мин/сред/макс {min(latencies):.1f}/{sum(latencies) / len(latencies):.1f}/" \
+                    f"{max(latencies):.1f} мс"
+        if self.message:
+            text += f" - {self.message}"
+        return text
+
+
+def load_tests(path):
+    """
+    Тесты из JSON-файла:
+
+    [{"name": "эхо", "min_throughput": 100, "steps": [
+        {"send": "5"}, {"expect": "10", "within_ms": 500, "after_ms": 0}, {"pause": 100}]}]
+    """
+    with open(path, encoding='utf-8') as file:
+        data = json.load(file)
+    tests = []
+    for item in data:
+        steps = []
+        for step in item['steps']:
+            if 'send' in step:
+                steps.append(Send(step['send'], step.get('terminator', '\n')))
+            elif 'expect' in step:
+                steps.append(Expect(step['expect'], step.get('within_ms', 1000), step.get('after_ms', 0)))
+            elif 'pause' in step:
+                steps.append(Pause(step['pause']))
+            else:
+                raise ValueError(f"Неизвестный шаг теста '{item['name']}': {step}")
+        tests.append(SerialTest(item['name'], steps, item.get('min_throughput')))
+    return tests
+
+
+class SimulatedTarget:
+    """Программа в симуляторе; порт - VirtualSerial в том же процессе."""
+
+    def __init__(self, start_block, speed=1):
+        self.start_block = start_block
+        self.speed = speed
+        self.simulator = None
+        self.thread = None
+        self.error = None  # сообщение, если симуляция завершилась ошибкой
+
+    def start(self):
+        virtual_serial = VirtualSerial()
+        self.simulator = Simulator(self.start_block, clock=VirtualClock(self.speed), serial=virtual_serial,
+                                   max_steps=None)
+        self.thread = threading.Thread(target=self.run_simulator, daemon=True)
+        self.thread.start()
+        return virtual_serial
+
+    def run_simulator(self):
+        try:
+            self.simulator.run()
+        except SimulationStopped:
+            pass
+        except SimulationError as e:
+            self.error = str(e)
+
+    def stop(self):
+        self.simulator.stop()
+        self.thread.join()
+
+
+class PtyTarget(SimulatedTarget):
+    """Симулятор за псевдотерминалом: тест открывает его через pyserial, как порт платы."""
+
+    def __init__(self, start_block, speed=1):
+        super().__init__(start_block, speed)
+        self.master = None
+        self.slave = None
+        self.port = None
+        self.bridge = None
+        self.stopping = False
+
+    def start(self):
+        import pty
+        import select
+        import tty
+
+        import serial
+
+        self.master, self.slave = pty.openpty()
+        tty.setraw(self.slave)
+        virtual_serial = super().start()
+        self.stopping = False
+
+        def forward():
+            # Байты между псевдотерминалом и виртуальным портом симулятора
+            while not self.stopping:
+                readable, _, _ = select.select([self.master], [], [], 0.005)
+                if readable:
+                    virtual_serial.write(os.read(self.master, 4096))
+                data = virtual_serial.read_all()
+                if data:
+                    os.write(self.master, data)
+
+        self.bridge = threading.Thread(target=forward, daemon=True)
+        self.bridge.start()
+        self.port = serial.Serial(os.ttyname(self.slave), BAUD_RATE, timeout=0)
+        return self.port
+
+    def stop(self):
+        self.port.close()
+        self.stopping = True
+        self.bridge.join()
+        super().stop()
+        os.close(self.master)
+        os.close(self.slave)
+
+
+class BoardTarget:
+    """Настоящая плата: при необходимости прошивается скетчем, затем открывается её порт."""
+
+    def __init__(self, port_name, sketch_path=None, baud=BAUD_RATE, boot_s=2):
+        self.port_name = port_name
+        self.sketch_path = sketch_path
+        self.baud = baud
+        self.boot_s = boot_s
+        self.port = None
+        self.error = None
+
+    def start(self):
+        import serial
+
+        if self.sketch_path is not None:
+            if not upload_to_board(self.port_name, os.path.abspath(self.sketch_path)):
+                raise RuntimeError(f"Не удалось прошить плату на порту {self.port_name}")
+            time.sleep(self.boot_s)
+        self.port = serial.Serial(self.port_name, self.baud, timeout=0)
+        self.port.reset_input_buffer()
+        return self.port
+
+    def stop(self):
+        self.port.close()
+
+
+class SerialTestRunner:
+    """
+    Выполняет тесты по очереди в одном сеансе: программа запускается один раз,
+    и каждый следующий тест продолжает общение с ней.
+    """
+
+    def __init__(self, target, poll_s=0.001):
+        self.target = target
+        self.poll_s = poll_s
+        self.port = None
+        self.received = ''
+        self.position = 0  # до этого места вывод уже сопоставлен с ожиданиями
+
+    def run(self, tests):
+        self.port = self.target.start()
+        self.received = ''
+        self.position = 0
+        try:
+            return [self.run_test(test) for test in tests]
+        finally:
+            self.target.stop()
+
+    def receive(self, result):
+        data = self.port.read_all()
+        if data:
+            result.bytes_received += len(data)
+            self.received += data.decode('ascii', errors='replace')
+
+    def run_test(self, test):
+        result = TestResult(test.name)
+        started = time.perf_counter()
+        reference = started
+        for step in test.steps:
+            if isinstance(step, Send):
+                data = (step.data + step.terminator).encode('utf-8')
+                self.port.write(data)
+                result.bytes_sent += len(data)
+                reference = time.perf_counter()
+            elif isinstance(step, Pause):
+                deadline = time.perf_counter() + step.ms / 1000
+                while time.perf_counter() < deadline:
+                    self.receive(result)
+                    time.sleep(self.poll_s)
+            elif not self.expect(step, reference, result):
+                break
+        self.receive(result)
+        result.duration_s = time.perf_counter() - started
+        if result.passed and test.min_throughput is not None and result.throughput < test.min_throughput:
+            result.fail(f"скорость приёма {result.throughput:.0f} Б/с ниже {test.min_throughput} Б/с")
+        if self.target.error:
+            result.fail(f"ошибка симуляции: {self.target.error}")
+        return result
+
+    def expect(self, step, reference, result):
+        deadline = reference + step.within_ms / 1000
+        while True:
+            self.receive(result)
+            index = self.received.find(step.text, self.position)
+            now = time.perf_counter()
+            if index >= 0:
+                latency_ms = (now - reference) * 1000
+                result.latencies_ms.append(latency_ms)
+                self.position = index + len(step.text)
+                if latency_ms < step.after_ms:
+                    result.fail(f"'{step.text}' пришло через {latency_ms:.1f} мс, раньше {step.after_ms} мс")
+                    return False
+                return True
+            if now > deadline or self.target.error:
+                tail = self.received[self.position:][-80:]
+                result.fail(f"за {step.within_ms} мс не пришло '{step.text}', получено: {tail!r}")
+                return False
+            time.sleep(self.poll_s)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Проверка программы из блоков через последовательный порт")
+    parser.add_argument('program', help="программа в JSON (кнопка 'Сохранить программу')")
+    parser.add_argument('tests', help="тесты в JSON")
+    parser.add_argument('--target', choices=['simulate', 'pty', 'board'], default='simulate')
+    parser.add_argument('--port', help="порт платы для --target board")
+    parser.add_argument('--sketch', help="готовый скетч .ino для прошивки вместо сгенерированного из программы")
+    parser.add_argument('--speed', type=float, default=1, help="скорость времени симулятора (0 - максимальная)")
+    args = parser.parse_args(argv)
+
+    with open(args.program, encoding='utf-8') as file:
+        start_block = chain_from_data(json.load(file))
+    tests = load_tests(args.tests)
+    if args.target == 'board' and not args.port:
+        parser.error("для --target board нужен --port")
+    analysis = analyze_program(start_block)
+    if not analysis.ok:
+        for diagnostic in analysis.diagnostics:
+            print(f"{diagnostic.block.text}: {diagnostic.message}")
+        return 2
+    if args.target == 'board':
+        sketch_path = args.sketch
+        if sketch_path is None:
+            try:
+                sketch_path = write_sketch(generate_sketch(start_block, analysis)[0], name=SKETCH_NAME)
+            except GenerationError as e:
+                print(e)
+                return 2
+        target = BoardTarget(args.port, sketch_path)
+    else:
+        target = PtyTarget(start_block, args.speed) if args.target == 'pty' else SimulatedTarget(start_block, args.speed)
+
+    results = SerialTestRunner(target).run(tests)
+    for result in results:
+        print(result.summary())
+    return 0 if all(result.passed for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""
+История правок рабочей области для отмены и повтора.
+
+Правка структуры (добавление, перемещение, присоединение, отсоединение,
+удаление) хранится как разница: состояния только тех блоков, которые она
+изменила, до и после. Поэтому тысячи шагов занимают немного памяти, а отмена
+перемещения большой стопки стоит столько, сколько в ней блоков.
+"""
+import time
+from collections import deque, namedtuple
+
+from PyQt6.QtWidgets import QComboBox, QGraphicsItem
+
+# Сколько шагов хранится для отмены
+UNDO_LIMIT = 5000
+
+# Связи, родитель и положение блока. child_blocks - кортеж или None для блоков без тела,
+# collapsed - None для блоков, которые нельзя свернуть.
+BlockState = namedtuple('BlockState', 'prev_block next_block parent_block parent_item x y movable z '
+                                      'child_blocks height in_scene collapsed')
+
+
+def capture(block):
+    pos = block.pos()
+    child_blocks = getattr(block, 'child_blocks', None)
+    return BlockState(block.prev_block, block.next_block, block.parent_block, block.parentItem(), pos.x(), pos.y(),
+                      bool(block.flags() & QGraphicsItem.GraphicsItemFlag.ItemIsMovable), block.zValue(),
+                      tuple(child_blocks) if child_blocks is not None else None, block.height,
+                      block.scene() is not None, getattr(block, 'collapsed', None))
+
+
+def restore(states, scene):
+    for block, state in states.items():
+        block.prev_block = state.prev_block
+        block.next_block = state.next_block
+        block.parent_block = state.parent_block
+        if block.parentItem() is not state.parent_item:
+            block.setParentItem(state.parent_item)
+        if state.child_blocks is not None:
+            block.child_blocks = list(state.child_blocks)
+        block.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable, state.movable)
+        block.setZValue(state.z)
+        block.height = state.height
+        if state.collapsed is not None:
+            block.collapsed = state.collapsed
+    # Вложенные блоки попадают на сцену вместе с родителем, добавляем и убираем только верхние
+    for block, state in states.items():
+        if state.parent_item is None:
+            if state.in_scene and block.scene() is None:
+                scene.addItem(block)
+            elif not state.in_scene and block.scene() is not None:
+                scene.removeItem(block)
+    for block, state in states.items():
+        block.setPos(state.x, state.y)
+        block.restored()
+
+
+def affected_blocks(block):
+    """Блоки, которые может задеть правка структуры у block: его стопка и стопки объемлющих блоков."""
+    blocks = set(block.get_all_connected_blocks())
+    parent = block.parent_block
+    while parent is not None:
+        blocks |= parent.get_all_connected_blocks()
+        parent = parent.parent_block
+    return blocks
+
+
+class StructureChange:
+    def __init__(self, description, blocks):
+        self.description = description
+        self.before = {block: capture(block) for block in blocks}
+        self.after = {}
+
+    def include(self, blocks):
+        """Запомнить исходное состояние ещё не учтённых блоков, пока правка их не изменила."""
+        for block in blocks:
+            if block not in self.before:
+                self.before[block] = capture(block)
+
+    def finish(self):
+        """Оставить только изменившиеся блоки; False, если правка ничего не изменила."""
+        after = {block: capture(block) for block in self.before}
+        changed = [block for block, state in self.before.items() if after[block] != state]
+        self.before = {block: self.before[block] for block in changed}
+        self.after = {block: after[block] for block in changed}
+        return bool(changed)
+
+    def undo(self, scene):
+        restore(self.before, scene)
+
+    def redo(self, scene):
+        restore(self.after, scene)
+
+
+def set_field(block, name, value):
+    widget = getattr(block, name)
+    if isinstance(widget, QComboBox):
+        widget.setCurrentText(value)
+    else:
+        widget.setText(value)
+
+
+class FieldEdit:
+    """Правка поля блока. Ввод в то же поле без долгих пауз сливается в один шаг."""
+
+    description = "Изменение поля"
+    merge_window_s = 2.0
+
+    def __init__(self, block, name, old, new):
+        self.block = block
+        self.name = name
+        self.old = old
+        self.new = new
+        self.time = time.monotonic()
+
+    def merge(self, block, name, new):
+        now = time.monotonic()
+        if block is not self.block or name != self.name or now - self.time > self.merge_window_s:
+            return False
+        self.new = new
+        self.time = now
+        return True
+
+    def undo(self, scene):
+        set_field(self.block, self.name, self.old)
+
+    def redo(self, scene):
+        set_field(self.block, self.name, self.new)
+
+
+class FieldsEdit:
+    """Согласованная правка нескольких полей (например, переименование переменной) - один шаг истории."""
+
+    def __init__(self, description, edits):
+        self.description = description
+        self.edits = edits  # (блок, имя поля, старое значение, новое значение)
+
+    def undo(self, scene):
+        for block, name, old, new in reversed(self.edits):
+            set_field(block, name, old)
+
+    def redo(self, scene):
+        for block, name, old, new in self.edits:
+            set_field(block, name, new)
+
+
+class History:
+    """
+    Стек отмены и повтора.
+
+    Правка структуры оформляется так: begin() с блоками, которые она может
+    изменить, при необходимости include() для блоков, которые стали известны
+    позже (например, блок, к которому присоединяют), и commit() после правки.
+    """
+
+    def __init__(self, scene, limit=UNDO_LIMIT):
+        self.scene = scene
+        self.undo_stack = deque(maxlen=limit)
+        self.redo_stack = []
+        self.pending = None
+        self.applying = False  # True во время отмены и повтора: их изменения полей не записываются
+
+    def begin(self, description, blocks):
+        self.pending = StructureChange(description, blocks)
+
+    def include(self, blocks):
+        if self.pending is not None:
+            self.pending.include(blocks)
+
+    def commit(self):
+        change, self.pending = self.pending, None
+        if change is not None and change.finish():
+            self.push(change)
+
+    def push(self, command):
+        self.undo_stack.append(command)
+        self.redo_stack.clear()
+
+    def execute(self, command):
+        """Выполнить готовую правку и записать её одним шагом."""
+        self.apply(command.redo)
+        self.push(command)
+
+    def record_field(self, block, name, old, new):
+        if self.applying:
+            return
+        top = self.undo_stack[-1] if self.undo_stack else None
+        if isinstance(top, FieldEdit) and not self.redo_stack and top.merge(block, name, new):
+            return
+        self.push(FieldEdit(block, name, old, new))
+
+    def undo(self):
+        """Отменить последний шаг; возвращает его или None, если отменять нечего."""
+        if not self.undo_stack:
+            return None
+        command = self.undo_stack.pop()
+        self.apply(command.undo)
+        self.redo_stack.append(command)
+        return command
+
+    def redo(self):
+        if not self.redo_stack:
+            return None
+        command = self.redo_stack.pop()
+        self.apply(command.redo)
+        self.undo_stack.append(command)
+        return command
+
+    def apply(self, action):
+        self.applying = True
+        try:
+            action(self.scene)
+        finally:
+            self.applying = False
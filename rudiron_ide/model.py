@@ -0,0 +1,1808 @@
+"""
+Блоки на холсте: внешний вид, поля ввода, соединение в цепочки и генерация
+кода каждого блока. Палитра и фабрика блоков по тексту (create_block).
+"""
+from PyQt6.QtWidgets import (
+    QGraphicsSimpleTextItem, QGraphicsItem, QPushButton, QGraphicsTextItem, QGraphicsPathItem, QLineEdit,
+    QGraphicsProxyWidget, QComboBox
+)
+from PyQt6.QtGui import QBrush, QColor, QPen, QPainterPath, QFont
+from PyQt6.QtCore import Qt, QRectF, QPointF
+
+from .history import affected_blocks, set_field
+from .codegen import CodeGenerator
+from .validation import ARRAY_TYPES, RESULT_TYPES, VARIABLE_TYPES
+
+
+class Block(QGraphicsPathItem):
+    def __init__(self, text, color, parent=None):
+        super().__init__(parent)
+        self.text = text
+        self.color = color
+        self.width = 160
+        self.height = 40
+        self.setFlags(
+            QGraphicsItem.GraphicsItemFlag.ItemIsSelectable |
+            QGraphicsItem.GraphicsItemFlag.ItemIsMovable
+        )
+        self.next_block = None
+        self.prev_block = None
+        self.parent_block = None
+        self.highlighted_block = None
+        self.dragging_from_top = False  # To track where the block is grabbed
+        self.initial_positions = {}
+        self.connected_blocks = set()  # стопка, которую тащат, - собирается один раз при нажатии
+        self.setZValue(1)  # Ensure blocks are above the background
+
+    def initUI(self, width=None, height=None):
+        path = QPainterPath()
+        width = self.width
+        height = self.height
+        notch_size = 5
+        tab_width = 20
+        tab_height = 5
+
+        # Create the block shape with a top notch and bottom tab
+        path.moveTo(0, notch_size)
+        path.lineTo(tab_width, notch_size)
+        path.lineTo(tab_width + notch_size, 0)
+        path.lineTo(width - (tab_width + notch_size), 0)
+        path.lineTo(width - tab_width, notch_size)
+        path.lineTo(width, notch_size)
+        path.lineTo(width, height - tab_height)
+        path.lineTo(width - tab_width, height - tab_height)
+        path.lineTo(width - (tab_width + notch_size), height)
+        path.lineTo(tab_width + notch_size, height)
+        path.lineTo(tab_width, height - tab_height)
+        path.lineTo(0, height - tab_height)
+        path.closeSubpath()
+
+        self.setPath(path)
+        self.setBrush(QBrush(self.color))
+        self.setPen(QPen(Qt.GlobalColor.black))
+
+        # Add text
+        # self.text_item = QGraphicsTextItem(self.text, self)
+        # font = QFont('Arial', 12)
+        # self.text_item.setFont(font)
+        # text_rect = self.text_item.boundingRect()
+        # self.text_item.setPos(
+        #     (width - text_rect.width()) / 2, (height - text_rect.height()) / 2)
+
+    def mousePressEvent(self, event):
+        # Set focus to the workspace
+        if self.scene().views():
+            self.scene().views()[0].setFocus()
+
+        # Determine where the user clicked (top or bottom half)
+        click_position = event.pos().y()
+        block_height = self.boundingRect().height()
+        self.dragging_from_top = click_position < (block_height / 2)
+
+        # Store initial positions of all connected blocks
+        self.initial_positions = {}
+        self.connected_blocks = self.get_all_connected_blocks()
+        for block in self.connected_blocks:
+            # Блоки тела двигаются вместе с управляющим блоком, их положение не трогаем
+            if block is self or block.parentItem() not in self.connected_blocks:
+                # Store the scene positions
+                self.initial_positions[block] = block.mapToScene(QPointF(0, 0))
+        # Перемещение и присоединение отменяются одним шагом
+        history = self.history()
+        if history is not None:
+            history.begin("Перемещение", affected_blocks(self))
+
+        # # Disconnect from previous and next blocks depending on where the block is grabbed
+        # if self.dragging_from_top:
+        #     if self.prev_block:
+        #         self.prev_block.next_block = None
+        #         self.prev_block = None
+        # else:
+        #     if self.next_block:
+        #         self.next_block.prev_block = None
+        #         self.next_block = None
+
+        # # If the block is inside a control block, we need to detach it temporarily
+        # if self.parent_block:
+        #     self.parent_block.remove_child_block(self)
+
+        super().mousePressEvent(event)
+
+    def find_head(self):
+        head = self
+        while head.prev_block:
+            head = head.prev_block
+        return head
+
+    def find_tail(self):
+        tail = self
+        while tail.next_block:
+            tail = tail.next_block
+        return tail
+
+    def mouseMoveEvent(self, event):
+        super().mouseMoveEvent(event)
+
+        # Calculate movement delta in scene coordinates
+        new_scene_pos = self.mapToScene(QPointF(0, 0))
+        delta = new_scene_pos - self.initial_positions[self]
+
+        # Move connected blocks
+        for block in self.initial_positions:
+            if block != self:
+                initial_pos = self.initial_positions[block]
+                # Correct position setting
+                if block.parentItem():
+                    # Convert scene position to parent's coordinate system
+                    parent_pos = block.parentItem().mapFromScene(initial_pos + delta)
+                    block.setPos(parent_pos)
+                else:
+                    block.setPos(initial_pos + delta)
+        head, tail = self.find_head(), self.find_tail()
+        head.check_for_snap(self.connected_blocks)
+        tail.check_for_snap(self.connected_blocks)
+        # self.check_for_snap()
+
+    def mouseReleaseEvent(self, event):
+        super().mouseReleaseEvent(event)
+        head, tail = self.find_head(), self.find_tail()
+        history = self.history()
+        if history is not None:
+            # Присоединение меняет и стопку, к которой присоединяют
+            for target in (head.highlighted_block, tail.highlighted_block):
+                if target is not None:
+                    history.include(affected_blocks(target))
+        head.snap_to_block()
+        tail.snap_to_block()
+        # self.snap_to_block()
+        if history is not None:
+            history.commit()
+        self.notify_structure_changed()
+
+    def mouseDoubleClickEvent(self, event):
+        # Disconnect from previous and next blocks
+        history = self.history()
+        if history is not None:
+            history.begin("Отсоединение", affected_blocks(self))
+        self.disconnect_blocks()
+        if history is not None:
+            history.commit()
+        self.notify_structure_changed()
+        super().mouseDoubleClickEvent(event)
+
+    def contextMenuEvent(self, event):
+        # Поиск и переименование переменных и пинов, которые упоминает блок
+        if self.scene() is None or not self.scene().views():
+            return
+        menu = self.scene().views()[0].reference_menu(self)
+        if menu.isEmpty():
+            event.ignore()
+            return
+        menu.exec(event.screenPos())
+        event.accept()
+
+    def disconnect_blocks(self):
+        # Disconnect from previous block
+        if self.prev_block:
+            self.prev_block.next_block = None
+            self.prev_block = None
+        # Disconnect from next block
+        if self.next_block:
+            self.next_block.prev_block = None
+            self.next_block = None
+        # If it's inside a control block, remove it
+        if self.parent_block:
+            self.parent_block.remove_child_block(self)
+            self.parent_block = None
+
+    def get_all_connected_blocks(self):
+        # Get all connected blocks (both prev and next, and child blocks)
+        blocks = set()
+        stack = [self]
+        while stack:
+            block = stack.pop()
+            if block not in blocks:
+                blocks.add(block)
+                # Include child blocks if it's a ControlBlock
+                if isinstance(block, ControlBlock):
+                    stack.extend(block.child_blocks)
+                # Add connected blocks
+                if block.prev_block:
+                    stack.append(block.prev_block)
+                if block.next_block:
+                    stack.append(block.next_block)
+        return blocks
+
+    # def check_for_snap(self):
+    #     # Reset any previous highlighted block
+    #     if self.highlighted_block:
+    #         self.highlighted_block.setPen(QPen(Qt.GlobalColor.black))
+    #         self.highlighted_block = None
+
+    #     # Highlight potential snap targets
+    #     colliding_items = self.scene().collidingItems(self)
+
+    #     # Filter out child items and self
+    #     connected_blocks = self.get_all_connected_blocks()
+    #     colliding_items = [item for item in colliding_items if item != self and not self.is_descendant_of(item) and item not in connected_blocks]
+
+    #     for item in colliding_items:
+    #         if isinstance(item, ControlBlock):
+    #             if item.is_open_area(self.scenePos()):
+    #                 item.setPen(QPen(QColor('purple'), 2))
+    #                 self.highlighted_block = item
+    #                 return
+    #             else:
+    #                 if self.dragging_from_top and self.is_near(item, above=True):
+    #                     item.setPen(QPen(QColor('green'), 2))
+    #                     self.highlighted_block = item
+    #                     return
+    #                 elif not self.dragging_from_top and self.is_near(item, below=True):
+    #                     item.setPen(QPen(QColor('blue'), 2))
+    #                     self.highlighted_block = item
+    #                     return
+    #         elif isinstance(item, Block):
+    #             if self.dragging_from_top and self.is_near(item, above=True):
+    #                 item.setPen(QPen(QColor('green'), 2))
+    #                 self.highlighted_block = item
+    #                 return
+    #             elif not self.dragging_from_top and self.is_near(item, below=True):
+    #                 item.setPen(QPen(QColor('blue'), 2))
+    #                 self.highlighted_block = item
+    #                 return
+
+    def check_for_snap(self, connected_blocks=None):
+        # Reset any previous highlighted block
+        if self.highlighted_block:
+            self.highlighted_block.setPen(QPen(Qt.GlobalColor.black))
+            self.highlighted_block = None
+
+        # Highlight potential snap targets
+        colliding_items = self.scene().collidingItems(self)
+
+        # Filter out child items and self
+        if connected_blocks is None:
+            connected_blocks = self.get_all_connected_blocks()
+        colliding_items = [item for item in colliding_items if
+                           item != self and not self.is_descendant_of(item) and item not in connected_blocks]
+
+        for item in colliding_items:
+            if isinstance(item, ControlBlock):
+                if item.is_open_area(self.scenePos()):
+                    item.setPen(QPen(QColor('purple'), 2))
+                    self.highlighted_block = item
+                    return
+                else:
+                    if self.is_near(item, above=True):
+                        item.setPen(QPen(QColor('green'), 2))
+                        self.highlighted_block = item
+                        return
+                    elif self.is_near(item, below=True):
+                        item.setPen(QPen(QColor('blue'), 2))
+                        self.highlighted_block = item
+                        return
+            elif isinstance(item, Block):
+                if self.is_near(item, above=True):
+                    item.setPen(QPen(QColor('green'), 2))
+                    self.highlighted_block = item
+                    return
+                elif self.is_near(item, below=True):
+                    item.setPen(QPen(QColor('blue'), 2))
+                    self.highlighted_block = item
+                    return
+
+    def is_descendant_of(self, item):
+        # Check if self is a child or descendant of the given item
+        current = self.parentItem()
+        while current:
+            if current == item:
+                return True
+            current = current.parentItem()
+        return False
+
+    def is_near(self, other_block, above=False, below=False):
+        threshold = 20  # Adjusted threshold for better snapping
+        if above:
+            # Check if the bottom of self is near the top of other_block
+            self_bottom = self.sceneBoundingRect().bottom()
+            other_top = other_block.sceneBoundingRect().top()
+            if abs(self_bottom - other_top) < threshold and abs(
+                    self.scenePos().x() - other_block.scenePos().x()) < threshold:
+                return True
+        if below:
+            # Check if the top of self is near the bottom of other_block
+            self_top = self.sceneBoundingRect().top()
+            other_bottom = other_block.sceneBoundingRect().bottom()
+            if abs(self_top - other_bottom) < threshold and abs(
+                    self.scenePos().x() - other_block.scenePos().x()) < threshold:
+                return True
+        return False
+
+    # def snap_to_block(self):
+    #     if self.highlighted_block:
+    #         # Reset pen of the highlighted block
+    #         self.highlighted_block.setPen(QPen(Qt.GlobalColor.black))
+
+    #         # Disconnect any existing connections
+    #         # Only disconnect if not snapping into a control block
+    #         # if not (isinstance(self.highlighted_block, ControlBlock) and self.highlighted_block.is_open_area(self.scenePos())):
+    #         #     self.disconnect_blocks()
+
+    #         if isinstance(self.highlighted_block, ControlBlock) and self.highlighted_block.is_open_area(self.scenePos()):
+    #             # Snap into the control block
+    #             if len(self.highlighted_block.child_blocks):
+    #                 self.highlighted_block.child_blocks[-1].next_block = self
+    #                 self.prev_block = self.highlighted_block.child_blocks[-1]
+    #             self.highlighted_block.add_child_blocks(self)
+    #         else:
+    #             if self.dragging_from_top and self.is_near(self.highlighted_block, above=True):
+    #                 if self.highlighted_block.prev_block is not None and self.highlighted_block.prev_block != self:
+    #                     self.prev_block = self.highlighted_block.prev_block
+    #                     self.highlighted_block.prev_block.next_block = self
+    #                     self.prev_block.move_up(self.boundingRect().height())
+    #                 # Snap the bottom of self to the top of the highlighted block
+    #                 self.next_block = self.highlighted_block
+    #                 self.highlighted_block.prev_block = self
+
+    #                 # Align positions
+    #                 new_x = self.highlighted_block.scenePos().x()
+    #                 new_y = self.highlighted_block.scenePos().y() - self.boundingRect().height() + 2
+    #                 self.setPos(new_x, new_y)
+    #                 prev_block = self.prev_block
+    #                 while prev_block is not None:
+    #                     if prev_block.parent_block is not None:
+    #                         prev_block.parent_block.add_child_blocks(self)
+    #                     prev_block = prev_block.prev_block
+    #             elif not self.dragging_from_top and self.is_near(self.highlighted_block, below=True):
+    #                 print(self.highlighted_block)
+    #                 if self.highlighted_block.next_block is not None and self.highlighted_block.next_block != self:
+    #                     self.next_block = self.highlighted_block.next_block
+    #                     self.highlighted_block.next_block.prev_block = self
+    #                     self.next_block.move_down(self.boundingRect().height(), False)
+    #                 # Snap the top of self to the bottom of the highlighted block
+    #                 self.prev_block = self.highlighted_block
+    #                 self.highlighted_block.next_block = self
+
+    #                 # Align positions
+    #                 new_x = self.highlighted_block.scenePos().x()
+    #                 new_y = self.highlighted_block.scenePos().y() + self.highlighted_block.boundingRect().height() - 2
+    #                 self.setPos(new_x, new_y)
+    #                 prev_block = self.prev_block
+    #                 while prev_block is not None:
+    #                     if prev_block.parent_block is not None:
+    #                         prev_block.parent_block.add_child_blocks(self)
+    #                     prev_block = prev_block.parent_block
+
+    #         self.highlighted_block = None
+    #     else:
+    #         # If not snapped to anything, ensure the block is standalone
+    #         pass  # Do not disconnect here to maintain existing connections
+    def reposition_next_blocks(self):
+        y_offset = self.height + self.y()
+        current = self.next_block
+        while current:
+            current.setPos(self.x(), y_offset)
+            y_offset += current.boundingRect().height()
+            if isinstance(current, ControlBlock):
+                current.reposition_child_blocks()
+            current = current.next_block
+
+    def reposition_prev_blocks(self):
+        y_offset = -self.height + self.y()
+        current = self.prev_block
+        while current:
+            current.setPos(self.x(), y_offset)
+            y_offset -= current.boundingRect().height()
+            if isinstance(current, ControlBlock):
+                current.reposition_child_blocks()
+            current = current.prev_block
+
+    def snap_to_block(self):
+        if self.highlighted_block:
+            # Reset pen of the highlighted block
+            self.highlighted_block.setPen(QPen(Qt.GlobalColor.black))
+
+            # Disconnect any existing connections
+            # Only disconnect if not snapping into a control block
+            # if not (isinstance(self.highlighted_block, ControlBlock) and self.highlighted_block.is_open_area(self.scenePos())):
+            #     self.disconnect_blocks()
+
+            if isinstance(self.highlighted_block, ControlBlock) and self.highlighted_block.is_open_area(
+                    self.scenePos()):
+                # Snap into the control block
+                if len(self.highlighted_block.child_blocks):
+                    self.highlighted_block.child_blocks[-1].next_block = self
+                    self.prev_block = self.highlighted_block.child_blocks[-1]
+                self.highlighted_block.add_child_blocks(self)
+            else:
+                if self.is_near(self.highlighted_block, above=True):
+                    if self.highlighted_block.prev_block is not None and self.highlighted_block.prev_block != self:
+                        self.prev_block = self.highlighted_block.prev_block
+                        self.highlighted_block.prev_block.next_block = self
+                        self.prev_block.move_up(self.boundingRect().height())
+                    # Snap the bottom of self to the top of the highlighted block
+                    self.next_block = self.highlighted_block
+                    self.highlighted_block.prev_block = self
+
+                    # Align positions
+                    new_x = self.highlighted_block.scenePos().x()
+                    new_y = self.highlighted_block.scenePos().y() - self.boundingRect().height() + 2
+                    self.setPos(new_x, new_y)
+                    prev_block = self.prev_block
+                    while prev_block is not None:
+                        if prev_block.parent_block is not None:
+                            prev_block.parent_block.add_child_blocks(self)
+                        prev_block = prev_block.prev_block
+                    self.reposition_prev_blocks()
+                elif self.is_near(self.highlighted_block, below=True):
+                    if self.highlighted_block.next_block is not None and self.highlighted_block.next_block != self:
+                        self.next_block = self.highlighted_block.next_block
+                        self.highlighted_block.next_block.prev_block = self
+                        self.next_block.move_down(self.boundingRect().height(), False)
+                    # Snap the top of self to the bottom of the highlighted block
+                    self.prev_block = self.highlighted_block
+                    self.highlighted_block.next_block = self
+
+                    # Align positions
+                    new_x = self.highlighted_block.scenePos().x()
+                    new_y = self.highlighted_block.scenePos().y() + self.highlighted_block.boundingRect().height() - 2
+                    self.setPos(new_x, new_y)
+                    prev_block = self.prev_block
+                    while prev_block is not None:
+                        if prev_block.parent_block is not None:
+                            prev_block.parent_block.add_child_blocks(self)
+                        prev_block = prev_block.parent_block
+                    self.reposition_next_blocks()
+
+            self.highlighted_block = None
+        else:
+            # If not snapped to anything, ensure the block is standalone
+            pass  # Do not disconnect here to maintain existing connections
+
+    def move_up(self, delta_y=20, move_parent_block=False):
+        """
+        Moves the block upward by delta_y pixels.
+        Also moves all connected previous blocks accordingly.
+        """
+        if self.parent_block and move_parent_block:
+            # If the block is nested inside a control block, move the entire control block
+            self.parent_block.move_up(delta_y)
+            return
+
+        # Move this block
+        current_pos = self.scenePos()
+        new_pos = QPointF(current_pos.x(), current_pos.y() - delta_y)
+        self.setPos(new_pos)
+
+        # Move connected next blocks
+        if self.prev_block is not None:
+            self.prev_block.move_up(delta_y)
+
+    def move_down(self, delta_y=20, move_parent_block=False):
+        """
+        Moves the block downward by delta_y pixels.
+        Also moves all connected next blocks accordingly.
+        """
+        if self.parent_block and move_parent_block:
+            # If the block is nested inside a control block, move the entire control block
+            self.parent_block.move_down(delta_y)
+            return
+
+        # Move this block
+        current_pos = self.scenePos()
+        new_pos = QPointF(current_pos.x(), current_pos.y() + delta_y)
+        self.setPos(new_pos)
+
+        # Move connected next blocks
+        if self.next_block:
+            self.next_block.move_down(delta_y)
+        """
+        Moves the block downward by delta_y pixels.
+        Also moves all connected next blocks accordingly.
+        """
+        if self.parent_block and move_parent_block:
+            # If the block is nested inside a control block, move the entire control block
+            self.parent_block.move_down(delta_y)
+            return
+
+        # Move this block
+        current_pos = self.scenePos()
+        new_pos = QPointF(current_pos.x(), current_pos.y() + delta_y)
+        self.setPos(new_pos)
+
+        # Move connected next blocks
+        if self.next_block:
+            self.next_block.move_down(delta_y)
+
+    def generate_code(self, recursion_depth=0, sketch=None):
+        """Код цепочки блоков начиная с этого; генерирует codegen.CodeGenerator."""
+        return CodeGenerator(sketch).chain(self, recursion_depth)
+
+    def field_widgets(self):
+        """Поля ввода блока (QLineEdit и QComboBox) по именам атрибутов."""
+        widgets = {}
+        for name in ('text_field', 'text_field1', 'text_field2', 'text_field3', 'combo_box'):
+            widget = getattr(self, name, None)
+            if isinstance(widget, (QLineEdit, QComboBox)):
+                widgets[name] = widget
+        return widgets
+
+    def fields(self):
+        """Текущие значения полей ввода блока, по именам виджетов."""
+        values = {}
+        for name, widget in self.field_widgets().items():
+            if isinstance(widget, QLineEdit):
+                values[name] = widget.text()
+            else:
+                values[name] = widget.currentText()
+        return values
+
+    def watch_fields(self):
+        # Любая правка поля запускает живую проверку этого блока и попадает в историю правок
+        self.field_values = self.fields()
+        for name, widget in self.field_widgets().items():
+            if isinstance(widget, QLineEdit):
+                widget.textChanged.connect(self.notify_fields_changed)
+                widget.textChanged.connect(lambda text, name=name: self.field_edited(name, text))
+            else:
+                widget.currentTextChanged.connect(self.notify_fields_changed)
+                widget.currentTextChanged.connect(lambda text, name=name: self.field_edited(name, text))
+
+    def field_edited(self, name, text):
+        old = self.field_values.get(name)
+        self.field_values[name] = text
+        history = self.history()
+        if history is not None and old != text:
+            history.record_field(self, name, old, text)
+
+    def history(self):
+        """История правок рабочей области, в которой находится блок."""
+        if self.scene() is not None and self.scene().views():
+            return self.scene().views()[0].history
+        return None
+
+    def restored(self):
+        """Вызывается после отмены или повтора правки, которая изменила этот блок."""
+        pass
+
+    def notify_fields_changed(self, *args):
+        if self.scene() is not None and self.scene().views():
+            self.scene().views()[0].block_fields_changed.emit(self)
+
+    def notify_structure_changed(self):
+        if self.scene() is not None and self.scene().views():
+            self.scene().views()[0].structure_changed.emit()
+
+    def add_row(self, parts, delta=5, height=None):
+        """
+        Разместить подписи и поля ввода в одну строку слева направо.
+
+        parts - строки (подписи) и пары (имя атрибута, ширина QLineEdit или список вариантов QComboBox).
+        height - высота строки, по середине которой выравниваются элементы (по умолчанию - высота блока).
+        """
+        height = height if height is not None else self.height
+        x = delta * 2
+        for part in parts:
+            if isinstance(part, str):
+                item = QGraphicsTextItem(part, self)
+                item.setFont(QFont('Arial', 10))
+                rect = item.boundingRect()
+                item.setPos(x, (height - rect.height()) / 2)
+                x += rect.width()
+                continue
+            name, spec = part
+            if isinstance(spec, list):
+                widget = QComboBox()
+                widget.addItems(spec)
+                widget.setFont(QFont('Arial', 8))
+            else:
+                widget = QLineEdit()
+                widget.setFont(QFont('Arial', 10))
+                widget.setFixedWidth(spec)
+            setattr(self, name, widget)
+            proxy = QGraphicsProxyWidget(self)
+            proxy.setWidget(widget)
+            proxy.setParentItem(self)
+            proxy.setZValue(2)
+            rect = proxy.boundingRect()
+            proxy.setPos(x, (height - rect.height()) / 2)
+            x += rect.width() + delta
+
+    def set_annotation(self, text):
+        """Подпись справа от блока (например, оценка времени); пустая строка убирает её."""
+        annotation = getattr(self, 'annotation_item', None)
+        if not text:
+            if annotation is not None:
+                annotation.setVisible(False)
+            return
+        if annotation is None:
+            annotation = QGraphicsSimpleTextItem(self)
+            annotation.setFont(QFont('Arial', 8))
+            self.annotation_item = annotation
+        annotation.setText(text)
+        annotation.setPos(self.width + 4, 2)
+        annotation.setVisible(True)
+
+    def suicide(self):
+        self.disconnect_blocks()
+        self.notify_structure_changed()
+        self.scene().removeItem(self)
+
+
+class StartBlock(Block):
+    start_block = None
+
+    def __init__(self, text, color, parent=None):
+        if StartBlock.start_block is not None:
+            StartBlock.start_block.suicide()
+            StartBlock.start_block = None
+        super().__init__(text, color, parent)
+        self.child_blocks = []
+        # self.width = 120
+        self.setZValue(1)  # Control blocks are below child blocks
+        self.initUI()
+        StartBlock.start_block = self
+
+    def initUI(self):
+        super().initUI()
+        width = self.width
+        height = self.height
+        delta = 5
+
+        # Add text
+        self.text_item = QGraphicsTextItem("Начало", self)
+        font = QFont('Arial', 20)
+        self.text_item.setFont(font)
+        text_rect = self.text_item.boundingRect()
+        self.text_item.setPos((self.width - text_rect.width()) // 2, (height - text_rect.height()) / 2)
+
+    def suicide(self):
+        StartBlock.start_block = None
+        super().suicide()
+
+    def restored(self):
+        # Отмена и повтор возвращают блок "Начало" на сцену или убирают его
+        if self.scene() is not None:
+            StartBlock.start_block = self
+        elif StartBlock.start_block is self:
+            StartBlock.start_block = None
+
+
+class VariableBlock(Block):
+    def __init__(self, text, color, parent=None):
+        super().__init__(text, color, parent)
+        self.width = 200
+        self.child_blocks = []
+        self.setZValue(1)  # Control blocks are below child blocks
+        self.initUI()
+
+    def initUI(self):
+        super().initUI()
+        width = self.width
+        height = self.height
+        delta = 5
+
+        # Тип переменной; "авто" - как раньше, тип выводится из значения
+        self.combo_box = QComboBox()
+        self.combo_box.addItems(VARIABLE_TYPES)
+        self.combo_box.setFont(QFont('Arial', 8))
+        self.combo_box_proxy = QGraphicsProxyWidget(self)
+        self.combo_box_proxy.setWidget(self.combo_box)
+        self.combo_box_proxy.setParentItem(self)
+        type_rect = self.combo_box_proxy.boundingRect()
+        self.combo_box_proxy.setPos(delta * 3, (height - type_rect.height()) / 2)
+        self.combo_box_proxy.setZValue(2)
+        offset = delta * 3 + type_rect.width()
+
+        #
+        self.text_field1 = QLineEdit()
+        self.text_field1.setFont(QFont('Arial', 10))
+        self.text_field1.setFixedWidth(40)
+        self.text_field_proxy = QGraphicsProxyWidget(self)
+        self.text_field_proxy.setWidget(self.text_field1)
+        self.text_field_proxy.setParentItem(self)
+        text_rect = self.text_field_proxy.boundingRect()
+        self.text_field_proxy.setPos(offset + delta, (height - text_rect.height()) / 2)
+
+        # Add text
+        self.text_item = QGraphicsTextItem("=", self)
+        font = QFont('Arial', 16)
+        self.text_item.setFont(font)
+        text_rect_1 = self.text_item.boundingRect()
+        self.text_item.setPos(offset + delta + text_rect.width(), (height - text_rect_1.height()) / 2)
+
+        #
+        self.text_field2 = QLineEdit()
+        self.text_field2.setFont(QFont('Arial', 10))
+        self.text_field2.setFixedWidth(40)
+        self.text_field_proxy = QGraphicsProxyWidget(self)
+        self.text_field_proxy.setWidget(self.text_field2)
+        self.text_field_proxy.setParentItem(self)
+        text_rect_2 = self.text_field_proxy.boundingRect()
+        self.text_field_proxy.setPos(offset + delta + text_rect.width() + text_rect_1.width(),
+                                     (self.height - text_rect_2.height()) / 2)
+
+
+class ArithmeticBlock(Block):
+    def __init__(self, text, color, parent=None):
+        super().__init__(text, color, parent)
+        self.child_blocks = []
+        self.setZValue(1)  # Control blocks are below child blocks
+        self.initUI()
+
+    def initUI(self):
+        super().initUI()
+        width = self.width
+        height = self.height
+        delta = 5
+
+        #
+        self.text_field1 = QLineEdit()
+        self.text_field1.setFont(QFont('Arial', 10))
+        self.text_field1.setFixedWidth(25)
+        self.text_field_proxy = QGraphicsProxyWidget(self)
+        self.text_field_proxy.setWidget(self.text_field1)
+        self.text_field_proxy.setParentItem(self)
+        text_rect = self.text_field_proxy.boundingRect()
+        self.text_field_proxy.setPos(delta * 1, (height - text_rect.height()) / 2)
+
+        # Add text
+        self.text_item = QGraphicsTextItem("=", self)
+        font = QFont('Arial', 13)
+        self.text_item.setFont(font)
+        text_rect_1 = self.text_item.boundingRect()
+        self.text_item.setPos(delta * 1 + text_rect.width(), (height - text_rect_1.height()) / 2)
+
+        #
+        self.text_field2 = QLineEdit()
+        self.text_field2.setFont(QFont('Arial', 10))
+        self.text_field2.setFixedWidth(25)
+        self.text_field_proxy = QGraphicsProxyWidget(self)
+        self.text_field_proxy.setWidget(self.text_field2)
+        self.text_field_proxy.setParentItem(self)
+        text_rect_2 = self.text_field_proxy.boundingRect()
+        self.text_field_proxy.setPos(int(delta * 1.5) + text_rect.width() + delta * 0 + text_rect_1.width(),
+                                     (self.height - text_rect_2.height()) / 2)
+
+        # Add combo box
+        self.combo_box = QComboBox()
+        self.combo_box.addItems(['*', '-', '+', '/', '//', '%'])
+        self.combo_box.setFont(QFont('Arial', 8))
+
+        self.combo_box_proxy = QGraphicsProxyWidget(self)
+        self.combo_box_proxy.setWidget(self.combo_box)
+        text_rect3 = self.combo_box_proxy.boundingRect()
+        self.combo_box_proxy.setParentItem(self)
+        self.combo_box_proxy.setPos(
+            int(delta * 1.0) + text_rect.width() + delta * 0 + text_rect_1.width() + text_rect3.width(),
+            (text_rect3.height()) / 2)
+        self.combo_box_proxy.setZValue(2)
+
+        #
+        self.text_field3 = QLineEdit()
+        self.text_field3.setFont(QFont('Arial', 10))
+        self.text_field3.setFixedWidth(25)
+        self.text_field_proxy = QGraphicsProxyWidget(self)
+        self.text_field_proxy.setWidget(self.text_field3)
+        self.text_field_proxy.setParentItem(self)
+        text_rect_2 = self.text_field_proxy.boundingRect()
+        self.text_field_proxy.setPos(
+            int(delta * 2) + text_rect.width() + delta * 2 + text_rect_1.width() + text_rect3.width() + text_rect_2.width(),
+            (self.height - text_rect_2.height()) / 2)
+
+
+class DelayBlock(Block):
+    def __init__(self, text, color, parent=None):
+        super().__init__(text, color, parent)
+        self.initDelayUI()
+
+    def initDelayUI(self):
+        self.initUI()
+        self.notch_size = 10
+        self.tab_width = 20
+        self.tab_height = 10
+
+        # Add text Сон
+        self.text_item = QGraphicsTextItem("Сон", self)
+        font = QFont('Arial', 12)
+        self.text_item.setFont(font)
+        text_rect = self.text_item.boundingRect()
+        self.text_item.setPos(
+            (self.width - text_rect.width()) / 5, (self.height - text_rect.height()) / 2)
+
+        # Add changeable text field (QLineEdit)
+        self.text_field = QLineEdit()
+        self.text_field.setFont(QFont('Arial', 10))
+        self.text_field.setFixedWidth(30)
+
+        self.text_field_proxy = QGraphicsProxyWidget(self)
+        self.text_field_proxy.setWidget(self.text_field)
+        text_rect = self.text_field_proxy.boundingRect()
+        self.text_field_proxy.setParentItem(self)
+        self.text_field_proxy.setPos(
+            (self.width - text_rect.width()) / 5 * 3.5, (self.height - text_rect.height()) / 2)
+
+
+class ControlBlock(Block):
+    def __init__(self, text, color, parent=None):
+        super().__init__(text, color, parent)
+
+        self.width = 180
+        self.child_blocks = []
+        self.collapsed = False
+        self.detached_proxies = []  # (блок, поле ввода), убранные со сцены, пока тело свёрнуто
+        self.initCollapseUI()
+        self.initControlUI()
+        self.setZValue(0)  # Control blocks are below child blocks
+
+    def initCollapseUI(self):
+        # Кнопка и подпись в нижней полосе блока; положение обновляет update_shape
+        self.collapse_button = QPushButton('−')
+        self.collapse_button.setFixedSize(18, 18)
+        # Без фокуса: иначе Ctrl+Z после нажатия уйдёт кнопке, а не рабочей области
+        self.collapse_button.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.collapse_button.setToolTip("Свернуть или развернуть тело блока")
+        self.collapse_button.clicked.connect(self.toggle_collapsed)
+        self.collapse_proxy = QGraphicsProxyWidget(self)
+        self.collapse_proxy.setWidget(self.collapse_button)
+        self.collapse_proxy.setZValue(2)
+        self.collapsed_item = QGraphicsSimpleTextItem(self)
+        self.collapsed_item.setFont(QFont('Arial', 8))
+        self.collapsed_item.setVisible(False)
+
+    def initControlUI(self):
+        self.height = 80  # Initial height
+        self.notch_size = 10
+        self.tab_width = 20
+        self.tab_height = 10
+
+        self.update_shape()
+
+        # Add text
+        # self.text_item = QGraphicsTextItem(self.text, self)
+        # font = QFont('Arial', 12)
+        # self.text_item.setFont(font)
+        # text_rect = self.text_item.boundingRect()
+        # self.text_item.setPos((self.width - text_rect.width()) / 2, 10)
+
+    def update_shape(self):
+        self.prepareGeometryChange()
+        path = QPainterPath()
+        # Create a control block shape with an open area for child blocks
+        path.moveTo(0, self.notch_size)
+        path.lineTo(self.tab_width, self.notch_size)
+        path.lineTo(self.tab_width + self.notch_size, 0)
+        path.lineTo(self.width - (self.tab_width + self.notch_size), 0)
+        path.lineTo(self.width - self.tab_width, self.notch_size)
+        path.lineTo(self.width, self.notch_size)
+        path.lineTo(self.width, self.height - self.notch_size)
+        path.lineTo(self.width - self.tab_width, self.height - self.notch_size)
+        path.lineTo(self.width - (self.tab_width + self.notch_size), self.height)
+        path.lineTo(self.tab_width + self.notch_size, self.height)
+        path.lineTo(self.tab_width, self.height - self.notch_size)
+        path.lineTo(0, self.height - self.notch_size)
+        path.closeSubpath()
+
+        self.setPath(path)
+        self.setBrush(QBrush(self.color))
+        self.setPen(QPen(Qt.GlobalColor.black))
+        self.collapse_proxy.setPos(6, self.height - 32)
+        self.collapsed_item.setPos(28, self.height - 30)
+
+    def is_open_area(self, pos):
+        # Define the open area where child blocks can be placed
+        if self.collapsed:
+            return False
+        local_pos = self.mapFromScene(pos)
+        open_rect = QRectF(
+            10, 30, self.width - 20, self.height - 60)
+        return open_rect.contains(local_pos)
+
+    def update_size(self):
+        # Adjust the height of the control block based on the child blocks
+        total_height = 80  # Initial height
+        if not self.collapsed:
+            for child in self.child_blocks:
+                child_height = child.boundingRect().height()
+                total_height += child_height
+        self.height = total_height
+        self.update_shape()
+        self.reposition_child_blocks()
+
+        # Update parent control blocks
+        if self.parent_block:
+            self.parent_block.update_size()
+
+    def add_child_blocks(self, block: Block):
+        # Remove any previous connections
+        # block.disconnect_blocks()
+        # Add a block and its connected next blocks as child blocks
+        blocks_to_add = block.get_all_connected_blocks()
+        # blocks_to_add = [block]
+        for blk in blocks_to_add:
+            blk.parent_block = self
+            if blk in self.child_blocks:
+                continue
+            if blk.prev_block is not None and blk.prev_block in self.child_blocks:
+                index = self.child_blocks.index(blk.prev_block)
+                self.child_blocks.insert(index + 1, blk)
+            else:
+                self.child_blocks.append(blk)
+            blk.setParentItem(self)
+            blk.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable, False)
+            blk.setZValue(1)  # Child blocks are above control blocks
+        self.update_size()
+        if self.next_block is not None:
+            self.next_block.move_down(block.boundingRect().height(), False)
+
+    def remove_child_block(self, block):
+        # Remove a block from child_blocks
+        if block in self.child_blocks:
+            self.child_blocks.remove(block)
+            # Need to map position to scene before removing from parent
+            scene_pos = block.mapToScene(QPointF(0, 0))
+            block.setParentItem(None)
+            block.setPos(scene_pos)
+            block.parent_block = None
+            block.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable, True)
+            block.setZValue(1)  # Reset z-value
+            # If the block has connected next blocks, remove them as well
+            next_blocks = block.get_all_connected_blocks()
+            for blk in next_blocks:
+                if blk in self.child_blocks:
+                    self.child_blocks.remove(blk)
+                    scene_pos = blk.mapToScene(QPointF(0, 0))
+                    blk.setParentItem(None)
+                    blk.setPos(scene_pos)
+                    blk.parent_block = None
+                    blk.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable, True)
+                    blk.setZValue(1)  # Reset z-value
+        self.update_size()
+
+    def reposition_child_blocks(self):
+        # Reposition all child blocks within the control block
+        if self.collapsed:
+            # Скрытое тело разместится при развёртывании
+            return
+        y_offset = 40
+        for child in self.child_blocks:
+            child.setPos(abs(self.width - child.width) // 2, y_offset)
+
+            y_offset += child.boundingRect().height()
+            # If child is a ControlBlock, ensure it repositions its children
+            if isinstance(child, ControlBlock):
+                child.reposition_child_blocks()
+
+    def toggle_collapsed(self):
+        history = self.history()
+        if history is not None:
+            history.begin("Развёртка" if self.collapsed else "Свёртка", affected_blocks(self))
+        self.set_collapsed(not self.collapsed)
+        if history is not None:
+            history.commit()
+
+    def set_collapsed(self, collapsed):
+        """Свернуть тело до высоты пустого блока или развернуть его."""
+        self.collapsed = collapsed
+        self.show_collapsed()
+        self.update_size()
+        # Высота изменилась и у объемлющих блоков: сдвигаем то, что стоит под каждым из них
+        block = self
+        while block is not None:
+            block.reposition_next_blocks()
+            block = block.parent_block
+
+    def show_collapsed(self):
+        self.collapse_button.setText('+' if self.collapsed else '−')
+        self.collapsed_item.setText(f"свёрнуто блоков: {len(self.body_blocks())}")
+        self.collapsed_item.setVisible(self.collapsed)
+        for child in self.child_blocks:
+            child.setVisible(not self.collapsed)
+        if self.collapsed:
+            self.detach_proxies()
+        else:
+            self.attach_proxies()
+
+    def body_blocks(self):
+        """Все блоки тела, включая тела вложенных управляющих блоков."""
+        blocks = []
+        for child in self.child_blocks:
+            blocks.append(child)
+            if isinstance(child, ControlBlock):
+                blocks.extend(child.body_blocks())
+        return blocks
+
+    def detach_proxies(self):
+        # Скрытые поля ввода убираем со сцены: иначе Qt при каждом перетаскивании
+        # пересчитывает положение их виджетов, хотя их не видно
+        if self.detached_proxies or self.scene() is None:
+            return
+        for block in self.body_blocks():
+            for item in block.childItems():
+                if isinstance(item, QGraphicsProxyWidget):
+                    self.detached_proxies.append((block, item))
+                    self.scene().removeItem(item)
+
+    def attach_proxies(self):
+        for block, proxy in self.detached_proxies:
+            proxy.setParentItem(block)
+        self.detached_proxies = []
+
+    def restored(self):
+        # Высота и свёрнутость восстановлены историей правок, форму перерисовываем по ним
+        self.show_collapsed()
+        self.update_shape()
+
+    def mousePressEvent(self, event):
+        # Same as in Block class
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        super().mouseReleaseEvent(event)
+
+    def check_for_snap(self, connected_blocks=None):
+        super().check_for_snap(connected_blocks)
+
+    def snap_to_block(self):
+        super().snap_to_block()
+
+
+class ConditionBlock(ControlBlock):
+    def __init__(self, text, color, parent=None):
+        super().__init__(text, color, parent)
+        self.initConditionUI()
+
+    def initConditionUI(self):
+        self.initUI()
+        self.notch_size = 5
+        self.tab_width = 20
+        self.tab_height = 10
+
+        # Add changeable text field (QLineEdit)
+        self.text_field = QLineEdit()
+        self.text_field.setFont(QFont('Arial', 10))
+        self.text_field.setFixedWidth(50)
+
+        self.text_field_proxy = QGraphicsProxyWidget(self)
+        self.text_field_proxy.setWidget(self.text_field)
+        text_rect = self.text_field_proxy.boundingRect()
+        self.text_field_proxy.setParentItem(self)
+        self.text_field_proxy.setPos(
+            (self.width - text_rect.width()) / 10, (text_rect.height()) / 2)
+
+        # Add combo box
+        self.combo_box = QComboBox()
+        self.combo_box.addItems(['==', '!=', '>', '>=', '<', '<='])
+        self.combo_box.setFont(QFont('Arial', 10))
+
+        self.combo_box_proxy = QGraphicsProxyWidget(self)
+        self.combo_box_proxy.setWidget(self.combo_box)
+        text_rect = self.combo_box_proxy.boundingRect()
+        self.combo_box_proxy.setParentItem(self)
+        self.combo_box_proxy.setPos(
+            (self.width - text_rect.width()) / 2, (text_rect.height()) / 2)
+        self.combo_box_proxy.setZValue(2)
+        # Add changeable text field (QLineEdit)
+        self.text_field2 = QLineEdit()
+        self.text_field2.setFont(QFont('Arial', 10))
+        self.text_field2.setFixedWidth(50)
+
+        self.text_field_proxy = QGraphicsProxyWidget(self)
+        self.text_field_proxy.setWidget(self.text_field2)
+        text_rect = self.text_field_proxy.boundingRect()
+        self.text_field_proxy.setParentItem(self)
+        self.text_field_proxy.setPos(
+            (self.width - text_rect.width()) / 10 * 9, (text_rect.height()) / 2)
+
+
+class ForCycleBlock(ControlBlock):
+    def __init__(self, text, color, parent=None):
+        super().__init__(text, color, parent)
+        self.initConditionUI()
+
+    def initConditionUI(self):
+        self.initUI()
+        self.notch_size = 5
+        self.tab_width = 20
+        self.tab_height = 10
+        width = self.width
+        height = self.height
+        delta = 5
+
+        self.text_item = QGraphicsTextItem("Повтор", self)
+        font = QFont('Arial', 14)
+        self.text_item.setFont(font)
+        text_rect = self.text_item.boundingRect()
+        self.text_item.setPos(delta * 1, (text_rect.height()) // 2 - delta * 2)
+
+        # Add changeable text field (QLineEdit)
+        self.text_field2 = QLineEdit()
+        self.text_field2.setFont(QFont('Arial', 15))
+        self.text_field2.setFixedWidth(60)
+        self.text_field_proxy = QGraphicsProxyWidget(self)
+        self.text_field_proxy.setWidget(self.text_field2)
+        text_rect2 = self.text_field_proxy.boundingRect()
+        self.text_field_proxy.setParentItem(self)
+        self.text_field_proxy.setPos(
+            (delta * 7 + self.width - text_rect2.width()) // 2, (text_rect2.height()) // 2 - delta)
+
+        self.text_item = QGraphicsTextItem("раз", self)
+        font = QFont('Arial', 14)
+        self.text_item.setFont(font)
+        text_rect = self.text_item.boundingRect()
+        self.text_item.setPos((delta * 4 + self.width - text_rect.width()) // 2 + text_rect2.width(),
+                              (text_rect.height()) // 2 - delta * 2)
+
+
+class WhileCycleBlock(ControlBlock):
+    def __init__(self, text, color, parent=None):
+        super().__init__(text, color, parent)
+        self.initConditionUI()
+
+    def initConditionUI(self):
+        self.initUI()
+        self.notch_size = 5
+        self.tab_width = 20
+        self.tab_height = 10
+
+        # Add changeable text field (QLineEdit)
+        self.text_field = QLineEdit()
+        self.text_field.setFont(QFont('Arial', 10))
+        self.text_field.setFixedWidth(50)
+
+        self.text_field_proxy = QGraphicsProxyWidget(self)
+        self.text_field_proxy.setWidget(self.text_field)
+        text_rect = self.text_field_proxy.boundingRect()
+        self.text_field_proxy.setParentItem(self)
+        self.text_field_proxy.setPos(
+            (self.width - text_rect.width()) / 10, (text_rect.height()) / 2)
+
+        # Add combo box
+        self.combo_box = QComboBox()
+        self.combo_box.addItems(['==', '!=', '>', '>=', '<', '<='])
+        self.combo_box.setFont(QFont('Arial', 10))
+
+        self.combo_box_proxy = QGraphicsProxyWidget(self)
+        self.combo_box_proxy.setWidget(self.combo_box)
+        text_rect = self.combo_box_proxy.boundingRect()
+        self.combo_box_proxy.setParentItem(self)
+        self.combo_box_proxy.setPos(
+            (self.width - text_rect.width()) / 2, (text_rect.height()) / 2)
+        self.combo_box_proxy.setZValue(2)
+
+        # Add changeable text field (QLineEdit)
+        self.text_field2 = QLineEdit()
+        self.text_field2.setFont(QFont('Arial', 10))
+        self.text_field2.setFixedWidth(50)
+
+        self.text_field_proxy = QGraphicsProxyWidget(self)
+        self.text_field_proxy.setWidget(self.text_field2)
+        text_rect = self.text_field_proxy.boundingRect()
+        self.text_field_proxy.setParentItem(self)
+        self.text_field_proxy.setPos(
+            (self.width - text_rect.width()) / 10 * 9, (text_rect.height()) / 2)
+
+
+class ProgramLoopBlock(ControlBlock):
+    """
+    Тело этого блока выполняется в loop() и повторяется бесконечно, как в обычном скетче Arduino.
+
+    Всё, что стоит до него, выполняется один раз в setup().
+    """
+
+    def __init__(self, text, color, parent=None):
+        super().__init__(text, color, parent)
+        self.initLoopUI()
+
+    def initLoopUI(self):
+        self.initUI()
+        self.notch_size = 5
+        self.tab_width = 20
+        self.tab_height = 10
+        delta = 5
+
+        self.text_item = QGraphicsTextItem("Цикл программы", self)
+        font = QFont('Arial', 14)
+        self.text_item.setFont(font)
+        text_rect = self.text_item.boundingRect()
+        self.text_item.setPos((self.width - text_rect.width()) // 2, (text_rect.height()) // 2 - delta * 2)
+
+
+class EveryBlock(ControlBlock):
+    """
+    Тело выполняется раз в N мс по millis(), не останавливая остальную программу.
+
+    Несколько таких блоков в "Цикл программы" работают как кооперативный
+    планировщик: каждый проход loop() проверяет, не пора ли запустить задачу.
+    """
+
+    def __init__(self, text, color, parent=None):
+        super().__init__(text, color, parent)
+        self.initEveryUI()
+
+    def initEveryUI(self):
+        self.initUI()
+        self.notch_size = 5
+        self.tab_width = 20
+        self.tab_height = 10
+        delta = 5
+
+        self.text_item = QGraphicsTextItem("Каждые", self)
+        font = QFont('Arial', 14)
+        self.text_item.setFont(font)
+        text_rect = self.text_item.boundingRect()
+        self.text_item.setPos(delta * 1, (text_rect.height()) // 2 - delta * 2)
+
+        self.text_field2 = QLineEdit()
+        self.text_field2.setFont(QFont('Arial', 15))
+        self.text_field2.setFixedWidth(60)
+        self.text_field_proxy = QGraphicsProxyWidget(self)
+        self.text_field_proxy.setWidget(self.text_field2)
+        text_rect2 = self.text_field_proxy.boundingRect()
+        self.text_field_proxy.setParentItem(self)
+        self.text_field_proxy.setPos(delta * 2 + text_rect.width(), (text_rect2.height()) // 2 - delta)
+
+        self.text_item = QGraphicsTextItem("мс", self)
+        self.text_item.setFont(font)
+        self.text_item.setPos(delta * 3 + text_rect.width() + text_rect2.width(), (text_rect.height()) // 2 - delta * 2)
+
+
+class TimerBlock(ControlBlock):
+    """
+    Тело выполняется в прерывании аппаратного таймера каждые N мкс.
+
+    В setup() остаётся только настройка таймера; само тело становится
+    обработчиком прерывания, поэтому оно должно быть коротким.
+    """
+
+    def __init__(self, text, color, parent=None):
+        super().__init__(text, color, parent)
+        self.initTimerUI()
+
+    def initTimerUI(self):
+        self.initUI()
+        self.notch_size = 5
+        self.tab_width = 20
+        self.tab_height = 10
+        delta = 5
+
+        self.text_item = QGraphicsTextItem("Таймер", self)
+        font = QFont('Arial', 14)
+        self.text_item.setFont(font)
+        text_rect = self.text_item.boundingRect()
+        self.text_item.setPos(delta * 1, (text_rect.height()) // 2 - delta * 2)
+
+        self.text_field2 = QLineEdit()
+        self.text_field2.setFont(QFont('Arial', 15))
+        self.text_field2.setFixedWidth(60)
+        self.text_field_proxy = QGraphicsProxyWidget(self)
+        self.text_field_proxy.setWidget(self.text_field2)
+        text_rect2 = self.text_field_proxy.boundingRect()
+        self.text_field_proxy.setParentItem(self)
+        self.text_field_proxy.setPos(delta * 2 + text_rect.width(), (text_rect2.height()) // 2 - delta)
+
+        self.text_item = QGraphicsTextItem("мкс", self)
+        self.text_item.setFont(font)
+        self.text_item.setPos(delta * 3 + text_rect.width() + text_rect2.width(), (text_rect.height()) // 2 - delta * 2)
+
+
+class DigitalReadBlock(Block):
+    def __init__(self, text, color, parent=None):
+        super().__init__(text, color, parent)
+        self.child_blocks = []
+        # self.width = 120
+        self.setZValue(1)  # Control blocks are below child blocks
+        self.initUI()
+
+    def initUI(self):
+        super().initUI()
+        width = self.width
+        height = self.height
+        delta = 5
+
+        #
+        self.text_field1 = QLineEdit()
+        self.text_field1.setFont(QFont('Arial', 16))
+        self.text_field1.setFixedWidth(30)
+        self.text_field_proxy = QGraphicsProxyWidget(self)
+        self.text_field_proxy.setWidget(self.text_field1)
+        self.text_field_proxy.setParentItem(self)
+        text_rect = self.text_field_proxy.boundingRect()
+        self.text_field_proxy.setPos((self.width - text_rect.width()) / 10, (height - text_rect.height()) / 2)
+
+        # Add text
+        self.text_item = QGraphicsTextItem("=ЦЧтение", self)
+        font = QFont('Arial', 10)
+        self.text_item.setFont(font)
+        text_rect_1 = self.text_item.boundingRect()
+        self.text_item.setPos(delta * 3 + text_rect.width(), (height - text_rect_1.height()) / 2)
+
+        #
+        self.text_field2 = QLineEdit()
+        self.text_field2.setFont(QFont('Arial', 16))
+        self.text_field2.setFixedWidth(30)
+        self.text_field_proxy = QGraphicsProxyWidget(self)
+        self.text_field_proxy.setWidget(self.text_field2)
+        self.text_field_proxy.setParentItem(self)
+        text_rect_2 = self.text_field_proxy.boundingRect()
+        self.text_field_proxy.setPos((self.width - text_rect.width()) / 10 * 9,
+                                     (self.height - text_rect_2.height()) / 2)
+
+
+class AnalogReadBlock(Block):
+    def __init__(self, text, color, parent=None):
+        super().__init__(text, color, parent)
+        self.child_blocks = []
+        # self.width = 120
+        self.setZValue(1)  # Control blocks are below child blocks
+        self.initUI()
+
+    def initUI(self):
+        super().initUI()
+        width = self.width
+        height = self.height
+        delta = 5
+
+        #
+        self.text_field1 = QLineEdit()
+        self.text_field1.setFont(QFont('Arial', 16))
+        self.text_field1.setFixedWidth(30)
+        self.text_field_proxy = QGraphicsProxyWidget(self)
+        self.text_field_proxy.setWidget(self.text_field1)
+        self.text_field_proxy.setParentItem(self)
+        text_rect = self.text_field_proxy.boundingRect()
+        self.text_field_proxy.setPos((self.width - text_rect.width()) / 10, (height - text_rect.height()) / 2)
+
+        # Add text
+        self.text_item = QGraphicsTextItem("=АЧтение", self)
+        font = QFont('Arial', 10)
+        self.text_item.setFont(font)
+        text_rect_1 = self.text_item.boundingRect()
+        self.text_item.setPos(delta * 3 + text_rect.width(), (height - text_rect_1.height()) / 2)
+
+        #
+        self.text_field2 = QLineEdit()
+        self.text_field2.setFont(QFont('Arial', 16))
+        self.text_field2.setFixedWidth(30)
+        self.text_field_proxy = QGraphicsProxyWidget(self)
+        self.text_field_proxy.setWidget(self.text_field2)
+        self.text_field_proxy.setParentItem(self)
+        text_rect_2 = self.text_field_proxy.boundingRect()
+        self.text_field_proxy.setPos((self.width - text_rect.width()) / 10 * 9,
+                                     (self.height - text_rect_2.height()) / 2)
+
+
+class DigitalWriteBlock(Block):
+    def __init__(self, text, color, parent=None):
+        super().__init__(text, color, parent)
+        self.child_blocks = []
+        # self.width = 120
+        self.setZValue(1)  # Control blocks are below child blocks
+        self.initUI()
+
+    def initUI(self):
+        super().initUI()
+        width = self.width
+        height = self.height
+        delta = 5
+
+        # Add text
+        self.text_item = QGraphicsTextItem("ЦЗапись", self)
+        font = QFont('Arial', 10)
+        self.text_item.setFont(font)
+        text_rect = self.text_item.boundingRect()
+        self.text_item.setPos(delta * 2, (height - text_rect.height()) / 2)
+
+        #
+        self.text_field = QLineEdit()
+        self.text_field.setFont(QFont('Arial', 10))
+        self.text_field.setFixedWidth(30)
+        self.text_field_proxy = QGraphicsProxyWidget(self)
+        self.text_field_proxy.setWidget(self.text_field)
+        self.text_field_proxy.setParentItem(self)
+        text_rect_2 = self.text_field_proxy.boundingRect()
+        self.text_field_proxy.setPos(int(delta * 2 + text_rect.width()), (self.height - text_rect_2.height()) / 2)
+
+        # Add combo box
+        self.combo_box = QComboBox()
+        self.combo_box.addItems(['LOW', 'HIGH'])
+        self.combo_box.setFont(QFont('Arial', 8))
+        self.combo_box_proxy = QGraphicsProxyWidget(self)
+        self.combo_box_proxy.setWidget(self.combo_box)
+        text_rect_3 = self.combo_box_proxy.boundingRect()
+        self.combo_box_proxy.setParentItem(self)
+        self.combo_box_proxy.setPos(delta * 2 + text_rect.width() + delta + text_rect_2.width() + delta,
+                                    (self.height - text_rect_2.height()) / 2)
+
+
+class AnalogWriteBlock(Block):
+    def __init__(self, text, color, parent=None):
+        super().__init__(text, color, parent)
+        self.child_blocks = []
+        # self.width = 120
+        self.setZValue(1)  # Control blocks are below child blocks
+        self.initUI()
+
+    def initUI(self):
+        super().initUI()
+        width = self.width
+        height = self.height
+        delta = 5
+
+        # Add text
+        self.text_item = QGraphicsTextItem("АЗапись", self)
+        font = QFont('Arial', 10)
+        self.text_item.setFont(font)
+        text_rect = self.text_item.boundingRect()
+        self.text_item.setPos(delta * 2, (height - text_rect.height()) / 2)
+
+        #
+        self.text_field1 = QLineEdit()
+        self.text_field1.setFont(QFont('Arial', 10))
+        self.text_field1.setFixedWidth(30)
+        self.text_field_proxy = QGraphicsProxyWidget(self)
+        self.text_field_proxy.setWidget(self.text_field1)
+        self.text_field_proxy.setParentItem(self)
+        text_rect_2 = self.text_field_proxy.boundingRect()
+        self.text_field_proxy.setPos(int(delta * 2 + text_rect.width()), (self.height - text_rect_2.height()) / 2)
+
+        # Add combo box
+        self.text_field2 = QLineEdit()
+        self.text_field2.setFont(QFont('Arial', 10))
+        self.text_field2.setFixedWidth(30)
+        self.text_field_proxy = QGraphicsProxyWidget(self)
+        self.text_field_proxy.setWidget(self.text_field2)
+        self.text_field_proxy.setParentItem(self)
+        text_rect_3 = self.text_field_proxy.boundingRect()
+        self.text_field_proxy.setPos(delta * 2 + text_rect.width() + delta + text_rect_2.width() + delta,
+                                     (self.height - text_rect_2.height()) / 2)
+
+
+class SerialReadBlock(Block):
+    def __init__(self, text, color, parent=None):
+        super().__init__(text, color, parent)
+        self.child_blocks = []
+        # self.width = 120
+        self.setZValue(1)  # Control blocks are below child blocks
+        self.initUI()
+
+    def initUI(self):
+        super().initUI()
+        width = self.width
+        height = self.height
+        delta = 5
+
+        #
+        self.text_field = QLineEdit()
+        self.text_field.setFont(QFont('Arial', 10))
+        self.text_field.setFixedWidth(30)
+        self.text_field_proxy = QGraphicsProxyWidget(self)
+        self.text_field_proxy.setWidget(self.text_field)
+        self.text_field_proxy.setParentItem(self)
+        text_rect = self.text_field_proxy.boundingRect()
+        self.text_field_proxy.setPos((width - text_rect.width()) / 15, (height - text_rect.height()) / 2)
+
+        # Add text
+        self.text_item = QGraphicsTextItem("=", self)
+        font = QFont('Arial', 10)
+        self.text_item.setFont(font)
+        text_rect_1 = self.text_item.boundingRect()
+        self.text_item.setPos((width - text_rect_1.width()) / 15 * 4, (height - text_rect_1.height()) / 2)
+        # Add text
+        self.text_item = QGraphicsTextItem("Читать\nсерийный порт", self)
+        font = QFont('Arial', 10)
+        self.text_item.setFont(font)
+        text_rect = self.text_item.boundingRect()
+        self.text_item.setPos((width - text_rect.width()) / 10 * 8, (height - text_rect.height()) / 2)
+        self.text_item.setPos((width - text_rect.width()) / 10 * 8, (height - text_rect.height()) / 2)
+
+
+class SerialInputBlock(ControlBlock):
+    """
+    Тело выполняется, когда из последовательного порта пришла целая строка.
+
+    Ожидания нет: пока строка не дочитана, блок пропускается, а байты
+    накапливаются в буфере скетча до следующего прохода.
+    """
+
+    label = "Пришла строка"
+
+    def __init__(self, text, color, parent=None):
+        super().__init__(text, color, parent)
+        self.initInputUI()
+
+    def initInputUI(self):
+        self.initUI()
+        self.notch_size = 5
+        self.tab_width = 20
+        self.tab_height = 10
+        delta = 5
+
+        self.text_item = QGraphicsTextItem(self.label, self)
+        font = QFont('Arial', 12)
+        self.text_item.setFont(font)
+        text_rect = self.text_item.boundingRect()
+        self.text_item.setPos(delta * 1, (text_rect.height()) // 2 - delta * 2)
+
+        self.text_field2 = QLineEdit()
+        self.text_field2.setFont(QFont('Arial', 12))
+        self.text_field2.setFixedWidth(50)
+        self.text_field_proxy = QGraphicsProxyWidget(self)
+        self.text_field_proxy.setWidget(self.text_field2)
+        self.text_field_proxy.setParentItem(self)
+        self.text_field_proxy.setPos(delta * 2 + text_rect.width(), (text_rect.height()) // 2 - delta * 2)
+
+
+class SerialNumberInputBlock(SerialInputBlock):
+    """То же для числа: строка разбирается как число и записывается в числовую переменную."""
+
+    label = "Пришло число"
+
+
+class SerialWriteBlock(Block):
+    def __init__(self, text, color, parent=None):
+        super().__init__(text, color, parent)
+        self.child_blocks = []
+        # self.width = 120
+        self.setZValue(1)  # Control blocks are below child blocks
+        self.initUI()
+
+    def initUI(self):
+        super().initUI()
+        width = self.width
+        height = self.height
+        delta = 5
+
+        # Add text
+        self.text_item = QGraphicsTextItem("Говори", self)
+        font = QFont('Arial', 10)
+        self.text_item.setFont(font)
+        text_rect = self.text_item.boundingRect()
+        self.text_item.setPos(delta * 2, (height - text_rect.height()) / 2)
+
+        #
+        self.text_field = QLineEdit()
+        self.text_field.setFont(QFont('Arial', 10))
+        self.text_field.setFixedWidth(50)
+        self.text_field_proxy = QGraphicsProxyWidget(self)
+        self.text_field_proxy.setWidget(self.text_field)
+        self.text_field_proxy.setParentItem(self)
+        text_rect_2 = self.text_field_proxy.boundingRect()
+        self.text_field_proxy.setPos(int(delta * 2 + text_rect.width()), (self.height - text_rect_2.height()) / 2)
+
+
+class ArrayBlock(Block):
+    def __init__(self, text, color, parent=None):
+        super().__init__(text, color, parent)
+        self.width = 205
+        self.child_blocks = []
+        self.setZValue(1)
+        self.initUI()
+        self.add_row([('combo_box', ARRAY_TYPES), ('text_field1', 40), '[', ('text_field2', 35), ']'])
+
+
+class ArrayGetBlock(Block):
+    def __init__(self, text, color, parent=None):
+        super().__init__(text, color, parent)
+        self.width = 180
+        self.child_blocks = []
+        self.setZValue(1)
+        self.initUI()
+        self.add_row([('text_field1', 30), '=', ('text_field2', 40), '[', ('text_field3', 30), ']'])
+
+
+class ArraySetBlock(Block):
+    def __init__(self, text, color, parent=None):
+        super().__init__(text, color, parent)
+        self.width = 175
+        self.child_blocks = []
+        self.setZValue(1)
+        self.initUI()
+        self.add_row([('text_field1', 40), '[', ('text_field2', 30), '] =', ('text_field3', 30)])
+
+
+class SampleBlock(Block):
+    """Заполнить весь массив отсчётами analogRead с заданной частотой."""
+
+    def __init__(self, text, color, parent=None):
+        super().__init__(text, color, parent)
+        self.width = 255
+        self.child_blocks = []
+        self.setZValue(1)
+        self.initUI()
+        self.add_row(['Оцифр.', ('text_field1', 35), 'пин', ('text_field2', 25), ('text_field3', 45), 'Гц'])
+
+
+class BulkWriteBlock(Block):
+    """Отправить весь массив одним Serial.write, байтами как в памяти."""
+
+    def __init__(self, text, color, parent=None):
+        super().__init__(text, color, parent)
+        self.width = 205
+        self.child_blocks = []
+        self.setZValue(1)
+        self.initUI()
+        self.add_row(['Отправить массив', ('text_field', 50)])
+
+
+class FunctionBlock(ControlBlock):
+    """
+    Объявление функции: тело становится отдельной функцией C++ перед setup().
+
+    В основной программе от блока ничего не остаётся, выполняет функцию блок
+    "Вызов". Свёрнутая функция занимает на холсте место пустого блока.
+    """
+
+    def __init__(self, text, color, parent=None):
+        super().__init__(text, color, parent)
+        self.width = 330
+        self.initFunctionUI()
+
+    def initFunctionUI(self):
+        self.update_shape()
+        self.add_row(['Функция', ('combo_box', RESULT_TYPES), ('text_field', 60), '(', ('text_field1', 80), ')'],
+                     height=40)
+
+
+class ReturnBlock(Block):
+    """Выйти из функции; у функции с результатом - вернуть значение."""
+
+    def __init__(self, text, color, parent=None):
+        super().__init__(text, color, parent)
+        self.width = 160
+        self.child_blocks = []
+        self.setZValue(1)
+        self.initUI()
+        self.add_row(['Вернуть', ('text_field', 60)])
+
+
+class CallBlock(Block):
+    """Вызвать функцию с аргументами через запятую; результат можно записать в переменную."""
+
+    def __init__(self, text, color, parent=None):
+        super().__init__(text, color, parent)
+        self.width = 320
+        self.child_blocks = []
+        self.setZValue(1)
+        self.initUI()
+        self.add_row(['Вызов', ('text_field', 60), '(', ('text_field1', 80), ')', '→', ('text_field2', 45)])
+
+
+def stack_blocks(block):
+    """Блок, всё что под ним, и тела управляющих блоков среди них."""
+    blocks = []
+    while block is not None:
+        blocks.append(block)
+        for child in getattr(block, 'child_blocks', []):
+            if child.prev_block is None:
+                blocks.extend(stack_blocks(child))
+        block = block.next_block
+    return blocks
+
+
+def build_chain(data, created, parent=None):
+    """
+    Создать цепочку блоков из данных chain_to_data и связать её, не размещая на сцене.
+
+    Блок "Начало" пропускается: он на холсте один. Созданные блоки добавляются в created.
+    """
+    head = None
+    prev = None
+    for item in data:
+        if item['text'] == 'Начало':
+            continue
+        block = create_block(item['text'])
+        created.append(block)
+        for name, value in item.get('fields', {}).items():
+            if name in block.field_widgets():
+                set_field(block, name, value)
+        if 'body' in item and hasattr(block, 'child_blocks'):
+            body = build_chain(item['body'], created, block)
+            while body is not None:
+                block.child_blocks.append(body)
+                body = body.next_block
+        if parent is not None:
+            block.parent_block = parent
+            block.setParentItem(parent)
+            block.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable, False)
+            block.setZValue(1)
+        if prev is None:
+            head = block
+        else:
+            prev.next_block = block
+            block.prev_block = prev
+        prev = block
+    return head
+
+
+def layout_chain(head, x, y):
+    """Один проход размещения: высоты тел считаются снизу вверх, положения - сверху вниз."""
+    block = head
+    while block is not None:
+        if isinstance(block, ControlBlock):
+            layout_body(block)
+        block.setPos(x, y)
+        # Как в reposition_next_blocks: после первого блока - по его высоте, дальше по boundingRect
+        y += block.height if block is head else block.boundingRect().height()
+        block = block.next_block
+
+
+def layout_body(control):
+    y_offset = 40
+    for child in control.child_blocks:
+        if isinstance(child, ControlBlock):
+            layout_body(child)
+        child.setPos(abs(control.width - child.width) // 2, y_offset)
+        y_offset += child.boundingRect().height()
+    # Как update_size: 80 плюс высота тела
+    control.height = 80 + y_offset - 40
+    control.update_shape()
+
+
+# Кнопки палитры по порядку и цвета блоков
+PALETTE = [
+    ('Начало', QColor('#ff3386')),
+    ('Переменные', QColor('#FF5733')),
+    ('Арифметика', QColor('#00FFFF')),
+    ('Сон', QColor('#FF00FF')),
+    ('Условие', QColor('#33FF57')),
+    ('Повтор', QColor('#3357FF')),
+    ('Цикл', QColor('#F1C40F')),
+    ('Цикл программы', QColor('#E67E22')),
+    ('ЦЧтение', QColor('#9B59B6')),
+    ('АЧтение', QColor('#FF69B4')),
+    ('ЦЗапись', QColor('#8B00FF')),
+    ('АЗапись', QColor('#BFFF00')),
+    ('Слушай', QColor('#40E0D0')),
+    ('Говори', QColor('#FFD701')),
+    ('Массив', QColor('#1ABC9C')),
+    ('Из массива', QColor('#2ECC71')),
+    ('В массив', QColor('#27AE60')),
+    ('Оцифровка', QColor('#D35400')),
+    ('Отправить массив', QColor('#7F8C8D')),
+    ('Каждые', QColor('#C0392B')),
+    ('Таймер', QColor('#8E44AD')),
+    ('Пришла строка', QColor('#16A085')),
+    ('Пришло число', QColor('#2980B9')),
+    ('Функция', QColor('#5D6D7E')),
+    ('Вызов', QColor('#85C1E9')),
+    ('Вернуть', QColor('#AED6F1')),
+]
+BLOCK_COLORS = dict(PALETTE)
+
+BLOCK_TYPES = {
+    'Повтор': ForCycleBlock,
+    'Цикл': WhileCycleBlock,
+    'Цикл программы': ProgramLoopBlock,
+    'Начало': StartBlock,
+    'Арифметика': ArithmeticBlock,
+    'Сон': DelayBlock,
+    'Условие': ConditionBlock,
+    'Переменные': VariableBlock,
+    'ЦЧтение': DigitalReadBlock,
+    'АЧтение': AnalogReadBlock,
+    'ЦЗапись': DigitalWriteBlock,
+    'АЗапись': AnalogWriteBlock,
+    'Слушай': SerialReadBlock,
+    'Говори': SerialWriteBlock,
+    'Массив': ArrayBlock,
+    'Из массива': ArrayGetBlock,
+    'В массив': ArraySetBlock,
+    'Оцифровка': SampleBlock,
+    'Отправить массив': BulkWriteBlock,
+    'Каждые': EveryBlock,
+    'Таймер': TimerBlock,
+    'Пришла строка': SerialInputBlock,
+    'Пришло число': SerialNumberInputBlock,
+    'Функция': FunctionBlock,
+    'Вызов': CallBlock,
+    'Вернуть': ReturnBlock,
+}
+
+
+def create_block(text, color=None):
+    """Новый блок по тексту из палитры; на сцену не добавляется."""
+    return BLOCK_TYPES[text](text, color if color is not None else BLOCK_COLORS[text])
@@ -0,0 +1,276 @@
+"""
+Поиск блоков на холсте по надписи, значениям полей и именам переменных.
+
+Индексы обратные: слово, имя переменной или номер пина -> блоки, в которых
+оно встречается. Поэтому поиск даже в программе из тысяч блоков стоит
+столько, сколько найдено, а не обход холста. После правки поля индекс
+обновляется только для этого блока.
+
+Переименование учитывает области видимости: меняются только упоминания,
+которые анализатор связал с тем же символом, что и имя под курсором.
+"""
+import bisect
+import re
+from collections import namedtuple
+
+from .analyzer import ERROR, Analyzer
+from .program import snapshot_chain
+from .validation import IDENTIFIER_PATTERN, is_valid_cpp_variable_name, is_valid_integer, literal_type, \
+    parse_parameter, split_list
+
+WORD_PATTERN = re.compile(r'\w+')
+
+# Поля, в которых блок объявляет переменную, массив или функцию
+DEFINITION_FIELDS = {'Переменные': 'text_field1', 'Массив': 'text_field1', 'Функция': 'text_field'}
+# Поля-списки через запятую: параметры функции объявляют имена, аргументы вызова - используют
+PARAMETER_FIELDS = {'Функция': 'text_field1'}
+ARGUMENT_FIELDS = {'Вызов': 'text_field1'}
+# Поля с номером пина
+PIN_FIELDS = {'ЦЧтение': 'text_field2', 'АЧтение': 'text_field2', 'ЦЗапись': 'text_field', 'АЗапись': 'text_field1',
+              'Оцифровка': 'text_field2'}
+
+DEFINITION = "definition"
+USE = "use"
+PIN = "pin"
+
+# Упоминание имени или пина: блок, поле и вид (DEFINITION, USE или PIN)
+Reference = namedtuple('Reference', 'block field kind')
+
+
+def words(text):
+    return WORD_PATTERN.findall(text.lower())
+
+
+def block_words(block):
+    """Слова надписи и всех полей блока в нижнем регистре."""
+    result = set(words(block.text))
+    for value in block.fields().values():
+        result.update(words(value))
+    return result
+
+
+def is_name(text):
+    return IDENTIFIER_PATTERN.fullmatch(text) is not None and literal_type(text) is None
+
+
+def block_references(block):
+    """Имена и пины, которые упоминает блок: пары (имя или номер пина, Reference)."""
+    result = []
+    for field, text in block.fields().items():
+        if field == 'combo_box':
+            continue
+        if PARAMETER_FIELDS.get(block.text) == field:
+            names = [(parse_parameter(part)[1], DEFINITION) for part in split_list(text)]
+        elif ARGUMENT_FIELDS.get(block.text) == field:
+            names = [(part, USE) for part in split_list(text)]
+        elif PIN_FIELDS.get(block.text) == field and is_valid_integer(text):
+            result.append((int(text), Reference(block, field, PIN)))
+            continue
+        else:
+            names = [(text, DEFINITION if DEFINITION_FIELDS.get(block.text) == field else USE)]
+        result.extend((name, Reference(block, field, kind)) for name, kind in names if is_name(name))
+    return result
+
+
+def rename_in_field(block_text, field, text, old, new):
+    """Текст поля, в котором имя old заменено на new; в списках меняются только совпадающие элементы."""
+    if field not in (PARAMETER_FIELDS.get(block_text), ARGUMENT_FIELDS.get(block_text)):
+        return new if text == old else text
+    parameters = field == PARAMETER_FIELDS.get(block_text)
+    parts = text.split(',')
+    for i, part in enumerate(parts):
+        item = part.strip()
+        if (parse_parameter(item)[1] if parameters else item) == old:
+            # Имя стоит в конце элемента (у параметра "тип имя" - последнее слово)
+            end = len(part.rstrip())
+            parts[i] = part[:end - len(old)] + new + part[end:]
+    return ','.join(parts)
+
+
+class RenameError(Exception):
+    pass
+
+
+def bound_symbol(analysis, reference, name):
+    """Symbol, к которому анализатор привязал имя name в поле reference, или None."""
+    if reference.kind == PIN or reference.block not in analysis:
+        return None
+    info = analysis[reference.block]
+    if PARAMETER_FIELDS.get(reference.block.text) == reference.field:
+        return next((param for param in info.params if param.name == name), None)
+    if ARGUMENT_FIELDS.get(reference.block.text) == reference.field:
+        return next((symbol for symbol in info.arguments if symbol is not None and symbol.name == name), None)
+    if reference.kind == DEFINITION:
+        symbol = info.declares
+    else:
+        symbol = info.uses.get(reference.field)
+    return symbol if symbol is not None and symbol.name == name else None
+
+
+def bindings(analysis):
+    """(блок, поле, имя) -> (блок объявления, имя, тип) для всех имён, привязанных к символам."""
+    result = {}
+    for block in analysis.blocks:
+        for name, reference in block_references(block):
+            symbol = bound_symbol(analysis, reference, name)
+            if symbol is not None:
+                source = getattr(block, 'source', None) or block
+                declared = getattr(symbol.block, 'source', None) or symbol.block
+                result[(source, reference.field, name)] = (declared, symbol.name, symbol.type)
+    return result
+
+
+def error_count(analysis):
+    return sum(diagnostic.severity == ERROR for diagnostic in analysis.diagnostics)
+
+
+def plan_rename(start_block, block, old, new, references=None):
+    """
+    Правки полей для переименования имени old, упомянутого в блоке block, в new.
+
+    Возвращает список (блок, поле, старый текст, новый текст). references -
+    упоминания old на холсте (из ReferenceIndex); без них просматривается вся
+    программа. Если новое имя некорректно, old в блоке ни к чему не привязано
+    или после переименования хоть одно имя стало бы ссылаться на другое
+    объявление, бросает RenameError.
+    """
+    if not is_valid_cpp_variable_name(new):
+        raise RenameError(f"Название '{new}' некорректно!")
+    analysis = Analyzer().run(start_block)
+    symbol = None
+    for name, reference in block_references(block):
+        if name == old:
+            symbol = bound_symbol(analysis, reference, old)
+            if symbol is not None:
+                break
+    if symbol is None:
+        raise RenameError(f"Имя '{old}' здесь не относится ни к одному объявлению в программе!")
+    if references is None:
+        references = [reference for candidate in analysis.blocks
+                      for name, reference in block_references(candidate) if name == old]
+    fields = {(reference.block, reference.field) for reference in references
+              if bound_symbol(analysis, reference, old) is symbol}
+    edits = []
+    for edited, field in fields:
+        text = edited.fields()[field]
+        edits.append((edited, field, text, rename_in_field(edited.text, field, text, old, new)))
+
+    # Проверка на копии программы: каждое имя должно остаться привязанным к своему объявлению
+    expected = {}
+    renamed = (symbol.block, symbol.name, symbol.type)
+    for (source, field, name), declared in bindings(analysis).items():
+        if declared == renamed:
+            name, declared = new, (symbol.block, new, symbol.type)
+        expected[(source, field, name)] = declared
+    copy = snapshot_chain(start_block)
+    nodes = {}
+    stack = [copy]
+    while stack:
+        node = stack.pop()
+        if node is not None:
+            nodes[node.source] = node
+            stack.append(node.next_block)
+            stack.extend(node.child_blocks[:1])
+    for edited, field, _, text in edits:
+        if edited in nodes:
+            nodes[edited].field_values[field] = text
+    renamed_analysis = Analyzer().run(copy)
+    if bindings(renamed_analysis) != expected or error_count(renamed_analysis) > error_count(analysis):
+        raise RenameError(f"Имя '{new}' уже используется в этой части программы!")
+    return edits
+
+
+class Index:
+    """
+    Обратный индекс ключ -> значения, который обновляется по одному блоку.
+
+    Подклассы определяют entries(block): пары (ключ, значение) для блока.
+    """
+
+    def __init__(self):
+        self.block_entries = {}  # блок -> его пары (ключ, значение)
+        self.values = {}  # ключ -> значения из всех блоков
+
+    def __contains__(self, key):
+        return key in self.values
+
+    def entries(self, block):
+        raise NotImplementedError
+
+    def keys_changed(self):
+        """Вызывается, когда появился новый ключ или пропал старый."""
+        pass
+
+    def update(self, block):
+        """Переиндексировать блок после правки его полей (или добавить новый)."""
+        self.remove(block)
+        new_entries = self.entries(block)
+        self.block_entries[block] = new_entries
+        for key, value in new_entries:
+            if key not in self.values:
+                self.values[key] = set()
+                self.keys_changed()
+            self.values[key].add(value)
+
+    def remove(self, block):
+        for key, value in self.block_entries.pop(block, ()):
+            values = self.values[key]
+            values.discard(value)
+            if not values:
+                del self.values[key]
+                self.keys_changed()
+
+    def sync(self, blocks):
+        """Привести индекс к блокам на холсте: новые добавить, пропавшие убрать."""
+        blocks = set(blocks)
+        for block in [block for block in self.block_entries if block not in blocks]:
+            self.remove(block)
+        for block in blocks:
+            if block not in self.block_entries:
+                self.update(block)
+
+    def find(self, key):
+        return set(self.values.get(key, ()))
+
+
+class BlockIndex(Index):
+    """Слово в нижнем регистре -> блоки, в надписи или полях которых оно есть."""
+
+    def __init__(self):
+        super().__init__()
+        self.sorted_words = None  # None - список слов нужно пересобрать
+
+    def entries(self, block):
+        return [(word, block) for word in block_words(block)]
+
+    def keys_changed(self):
+        self.sorted_words = None
+
+    def with_prefix(self, prefix):
+        """Блоки, в которых есть слово, начинающееся с prefix."""
+        if self.sorted_words is None:
+            self.sorted_words = sorted(self.values)
+        found = set()
+        for position in range(bisect.bisect_left(self.sorted_words, prefix), len(self.sorted_words)):
+            word = self.sorted_words[position]
+            if not word.startswith(prefix):
+                break
+            found |= self.values[word]
+        return found
+
+    def search(self, query):
+        """Блоки, в которых каждое слово запроса - начало какого-нибудь их слова."""
+        found = None
+        for prefix in words(query):
+            blocks = self.with_prefix(prefix)
+            found = blocks if found is None else found & blocks
+            if not found:
+                break
+        return found or set()
+
+
+class ReferenceIndex(Index):
+    """Имя переменной, массива, функции или номер пина -> Reference на все его упоминания."""
+
+    def entries(self, block):
+        return block_references(block)
@@ -0,0 +1,83 @@
+from .analyzer import WARNING, Diagnostic, constant_value, find_constants
+from .validation import PINS
+
+INPUT = "INPUT"
+OUTPUT = "OUTPUT"
+
+# Надписи на панели ПИНов -> режим для pinMode (None - режим выводится из программы)
+PANEL_MODES = {"Авто": None, "ВВОД": INPUT, "ВЫВОД": OUTPUT}
+MODE_NAMES = {INPUT: "ВВОД", OUTPUT: "ВЫВОД"}
+
+# Блоки, работающие с пинами: поле с номером пина и нужный режим
+PIN_USES = {
+    'ЦЧтение': ('text_field2', INPUT),
+    'АЧтение': ('text_field2', INPUT),
+    'ЦЗапись': ('text_field', OUTPUT),
+    'АЗапись': ('text_field1', OUTPUT),
+    'Оцифровка': ('text_field2', INPUT),
+}
+
+
+class PinPlan:
+    """Какие pinMode нужны программе, и предупреждения о конфликтах."""
+
+    def __init__(self):
+        self.modes = {}  # пин -> INPUT или OUTPUT
+        self.uses = {}  # пин -> блоки, которые его используют
+        self.warnings = []
+
+    def prologue(self):
+        return [f"pinMode({pin}, {mode});" for pin, mode in sorted(self.modes.items())]
+
+
+def plan_pin_modes(analysis, manual_modes=None):
+    """
+    Вывести режимы пинов из блоков чтения и записи.
+
+    Пин, в который программа пишет, получает OUTPUT, пин, который только
+    читается, - INPUT. Номер пина должен быть известен до запуска (литерал
+    или переменная-константа); для пинов, заданных переменной, используются
+    только явные настройки панели. manual_modes - явные настройки панели
+    (пин -> INPUT/OUTPUT); если они противоречат программе, побеждает
+    программа и выдаётся предупреждение. Явно настроенные, но не
+    используемые программой пины тоже получают pinMode.
+    """
+    manual_modes = manual_modes or {}
+    constants = find_constants(analysis)
+    plan = PinPlan()
+    directions = {}
+    for info in analysis.blocks.values():
+        if info.block.text not in PIN_USES:
+            continue
+        field, mode = PIN_USES[info.block.text]
+        pin = constant_value(info, field, constants)
+        if pin is None:
+            plan.warnings.append(Diagnostic(
+                info.block, field,
+                f"Пин '{info.fields.get(field, '')}' задан переменной: его режим нужно выбрать на панели ПИНов",
+                WARNING))
+            continue
+        directions.setdefault(pin, set()).add(mode)
+        plan.uses.setdefault(pin, []).append(info)
+
+    for pin, modes in directions.items():
+        mode = OUTPUT if OUTPUT in modes else INPUT
+        first = plan.uses[pin][0]
+        if len(modes) > 1:
+            plan.warnings.append(Diagnostic(
+                first.block, PIN_USES[first.block.text][0],
+                f"Пин {pin} и читается, и записывается программой: он будет настроен как ВЫВОД",
+                WARNING))
+        manual = manual_modes.get(pin)
+        if manual is not None and manual != mode:
+            plan.warnings.append(Diagnostic(
+                first.block, PIN_USES[first.block.text][0],
+                f"Пин {pin} на панели настроен как {MODE_NAMES[manual]}, "
+                f"но программа использует его как {MODE_NAMES[mode]}: будет {MODE_NAMES[mode]}",
+                WARNING))
+        plan.modes[pin] = mode
+
+    for pin, manual in manual_modes.items():
+        if manual is not None and pin in PINS and pin not in plan.modes:
+            plan.modes[pin] = manual
+    return plan
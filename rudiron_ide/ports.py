@@ -0,0 +1,209 @@
+"""
+Поиск последовательных портов и подключённых плат, общее чтение открытых портов.
+
+Перечисление портов на машине с множеством USB-устройств занимает сотни
+миллисекунд, поэтому интерфейс вызывает его в фоновом потоке (PortWatcher
+в serial.py), а здесь только сравнение списков и кэш сведений о портах.
+"""
+import os
+import select
+import sys
+import threading
+import time
+
+from .boards import BOARDS
+
+# Между опросами списка портов, если udev недоступен
+POLL_INTERVAL_S = 1.0
+
+
+class PortInfo:
+    """Сведения о порте: USB-идентификаторы и распознанная плата (или None)."""
+
+    def __init__(self, device, description='', hwid='', vid=None, pid=None, serial_number=None,
+                 manufacturer=None, product=None):
+        self.device = device
+        self.description = description
+        self.hwid = hwid
+        self.vid = vid
+        self.pid = pid
+        self.serial_number = serial_number
+        self.manufacturer = manufacturer
+        self.product = product
+        self.board = find_board(self)
+
+    @classmethod
+    def from_list_ports(cls, port):
+        return cls(port.device, port.description or '', port.hwid or '', port.vid, port.pid,
+                   port.serial_number, port.manufacturer, port.product)
+
+    def summary(self):
+        text = self.description if self.description and self.description != 'n/a' else self.device
+        if self.vid is not None:
+            text += f" [{self.vid:04X}:{self.pid:04X}]"
+        if self.serial_number:
+            text += f" S/N {self.serial_number}"
+        if self.board is not None:
+            text += f" - {self.board.name}"
+        return text
+
+
+def find_board(info):
+    """Плата из BOARDS, которую можно узнать по USB-идентификаторам или описанию порта."""
+    text = ' '.join(filter(None, (info.description, info.manufacturer, info.product))).lower()
+    for board in BOARDS.values():
+        if info.vid is not None and (info.vid, info.pid) in board.usb_ids:
+            return board
+        if any(keyword in text for keyword in board.usb_keywords):
+            return board
+    return None
+
+
+class PortScanner:
+    """
+    Перечисляет порты и сравнивает с прошлым разом.
+
+    Сведения о порте кэшируются по устройству и hwid: пока порт не
+    переподключён к другому устройству, PortInfo не создаётся заново.
+    """
+
+    def __init__(self):
+        self.ports = {}  # устройство -> PortInfo, как при последнем сканировании
+
+    def scan(self):
+        """Новый список портов и изменения: (порты, добавленные, удалённые)."""
+        # Импорт здесь, а не в начале модуля: сканирование идёт в фоновом потоке и не задерживает запуск окна
+        import serial.tools.list_ports
+        ports = {}
+        for port in serial.tools.list_ports.comports():
+            cached = self.ports.get(port.device)
+            if cached is not None and cached.hwid == (port.hwid or ''):
+                ports[port.device] = cached
+            else:
+                ports[port.device] = PortInfo.from_list_ports(port)
+        added = [info for device, info in ports.items() if self.ports.get(device) is not info]
+        removed = [info for device, info in self.ports.items() if ports.get(device) is not info]
+        self.ports = ports
+        return ports, added, removed
+
+
+def udev_monitor():
+    """Монитор событий udev для tty-устройств (Linux с pyudev) или None - тогда порты опрашиваются."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        import pyudev
+    except ImportError:
+        return None
+    monitor = pyudev.Monitor.from_netlink(pyudev.Context())
+    monitor.filter_by('tty')
+    monitor.start()
+    return monitor
+
+
+def file_descriptor(port):
+    """Дескриптор порта для select() или None, если порт можно только опрашивать."""
+    fileno = getattr(port, 'fileno', None)
+    if fileno is None:
+        return None
+    try:
+        return fileno()
+    except (OSError, ValueError):
+        return None
+
+
+class ReaderPool:
+    """
+    Один фоновый поток читает все открытые порты монитора.
+
+    Порты с файловым дескриптором (pyserial на Linux и macOS) ждут данных
+    в select(), поэтому открытые, но молчащие порты не тратят процессор.
+    Остальные (Windows, виртуальный порт симулятора, воспроизведение записи)
+    опрашиваются раз в poll_s. Принятые байты передаются в on_data(port, data)
+    из потока пула; при ошибке чтения порт убирается из пула и вызывается
+    on_error(port, error).
+    """
+
+    def __init__(self, poll_s=0.05, batch_s=0.01):
+        self.poll_s = poll_s
+        self.batch_s = batch_s  # подождать после пробуждения, чтобы прочитать пачку, а не по байту
+        self.lock = threading.Lock()
+        self.readers = {}  # порт -> (on_data, on_error)
+        self.wake_read, self.wake_write = os.pipe() if os.name == 'posix' else (None, None)
+        self.wake_event = threading.Event()
+        self.thread = None
+        self.stopping = False
+
+    def add(self, port, on_data, on_error):
+        with self.lock:
+            self.readers[port] = (on_data, on_error)
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+        self.wake()
+
+    def remove(self, port):
+        """Убрать порт; после возврата пул его больше не читает, и порт можно закрыть."""
+        with self.lock:
+            self.readers.pop(port, None)
+        self.wake()
+
+    def wake(self):
+        if self.wake_write is not None:
+            os.write(self.wake_write, b'\0')
+        else:
+            self.wake_event.set()
+
+    def stop(self):
+        self.stopping = True
+        if self.thread is not None:
+            self.wake()
+            self.thread.join()
+
+    def run(self):
+        while not self.stopping:
+            with self.lock:
+                ports = list(self.readers)
+            selectable = {}
+            polled = []
+            for port in ports:
+                fd = file_descriptor(port)
+                if fd is None:
+                    polled.append(port)
+                else:
+                    selectable[fd] = port
+            timeout = self.poll_s if polled else None
+            ready = []
+            if self.wake_read is not None:
+                try:
+                    readable, _, _ = select.select([self.wake_read] + list(selectable), [], [], timeout)
+                except (OSError, ValueError):
+                    # Порт закрылся во время ожидания: список портов обновится на следующем круге
+                    continue
+                if self.wake_read in readable:
+                    os.read(self.wake_read, 4096)
+                ready = [selectable[fd] for fd in readable if fd in selectable]
+            else:
+                self.wake_event.wait(timeout)
+                self.wake_event.clear()
+            if ready:
+                time.sleep(self.batch_s)
+            for port in ready + polled:
+                self.read(port)
+
+    def read(self, port):
+        with self.lock:
+            callbacks = self.readers.get(port)
+            if callbacks is None:
+                return
+            try:
+                data = port.read_all()
+                error = None
+            except Exception as e:
+                self.readers.pop(port, None)
+                data, error = None, e
+        on_data, on_error = callbacks
+        if error is not None:
+            on_error(port, error)
+        elif data:
+            on_data(port, data)
@@ -0,0 +1,70 @@
+class ProgramNode:
+    """
+    Снимок блока программы без Qt.
+
+    Повторяет интерфейс блоков, которым пользуются анализатор и симулятор:
+    text, fields(), next_block и child_blocks. Снимок можно обрабатывать
+    в другом потоке или вообще без графического интерфейса.
+    """
+
+    def __init__(self, text, fields=None, source=None):
+        self.text = text
+        self.field_values = dict(fields or {})
+        self.source = source  # исходный блок на холсте, если снимок сделан с него
+        self.next_block = None
+        self.child_blocks = []
+
+    def fields(self):
+        return dict(self.field_values)
+
+
+def snapshot_chain(block):
+    """Снять копию цепочки блоков (вместе с телами управляющих блоков)."""
+    head = None
+    prev = None
+    while block is not None:
+        node = ProgramNode(block.text, block.fields(), block)
+        child_blocks = getattr(block, 'child_blocks', [])
+        if child_blocks:
+            body = snapshot_chain(child_blocks[0])
+            while body is not None:
+                node.child_blocks.append(body)
+                body = body.next_block
+        if prev is None:
+            head = node
+        else:
+            prev.next_block = node
+        prev = node
+        block = block.next_block
+    return head
+
+
+def chain_to_data(block):
+    """Цепочка блоков в виде списков и словарей, которые можно сохранить в JSON."""
+    data = []
+    while block is not None:
+        item = {'text': block.text, 'fields': block.fields()}
+        child_blocks = getattr(block, 'child_blocks', [])
+        if child_blocks:
+            item['body'] = chain_to_data(child_blocks[0])
+        data.append(item)
+        block = block.next_block
+    return data
+
+
+def chain_from_data(data):
+    """Восстановить цепочку из данных chain_to_data; возвращает первый узел или None."""
+    head = None
+    prev = None
+    for item in data:
+        node = ProgramNode(item['text'], item.get('fields'))
+        body = chain_from_data(item.get('body', []))
+        while body is not None:
+            node.child_blocks.append(body)
+            body = body.next_block
+        if prev is None:
+            head = node
+        else:
+            prev.next_block = node
+        prev = node
+    return head
@@ -0,0 +1,225 @@
+"""
+Запись сеанса последовательного порта и её воспроизведение.
+
+Файл записи только дописывается: заголовок, затем записи "время, направление,
+байты". Рядом лежит разреженный индекс (файл .idx): время и смещение записи
+примерно раз в секунду. Для воспроизведения файл отображается в память, а по
+индексу сразу находится нужное место, поэтому даже многочасовая запись
+открывается мгновенно.
+"""
+import bisect
+import mmap
+import os
+import struct
+import threading
+import time
+
+MAGIC = b'RSREC001'
+HEADER = struct.Struct('<8sd')  # метка формата, время начала записи (Unix, с)
+RECORD = struct.Struct('<qBH')  # время от начала записи (мкс), направление, длина данных
+INDEX_ENTRY = struct.Struct('<qQ')  # время (мкс), смещение записи в файле
+INDEX_SUFFIX = '.idx'
+INDEX_INTERVAL_US = 1000000
+
+RX = 0  # принято от платы
+TX = 1  # отправлено на плату
+
+MAX_RECORD_DATA = 0xFFFF
+
+
+class SessionRecorder:
+    """Дописывает принятые и отправленные байты в файл записи."""
+
+    def __init__(self, path, index_interval_us=INDEX_INTERVAL_US):
+        self.path = path
+        self.index_interval_us = index_interval_us
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            self.started = time.time()
+            self.file.write(HEADER.pack(MAGIC, self.started))
+        else:
+            # Продолжаем существующую запись: время считается от её начала
+            with open(path, 'rb') as existing:
+                magic, self.started = HEADER.unpack(existing.read(HEADER.size))
+            if magic != MAGIC:
+                self.file.close()
+                raise ValueError(f"{path} - не файл записи сеанса")
+        self.index = open(path + INDEX_SUFFIX, 'ab')
+        self.last_indexed_us = None
+
+    def record(self, direction, data, timestamp=None):
+        time_us = int(((timestamp if timestamp is not None else time.time()) - self.started) * 1e6)
+        if self.last_indexed_us is None or time_us - self.last_indexed_us >= self.index_interval_us:
+            self.index.write(INDEX_ENTRY.pack(time_us, self.file.tell()))
+            self.index.flush()
+            self.last_indexed_us = time_us
+        for start in range(0, len(data), MAX_RECORD_DATA):
+            chunk = data[start:start + MAX_RECORD_DATA]
+            self.file.write(RECORD.pack(time_us, direction, len(chunk)))
+            self.file.write(chunk)
+        # Сбрасываем сразу: при аварийном завершении запись сохранится до последнего куска
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+        self.index.close()
+
+
+class SessionRecording:
+    """Записанный сеанс, открытый для чтения через отображение в память."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.size = os.fstat(self.file.fileno()).st_size
+        if self.size < HEADER.size:
+            self.file.close()
+            raise ValueError(f"{path} - пустой или повреждённый файл записи")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.started = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} - не файл записи сеанса")
+        self.index_times, self.index_offsets = self.load_index()
+        self._duration_us = None
+
+    def load_index(self):
+        times = [0]
+        offsets = [HEADER.size]
+        try:
+            with open(self.path + INDEX_SUFFIX, 'rb') as index:
+                raw = index.read()
+        except FileNotFoundError:
+            # Без индекса - один раз проходим файл целиком
+            return self.build_index()
+        raw = raw[:len(raw) - len(raw) % INDEX_ENTRY.size]
+        for time_us, offset in INDEX_ENTRY.iter_unpack(raw):
+            if offset < self.size and time_us >= times[-1]:
+                times.append(time_us)
+                offsets.append(offset)
+        return times, offsets
+
+    def build_index(self):
+        times = [0]
+        offsets = [HEADER.size]
+        for offset, time_us, _, _ in self.records():
+            if time_us - times[-1] >= INDEX_INTERVAL_US:
+                times.append(time_us)
+                offsets.append(offset)
+        return times, offsets
+
+    def records(self, offset=HEADER.size):
+        """Записи начиная со смещения: (смещение, время в мкс, направление, байты)."""
+        data = self.data
+        while offset + RECORD.size <= self.size:
+            time_us, direction, length = RECORD.unpack_from(data, offset)
+            start = offset + RECORD.size
+            if start + length > self.size:
+                break  # последняя запись оборвалась
+            yield offset, time_us, direction, data[start:start + length]
+            offset = start + length
+
+    def seek(self, time_us):
+        """Смещение первой записи не раньше time_us."""
+        position = max(0, bisect.bisect_right(self.index_times, time_us) - 1)
+        for offset, record_us, _, _ in self.records(self.index_offsets[position]):
+            if record_us >= time_us:
+                return offset
+        return self.size
+
+    @property
+    def duration_us(self):
+        if self._duration_us is None:
+            # После последней отметки индекса - не больше INDEX_INTERVAL_US записей
+            self._duration_us = self.index_times[-1]
+            for _, time_us, _, _ in self.records(self.index_offsets[-1]):
+                self._duration_us = time_us
+        return self._duration_us
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+
+class ReplayPort:
+    """
+    Воспроизведение записи с интерфейсом порта (как serial.Serial).
+
+    read_all() отдаёт принятые от платы байты, время которых уже наступило
+    с учётом скорости; speed=0 - без пауз. Отправленные на плату байты
+    передаются в on_transmit. Запись в порт при воспроизведении игнорируется.
+    Читать и перематывать можно из разных потоков.
+    """
+
+    # Сколько байт отдавать за раз при максимальной скорости, чтобы не завалить консоль
+    max_read = 64 * 1024
+
+    def __init__(self, recording, speed=1):
+        self.recording = recording
+        self.port = os.path.basename(recording.path)
+        self.is_open = True
+        self.on_transmit = None
+        self.speed = speed
+        self.lock = threading.Lock()
+        self.seek(0)
+
+    def seek(self, time_us):
+        with self.lock:
+            self.offset = self.recording.seek(time_us)
+            self.position_us = time_us
+            self.anchor_us = time_us
+            self.anchor_wall = time.monotonic()
+
+    def set_speed(self, speed):
+        with self.lock:
+            self.anchor_us = self.position_us
+            self.anchor_wall = time.monotonic()
+            self.speed = speed
+
+    @property
+    def finished(self):
+        return self.offset >= self.recording.size
+
+    def read_all(self):
+        with self.lock:
+            if not self.is_open:
+                return b''
+            return self.read_due()
+
+    def read_due(self):
+        until = None
+        if self.speed:
+            until = self.anchor_us + (time.monotonic() - self.anchor_wall) * 1e6 * self.speed
+        received = []
+        size = 0
+        for offset, time_us, direction, data in self.recording.records(self.offset):
+            if until is not None and time_us > until:
+                break
+            if direction == TX and received:
+                # Сначала отдаём принятое раньше, чтобы порядок в консоли совпадал с записью
+                break
+            self.offset = offset + RECORD.size + len(data)
+            self.position_us = time_us
+            if direction == RX:
+                received.append(data)
+                size += len(data)
+            elif self.on_transmit is not None:
+                self.on_transmit(data)
+            if size >= self.max_read:
+                break
+        if until is not None and not self.finished:
+            self.position_us = max(self.position_us, int(until))
+        return b''.join(received)
+
+    def write(self, data):
+        return 0
+
+    @property
+    def in_waiting(self):
+        return 0
+
+    def close(self):
+        with self.lock:
+            if self.is_open:
+                self.is_open = False
+                self.recording.close()
@@ -0,0 +1,595 @@
+"""
+Монитор последовательного порта: поиск портов, вкладка на каждый порт,
+запись и воспроизведение сеансов.
+"""
+from collections import deque
+import threading
+import time
+
+from PyQt6.QtWidgets import (
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QMessageBox, QLineEdit, QComboBox,
+    QTextEdit, QFileDialog, QSlider, QTabBar, QTabWidget
+)
+from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal
+
+from .ports import POLL_INTERVAL_S, PortScanner, ReaderPool, udev_monitor
+from .recording import RX, TX, ReplayPort, SessionRecorder, SessionRecording
+from .timing import BAUD_RATE
+
+
+# Ускорение виртуальных часов симулятора; 0 - без ожидания в delay()
+SIMULATION_SPEEDS = {'1×': 1, '10×': 10, 'Макс.': 0}
+
+
+def format_position(us):
+    """Позиция в записи сеанса: ч:мм:сс."""
+    seconds = int(us // 1000000)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+# Скорости порта на выбор в мониторе
+BAUD_RATES = [9600, 19200, 38400, 57600, 115200]
+# Сколько строк хранит каждая вкладка монитора
+MONITOR_LINES = 5000
+
+# Варианты конца строки при отправке в порт
+LINE_TERMINATORS = {'LF (\\n)': '\n', 'CR+LF (\\r\\n)': '\r\n', 'CR (\\r)': '\r', 'Без конца строки': ''}
+
+
+class PortWatcher(QThread):
+    """
+    Поиск последовательных портов в фоне, чтобы перечисление не тормозило интерфейс.
+
+    На Linux с pyudev список обновляется по событиям подключения устройств,
+    иначе опрашивается раз в POLL_INTERVAL_S. ports_changed приходит при первом
+    поиске, при изменениях и после rescan().
+    """
+    ports_changed = pyqtSignal(dict, list, list)  # порты, добавленные, удалённые
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.scanner = PortScanner()
+        self.wake = threading.Event()
+        self.stopping = False
+
+    def run(self):
+        monitor = udev_monitor()
+        changed = forced = True  # о первом поиске сообщаем всегда
+        while not self.stopping:
+            if changed or forced:
+                ports, added, removed = self.scanner.scan()
+                if added or removed or forced:
+                    self.ports_changed.emit(ports, added, removed)
+            if monitor is not None:
+                # Короткий таймаут, чтобы вовремя заметить rescan() и stop()
+                changed = monitor.poll(timeout=0.2) is not None
+            else:
+                self.wake.wait(POLL_INTERVAL_S)
+                changed = True
+            forced = self.wake.is_set()
+            self.wake.clear()
+
+    def rescan(self):
+        self.wake.set()
+
+    def stop(self):
+        self.stopping = True
+        self.wake.set()
+        self.wait()
+
+
+class SerialReaderWidget(QWidget):
+    """
+    Одно подключение монитора порта: консоль со своим буфером строк, скоростью,
+    фильтром и записью сеанса. Данные из порта читает общий ReaderPool.
+    """
+    data_received = pyqtSignal(object, bytes)  # порт и байты из потока пула
+    read_failed = pyqtSignal(object, str)
+    transmit_replayed = pyqtSignal(bytes)
+    lines_received = pyqtSignal(str, list)  # имя порта и новые строки - для общей вкладки
+    port_changed = pyqtSignal(str)  # имя подключённого порта или '' после отключения
+
+    def __init__(self, pool, parent=None):
+        super().__init__(parent)
+        self.pool = pool
+        self.serial_port = None
+        self.recorder = None  # запись сеанса в файл, если включена
+        self.ports = None  # устройство -> PortInfo по последнему поиску
+        self.lines = deque(maxlen=MONITOR_LINES)  # (строка из порта?, текст) - для перерисовки по фильтру
+        self.pending = ''  # начало строки, конец которой ещё не пришёл
+        self.init_ui()
+        self.setup_timer()
+        self.data_received.connect(self.port_data)
+        self.read_failed.connect(self.port_failed)
+        self.transmit_replayed.connect(self.show_replayed_transmit)
+
+    def init_ui(self):
+        # Основные макеты
+        main_layout = QVBoxLayout()
+        port_layout = QHBoxLayout()
+        send_layout = QHBoxLayout()
+        record_layout = QHBoxLayout()
+
+        # Выбор последовательного порта
+        self.port_label = QLabel("Последовательный порт:")
+        self.port_combo = QComboBox()
+        self.baud_combo = QComboBox()
+        self.baud_combo.addItems([str(baud) for baud in BAUD_RATES])
+        self.baud_combo.setCurrentText(str(BAUD_RATE))
+        self.refresh_button = QPushButton("Обновить")
+        self.connect_button = QPushButton("Подключиться")
+        self.connect_button.clicked.connect(self.toggle_connection)
+
+        # Добавление элементов в портовый макет
+        port_layout.addWidget(self.port_label)
+        port_layout.addWidget(self.port_combo)
+        port_layout.addWidget(self.baud_combo)
+        port_layout.addWidget(self.refresh_button)
+        port_layout.addWidget(self.connect_button)
+
+        # Текстовая область для отображения полученных данных
+        self.text_area = QTextEdit()
+        self.text_area.setReadOnly(True)
+        self.text_area.setPlaceholderText("Полученные данные будут отображаться здесь...")
+
+        # Поле ввода и кнопка для отправки данных
+        self.send_input = QLineEdit()
+        self.send_input.setPlaceholderText("Введите данные для отправки...")
+        self.send_input.returnPressed.connect(self.send_serial_data)  # Отправка при нажатии Enter
+
+        self.send_button = QPushButton("Отправить")
+        self.send_button.clicked.connect(self.send_serial_data)
+        self.send_button.setEnabled(False)  # Отключена до подключения
+
+        # Конец строки, который добавляется к отправляемым данным
+        self.terminator_combo = QComboBox()
+        self.terminator_combo.addItems(LINE_TERMINATORS)
+
+        # Добавление элементов в отправочный макет
+        send_layout.addWidget(self.send_input)
+        send_layout.addWidget(self.terminator_combo)
+        send_layout.addWidget(self.send_button)
+
+        # Фильтр показывает только строки из порта, содержащие текст
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Фильтр строк...")
+        self.filter_input.textChanged.connect(self.render_lines)
+
+        # Запись сеанса и воспроизведение записи
+        self.record_button = QPushButton("Запись")
+        self.record_button.clicked.connect(self.toggle_recording)
+        self.replay_button = QPushButton("Воспроизвести")
+        self.replay_button.clicked.connect(self.start_replay)
+        self.replay_speed_combo = QComboBox()
+        self.replay_speed_combo.addItems(list(SIMULATION_SPEEDS))
+        self.replay_speed_combo.currentTextChanged.connect(self.replay_speed_changed)
+        self.replay_slider = QSlider(Qt.Orientation.Horizontal)
+        self.replay_slider.sliderReleased.connect(self.seek_replay)
+        self.replay_slider.setVisible(False)
+        self.replay_label = QLabel()
+
+        record_layout.addWidget(self.filter_input)
+        record_layout.addWidget(self.record_button)
+        record_layout.addWidget(self.replay_button)
+        record_layout.addWidget(self.replay_speed_combo)
+        record_layout.addWidget(self.replay_slider, 1)
+        record_layout.addWidget(self.replay_label)
+
+        # Добавление всех макетов в основной макет
+        main_layout.addLayout(port_layout)
+        main_layout.addWidget(self.text_area)
+        main_layout.addLayout(send_layout)
+        main_layout.addLayout(record_layout)
+
+        self.setLayout(main_layout)
+        self.setWindowTitle("Serial Reader Widget")
+        self.resize(600, 400)
+
+        # Список портов заполнит фоновый поиск
+        self.port_combo.addItem("Поиск портов...")
+        self.connect_button.setEnabled(False)
+
+    def setup_timer(self):
+        """Таймеры показа неполной строки и позиции воспроизведения; порт читает пул."""
+        # Строка без конца (Serial.print без ln) показывается, если продолжение долго не приходит
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(300)
+        self.flush_timer.timeout.connect(self.flush_pending)
+        self.replay_timer = QTimer(self)
+        self.replay_timer.setInterval(250)
+        self.replay_timer.timeout.connect(self.update_replay_position)
+
+    def update_ports(self, ports, added, removed, busy=()):
+        """Обновление списка портов по результату фонового поиска; busy - порты, занятые другими вкладками."""
+        first_scan = self.ports is None
+        self.ports = ports
+        connected = self.serial_port is not None and self.serial_port.is_open
+        current = self.port_combo.currentText()
+        # Только что подключённая плата выбирается сама, если порт сейчас не занят
+        new_boards = [info.device for info in added if info.board is not None and info.device not in busy]
+        boards = [info.device for info in ports.values() if info.board is not None and info.device not in busy]
+        free = [device for device in ports if device not in busy]
+        if new_boards and not connected:
+            selected = new_boards[0]
+        elif current in ports:
+            selected = current
+        else:
+            selected = (boards or free or list(ports) or [None])[0]
+
+        self.port_combo.clear()
+        for info in ports.values():
+            self.port_combo.addItem(info.device)
+            self.port_combo.setItemData(self.port_combo.count() - 1, info.summary(), Qt.ItemDataRole.ToolTipRole)
+        if ports:
+            self.port_combo.setCurrentText(selected)
+        else:
+            self.port_combo.addItem("Порты не найдены")
+        self.connect_button.setEnabled(bool(ports) or connected)
+
+        if first_scan:
+            return
+        for info in added:
+            self.log(f"Подключено устройство {info.device}: {info.summary()}")
+        for info in removed:
+            self.log(f"Отключено устройство {info.device}")
+            if connected and getattr(self.serial_port, 'port', None) == info.device:
+                self.disconnect_serial()
+
+    def toggle_connection(self):
+        """Переключение состояния подключения."""
+        if self.serial_port and self.serial_port.is_open:
+            self.disconnect_serial()
+        else:
+            self.connect_serial()
+
+    def connect_serial(self):
+        """Подключение к выбранному последовательному порту."""
+        selected_port = self.port_combo.currentText()
+        if selected_port == "Порты не найдены":
+            QMessageBox.warning(self, "Ошибка подключения", "Доступные последовательные порты не найдены.")
+            return
+        # pyserial нужен только при подключении: не импортируем его при запуске окна
+        import serial
+        try:
+            self.serial_port = serial.Serial(
+                port=selected_port,
+                baudrate=int(self.baud_combo.currentText()),
+                timeout=1,
+                bytesize=serial.EIGHTBITS,
+                parity=serial.PARITY_NONE,
+                stopbits=serial.STOPBITS_ONE
+            )
+            if self.serial_port.is_open:
+                self.connect_button.setText("Отключиться")
+                self.send_button.setEnabled(True)
+                self.log(f"Подключено к {selected_port}\n")
+                self.start_reading()
+        except serial.SerialException as e:
+            QMessageBox.critical(self, "Ошибка подключения",
+                                 f"Не удалось подключиться к {selected_port}.\n\nОшибка: {e}")
+            self.connect_button.setEnabled(False)
+            self.send_button.setEnabled(False)
+            self.serial_port = None
+
+    def disconnect_serial(self):
+        """Отключение от последовательного порта."""
+        if self.serial_port and self.serial_port.is_open:
+            # Сначала убираем порт из пула, чтобы его не читали во время закрытия
+            self.pool.remove(self.serial_port)
+            self.flush_pending()
+            self.serial_port.close()
+            self.connect_button.setText("Подключиться")
+            self.send_button.setEnabled(False)
+            self.log("Отключено от последовательного порта.\n")
+            self.port_changed.emit('')
+        self.replay_timer.stop()
+        self.replay_slider.setVisible(False)
+        self.replay_label.clear()
+
+    def attach_port(self, port):
+        """Подключиться к уже открытому порту, например к виртуальному порту симулятора."""
+        self.disconnect_serial()
+        self.serial_port = port
+        self.connect_button.setText("Отключиться")
+        self.connect_button.setEnabled(True)
+        self.send_button.setEnabled(True)
+        self.log(f"Подключено к {port.port}\n")
+        self.start_reading()
+
+    def start_reading(self):
+        self.pending = ''
+        self.pool.add(self.serial_port, self.data_received.emit,
+                      lambda port, error: self.read_failed.emit(port, str(error)))
+        self.port_changed.emit(self.serial_port.port)
+
+    def read_serial_data(self):
+        """Забрать из порта то, что пул ещё не прочитал, например сразу после остановки симуляции."""
+        if self.serial_port and self.serial_port.is_open:
+            self.port_data(self.serial_port, self.serial_port.read_all())
+            self.flush_pending()
+
+    def port_data(self, port, raw):
+        """Байты из порта: в запись сеанса, затем целыми строками в консоль."""
+        if port is not self.serial_port or not raw:
+            return  # данные от уже отключённого порта
+        if self.recorder is not None and not isinstance(port, ReplayPort):
+            self.recorder.record(RX, raw)
+        *lines, self.pending = (self.pending + raw.decode('ascii', errors='replace')).split('\n')
+        if self.pending:
+            self.flush_timer.start()
+        if lines:
+            self.add_lines([line.rstrip('\r') for line in lines])
+
+    def flush_pending(self):
+        if self.pending:
+            line, self.pending = self.pending, ''
+            self.add_lines([line.rstrip('\r')])
+
+    def add_lines(self, lines):
+        self.lines.extend((True, line) for line in lines)
+        shown = [line for line in lines if self.matches(line)]
+        if shown:
+            self.append_text('\n'.join(shown))
+        self.lines_received.emit(self.serial_port.port, lines)
+
+    def port_failed(self, port, message):
+        if port is not self.serial_port:
+            return
+        self.log(f"Ошибка последовательного порта: {message}\n")
+        QMessageBox.critical(self, "Ошибка последовательного порта",
+                             f"Произошла ошибка при чтении данных.\n\nОшибка: {message}")
+        self.disconnect_serial()
+
+    def log(self, text):
+        """Сообщение в консоль; фильтр строк его не скрывает."""
+        self.lines.append((False, text))
+        self.append_text(text)
+
+    def matches(self, line):
+        pattern = self.filter_input.text().lower()
+        return not pattern or pattern in line.lower()
+
+    def render_lines(self):
+        """Перерисовать консоль из буфера строк, например после смены фильтра."""
+        self.text_area.clear()
+        text = '\n'.join(line for data, line in self.lines if not data or self.matches(line))
+        if text:
+            self.append_text(text)
+
+    def append_text(self, text):
+        self.text_area.append(text)
+        # Автопрокрутка вниз
+        self.text_area.verticalScrollBar().setValue(
+            self.text_area.verticalScrollBar().maximum()
+        )
+
+    def send_serial_data(self):
+        """Отправка данных через последовательный порт."""
+        if self.serial_port and self.serial_port.is_open:
+            data = self.send_input.text()
+            if data:
+                import serial
+                try:
+                    # Блоки "Пришла строка" и "Пришло число" ждут конца строки: \r, \n или оба
+                    terminator = LINE_TERMINATORS[self.terminator_combo.currentText()]
+                    encoded = (data + terminator).encode('utf-8')
+                    self.serial_port.write(encoded)
+                    if self.recorder is not None:
+                        self.recorder.record(TX, encoded)
+                    self.log(f"Отправлено: {data}")
+                    self.send_input.clear()
+                except serial.SerialException as e:
+                    self.log(f"Ошибка отправки данных: {e}\n")
+                    QMessageBox.critical(self, "Ошибка отправки", f"Не удалось отправить данные.\n\nОшибка: {e}")
+                    self.disconnect_serial()
+                except Exception as e:
+                    self.log(f"Неожиданная ошибка при отправке данных: {e}\n")
+                    QMessageBox.critical(self, "Неожиданная ошибка",
+                                         f"Произошла неожиданная ошибка при отправке данных.\n\nОшибка: {e}")
+        else:
+            QMessageBox.warning(self, "Не подключено",
+                                "Пожалуйста, подключитесь к последовательному порту перед отправкой данных.")
+
+    def toggle_recording(self):
+        """Начать или остановить запись принятых и отправленных байтов в файл."""
+        if self.recorder is not None:
+            self.recorder.close()
+            self.log(f"Запись сохранена в {self.recorder.path}\n")
+            self.recorder = None
+            self.record_button.setText("Запись")
+            return
+        default_name = time.strftime("сеанс-%Y%m%d-%H%M%S.rsr")
+        path, _ = QFileDialog.getSaveFileName(self, "Записать сеанс", default_name, "Запись сеанса (*.rsr)")
+        if not path:
+            return
+        try:
+            self.recorder = SessionRecorder(path)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Запись сеанса", f"Не удалось начать запись.\n\nОшибка: {e}")
+            return
+        self.record_button.setText("Остановить запись")
+        self.log(f"Запись сеанса в {path}\n")
+
+    def start_replay(self):
+        """Открыть запись сеанса и воспроизвести её в консоли, как вывод платы."""
+        path, _ = QFileDialog.getOpenFileName(self, "Воспроизвести сеанс", "", "Запись сеанса (*.rsr)")
+        if not path:
+            return
+        try:
+            recording = SessionRecording(path)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Воспроизведение", f"Не удалось открыть запись.\n\nОшибка: {e}")
+            return
+        port = ReplayPort(recording, SIMULATION_SPEEDS[self.replay_speed_combo.currentText()])
+        # Запись читается в потоке пула, а консоль меняется только в потоке интерфейса
+        port.on_transmit = self.transmit_replayed.emit
+        self.attach_port(port)
+        # В запись нельзя ничего отправить
+        self.send_button.setEnabled(False)
+        self.replay_slider.setRange(0, recording.duration_us // 1000)
+        self.replay_slider.setValue(0)
+        self.replay_slider.setVisible(True)
+        self.update_replay_position()
+        self.replay_timer.start()
+
+    def show_replayed_transmit(self, data):
+        self.flush_pending()
+        self.log(f"Отправлено: {data.decode('utf-8', errors='replace').strip()}")
+
+    def replay_speed_changed(self, text):
+        if isinstance(self.serial_port, ReplayPort):
+            self.serial_port.set_speed(SIMULATION_SPEEDS[text])
+
+    def seek_replay(self):
+        if isinstance(self.serial_port, ReplayPort) and self.serial_port.is_open:
+            self.serial_port.seek(self.replay_slider.value() * 1000)
+            self.pending = ''
+            self.log(f"Перемотка на {format_position(self.serial_port.position_us)}")
+            self.update_replay_position()
+
+    def update_replay_position(self):
+        port = self.serial_port
+        if not isinstance(port, ReplayPort) or not port.is_open:
+            return
+        position_ms = min(port.position_us, port.recording.duration_us) // 1000
+        if not self.replay_slider.isSliderDown():
+            self.replay_slider.setValue(position_ms)
+        self.replay_label.setText(f"{format_position(position_ms * 1000)} / "
+                                  f"{format_position(port.recording.duration_us)}")
+
+    def close_session(self):
+        """Закрыть порт и запись сеанса, например при закрытии вкладки."""
+        self.disconnect_serial()
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def closeEvent(self, event):
+        """Корректное закрытие соединения при закрытии виджета."""
+        self.close_session()
+        event.accept()
+
+
+class SerialMonitorWidget(QWidget):
+    """
+    Монитор нескольких последовательных портов: вкладка на каждое подключение
+    и общая вкладка, где строки всех портов помечены именем порта.
+
+    Все подключения читает один ReaderPool, список портов ищет один PortWatcher.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = ReaderPool()
+        self.ports = None
+        self.opened_tabs = 0
+        self.all_lines = deque(maxlen=MONITOR_LINES)  # (порт, строка) всех вкладок
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.tabs = QTabWidget()
+        self.tabs.setTabsClosable(True)
+        self.tabs.tabCloseRequested.connect(self.close_tab)
+        add_button = QPushButton("+")
+        add_button.setToolTip("Новое подключение")
+        add_button.clicked.connect(self.add_reader)
+        self.tabs.setCornerWidget(add_button)
+
+        # Общая вкладка
+        all_ports = QWidget()
+        all_layout = QVBoxLayout()
+        self.all_text_area = QTextEdit()
+        self.all_text_area.setReadOnly(True)
+        self.all_text_area.setPlaceholderText("Строки со всех подключённых портов...")
+        self.all_filter_input = QLineEdit()
+        self.all_filter_input.setPlaceholderText("Фильтр строк (в том числе по имени порта)...")
+        self.all_filter_input.textChanged.connect(self.render_all_lines)
+        all_layout.addWidget(self.all_text_area)
+        all_layout.addWidget(self.all_filter_input)
+        all_ports.setLayout(all_layout)
+        self.tabs.addTab(all_ports, "Все порты")
+        self.tabs.tabBar().setTabButton(0, QTabBar.ButtonPosition.RightSide, None)
+        layout.addWidget(self.tabs)
+        self.setLayout(layout)
+
+        self.port_watcher = PortWatcher(self)
+        self.port_watcher.ports_changed.connect(self.update_ports)
+        QApplication.instance().aboutToQuit.connect(self.shutdown)
+
+    def start(self):
+        """Открыть первую вкладку подключения и начать поиск портов; MainWindow делает это после первой отрисовки."""
+        if self.readers():
+            return
+        self.add_reader()
+        self.port_watcher.start()
+
+    def readers(self):
+        return [self.tabs.widget(index) for index in range(1, self.tabs.count())]
+
+    def current_reader(self):
+        """Вкладка выбранного подключения, а на общей вкладке - первое подключение."""
+        self.start()
+        widget = self.tabs.currentWidget()
+        return widget if isinstance(widget, SerialReaderWidget) else self.readers()[0]
+
+    def add_reader(self):
+        self.opened_tabs += 1
+        reader = SerialReaderWidget(self.pool, self)
+        reader.title = f"Порт {self.opened_tabs}"
+        reader.refresh_button.clicked.connect(self.port_watcher.rescan)
+        reader.lines_received.connect(self.add_to_all)
+        reader.port_changed.connect(lambda name, reader=reader: self.rename_tab(reader, name))
+        self.tabs.addTab(reader, reader.title)
+        if self.ports is not None:
+            reader.update_ports(self.ports, [], [], self.busy_devices(reader))
+        self.tabs.setCurrentWidget(reader)
+        return reader
+
+    def close_tab(self, index):
+        reader = self.tabs.widget(index)
+        # Общая вкладка и последнее подключение остаются
+        if not isinstance(reader, SerialReaderWidget) or len(self.readers()) == 1:
+            return
+        reader.close_session()
+        self.tabs.removeTab(index)
+        reader.deleteLater()
+
+    def rename_tab(self, reader, name):
+        index = self.tabs.indexOf(reader)
+        if index >= 0:
+            self.tabs.setTabText(index, name or reader.title)
+
+    def busy_devices(self, reader):
+        """Порты, открытые в других вкладках."""
+        return {other.serial_port.port for other in self.readers()
+                if other is not reader and other.serial_port is not None and other.serial_port.is_open}
+
+    def update_ports(self, ports, added, removed):
+        self.ports = ports
+        for reader in self.readers():
+            reader.update_ports(ports, added, removed, self.busy_devices(reader))
+
+    def add_to_all(self, port_name, lines):
+        tagged = [f"[{port_name}] {line}" for line in lines]
+        self.all_lines.extend(tagged)
+        shown = [line for line in tagged if self.all_matches(line)]
+        if shown:
+            self.all_text_area.append('\n'.join(shown))
+            self.all_text_area.verticalScrollBar().setValue(self.all_text_area.verticalScrollBar().maximum())
+
+    def all_matches(self, line):
+        pattern = self.all_filter_input.text().lower()
+        return not pattern or pattern in line.lower()
+
+    def render_all_lines(self):
+        self.all_text_area.clear()
+        text = '\n'.join(line for line in self.all_lines if self.all_matches(line))
+        if text:
+            self.all_text_area.append(text)
+
+    def shutdown(self):
+        for reader in self.readers():
+            reader.close_session()
+        self.port_watcher.stop()
+        self.pool.stop()
@@ -0,0 +1,561 @@
+import re
+import struct
+import threading
+import time
+
+from .validation import AUTO_TYPE, BOOL, C_TYPES, FLOAT, INT, STRING, literal_type, parse_parameter, split_list
+
+LOW = 0
+HIGH = 1
+
+INT32_MIN = -2 ** 31
+INT32_MAX = 2 ** 31 - 1
+
+# Начало строки, которое strtod разберёт как число
+NUMBER_PREFIX = re.compile(r'\s*[+-]?([0-9]+\.?[0-9]*|\.[0-9]+)')
+# Длина буфера строки в скетче; лишние символы отбрасываются
+SERIAL_LINE_LENGTH = 64
+
+# Глубина вложенных вызовов функций: стек контроллера невелик, бесконечная рекурсия его переполнит.
+# Каждый вызов - несколько кадров стека интерпретатора, поэтому предел заметно меньше sys.getrecursionlimit()
+MAX_CALL_DEPTH = 64
+
+# Элементы массива в памяти контроллера (little-endian): так их отправляет Serial.write
+PACK_FORMATS = {'uint8_t': 'B', 'int16_t': 'h', 'int32_t': 'i', 'float': 'f'}
+
+
+class SimulationError(Exception):
+    pass
+
+
+class SimulationStopped(Exception):
+    pass
+
+
+class FunctionReturn(Exception):
+    """Выход из функции блоком "Вернуть" с любой глубины её тела."""
+
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+
+
+def wrap_int32(value):
+    # Переполнение как у 32-битного int на контроллере
+    return (value - INT32_MIN) % 2 ** 32 + INT32_MIN
+
+
+def c_divide(left, right):
+    # Целочисленное деление C++: округление к нулю
+    quotient = abs(left) // abs(right)
+    return quotient if (left >= 0) == (right >= 0) else -quotient
+
+
+def c_modulo(left, right):
+    return left - right * c_divide(left, right)
+
+
+def convert(ctype, value):
+    """Привести значение к типу переменной, как при присваивании в C++ (None - тип "авто")."""
+    if ctype is None:
+        return wrap_int32(value) if isinstance(value, int) else value
+    if ctype.kind == FLOAT:
+        return float(value)
+    if ctype.kind == BOOL:
+        return HIGH if value else LOW
+    if ctype.kind == INT:
+        # Целые типы переполняются по модулю своей ширины
+        return (int(value) - ctype.min) % (ctype.max - ctype.min + 1) + ctype.min
+    return value
+
+
+ARITHMETIC = {
+    '+': lambda left, right: left + right,
+    '-': lambda left, right: left - right,
+    '*': lambda left, right: left * right,
+    '/': c_divide,
+    '//': c_divide,
+    '%': c_modulo,
+}
+
+
+def calculate(operation, left, right):
+    if isinstance(left, float) or isinstance(right, float):
+        # С дробными операндами деление обычное ('//' в скетче тоже становится '/')
+        return left / right if operation in ('/', '//') else ARITHMETIC[operation](left, right)
+    return wrap_int32(ARITHMETIC[operation](left, right))
+
+COMPARISONS = {
+    '==': lambda left, right: left == right,
+    '!=': lambda left, right: left != right,
+    '>': lambda left, right: left > right,
+    '>=': lambda left, right: left >= right,
+    '<': lambda left, right: left < right,
+    '<=': lambda left, right: left <= right,
+}
+
+
+class VirtualClock:
+    """
+    Виртуальные часы симулятора.
+
+    speed - во сколько раз время симуляции идёт быстрее реального;
+    0 означает "максимальная скорость": delay() вообще не ждёт.
+    """
+
+    def __init__(self, speed=0):
+        self.speed = speed
+        self.now_ms = 0
+
+    def millis(self):
+        return int(self.now_ms)
+
+    def advance(self, ms):
+        self.now_ms += ms
+        if self.speed > 0 and ms > 0:
+            time.sleep(ms / 1000 / self.speed)
+
+
+class VirtualPins:
+    """Виртуальные пины: входные значения задаются заранее, записи сохраняются с отметкой времени."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.digital_inputs = {}
+        self.analog_inputs = {}
+        self.outputs = {}  # пин -> последнее записанное значение
+        self.history = []  # (время в мс, функция, пин, значение)
+        self.on_write = None
+
+    def set_digital_input(self, pin, value):
+        self.digital_inputs[pin] = HIGH if value else LOW
+
+    def set_analog_input(self, pin, value):
+        self.analog_inputs[pin] = max(0, min(1023, value))
+
+    def digital_read(self, pin):
+        return self.digital_inputs.get(pin, LOW)
+
+    def analog_read(self, pin):
+        return self.analog_inputs.get(pin, 0)
+
+    def digital_write(self, pin, value):
+        self.write('digitalWrite', pin, value)
+
+    def analog_write(self, pin, value):
+        self.write('analogWrite', pin, max(0, min(255, value)))
+
+    def write(self, function, pin, value):
+        self.outputs[pin] = value
+        event = (self.clock.millis(), function, pin, value)
+        self.history.append(event)
+        if self.on_write is not None:
+            self.on_write(*event)
+
+
+class VirtualSerial:
+    """
+    Виртуальный последовательный порт с интерфейсом как у serial.Serial.
+
+    Сторона программы: print() и read(). Сторона хоста (например,
+    SerialReaderWidget): read_all() забирает вывод программы, write() отправляет
+    байты программе. Обе стороны могут работать в разных потоках.
+    """
+
+    def __init__(self, name="Симулятор"):
+        self.port = name
+        self.is_open = True
+        self.lock = threading.Lock()
+        self.to_host = bytearray()
+        self.to_board = bytearray()
+
+    # Сторона хоста
+    def read_all(self):
+        with self.lock:
+            data = bytes(self.to_host)
+            self.to_host.clear()
+        return data
+
+    def write(self, data):
+        with self.lock:
+            self.to_board.extend(data)
+        return len(data)
+
+    @property
+    def in_waiting(self):
+        with self.lock:
+            return len(self.to_host)
+
+    def close(self):
+        self.is_open = False
+
+    # Сторона программы
+    def print(self, value):
+        # Serial.print(float) печатает два знака после запятой
+        text = f"{value:.2f}" if isinstance(value, float) else str(value)
+        with self.lock:
+            self.to_host.extend(text.encode('ascii', errors='replace'))
+
+    def available(self):
+        with self.lock:
+            return len(self.to_board)
+
+    def read(self):
+        with self.lock:
+            if not self.to_board:
+                return -1
+            return self.to_board.pop(0)
+
+    def write_raw(self, data):
+        # Serial.write(buffer, size): байты как есть, без преобразования в текст
+        with self.lock:
+            self.to_host.extend(data)
+
+
+class Simulator:
+    """
+    Интерпретатор программы из блоков на компьютере, без загрузки на плату.
+
+    Выполняет ту же цепочку блоков, из которой генерируется скетч: переменные,
+    арифметику, условия, циклы, delay, чтение и запись пинов и
+    последовательный порт. Время виртуальное, поэтому delay(1000) при
+    ускоренных часах не ждёт целую секунду. Программа должна пройти анализ
+    без ошибок. max_steps=None снимает ограничение на число шагов (например,
+    для программ с блоком "Цикл программы", которые не завершаются сами).
+    """
+
+    def __init__(self, start_block, clock=None, pins=None, serial=None, max_steps=1000000):
+        self.start_block = start_block
+        self.clock = clock if clock is not None else VirtualClock()
+        self.pins = pins if pins is not None else VirtualPins(self.clock)
+        self.serial = serial if serial is not None else VirtualSerial()
+        self.max_steps = max_steps
+        self.steps = 0
+        self.scopes = []  # имя -> значение
+        self.ctypes = []  # имя -> CType переменной (None - "авто"), области те же, что в scopes
+        self.task_due = {}  # блок "Каждые" -> время следующего запуска, мс
+        self.timers = []  # [время следующего прерывания, период, блок "Таймер"], мс
+        self.in_interrupt = False
+        self.line_buffer = bytearray()  # недочитанная строка из последовательного порта
+        self.functions = {}  # имя -> блок "Функция", который уже встретился при выполнении
+        self.call_depth = 0
+        self.stopped = False
+        self.handlers = {
+            'Переменные': self.exec_variable,
+            'Арифметика': self.exec_arithmetic,
+            'Сон': self.exec_delay,
+            'Условие': self.exec_condition,
+            'Повтор': self.exec_for_cycle,
+            'Цикл': self.exec_while_cycle,
+            'Цикл программы': self.exec_program_loop,
+            'ЦЧтение': self.exec_digital_read,
+            'АЧтение': self.exec_analog_read,
+            'ЦЗапись': self.exec_digital_write,
+            'АЗапись': self.exec_analog_write,
+            'Слушай': self.exec_serial_read,
+            'Говори': self.exec_serial_write,
+            'Массив': self.exec_array,
+            'Из массива': self.exec_array_get,
+            'В массив': self.exec_array_set,
+            'Оцифровка': self.exec_sample,
+            'Отправить массив': self.exec_bulk_write,
+            'Каждые': self.exec_every,
+            'Таймер': self.exec_timer,
+            'Пришла строка': self.exec_line_input,
+            'Пришло число': self.exec_number_input,
+            'Функция': self.exec_function,
+            'Вернуть': self.exec_return,
+            'Вызов': self.exec_call,
+        }
+
+    def run(self):
+        self.steps = 0
+        self.scopes = [{}]
+        self.ctypes = [{}]
+        self.task_due = {}
+        self.timers = []
+        self.functions = {}
+        self.call_depth = 0
+        self.exec_chain(self.start_block)
+        # Даже с пустым loop() прерывания таймеров продолжают срабатывать
+        while self.timers:
+            self.step()
+            self.advance(min(timer[0] for timer in self.timers) - self.clock.now_ms)
+        return self
+
+    def stop(self):
+        """Остановить выполнение (можно вызывать из другого потока)."""
+        self.stopped = True
+
+    def exec_chain(self, block):
+        while block is not None:
+            self.step()
+            handler = self.handlers.get(block.text)
+            if handler is not None:
+                handler(block, block.fields())
+            block = block.next_block
+
+    def exec_body(self, block):
+        child_blocks = getattr(block, 'child_blocks', [])
+        if not child_blocks:
+            return
+        self.scopes.append({})
+        self.ctypes.append({})
+        try:
+            self.exec_chain(child_blocks[0])
+        finally:
+            self.scopes.pop()
+            self.ctypes.pop()
+
+    def step(self):
+        if self.stopped:
+            raise SimulationStopped()
+        self.steps += 1
+        if self.max_steps is not None and self.steps > self.max_steps:
+            raise SimulationError(f"Превышен лимит в {self.max_steps} шагов: возможно, программа зациклилась")
+
+    def advance(self, ms):
+        """Продвинуть виртуальное время, выполняя по пути прерывания таймеров."""
+        end = self.clock.now_ms + ms
+        while self.timers and not self.in_interrupt:
+            timer = min(self.timers, key=lambda timer: timer[0])
+            if timer[0] > end:
+                break
+            self.clock.advance(timer[0] - self.clock.now_ms)
+            timer[0] += timer[1]
+            self.exec_interrupt(timer[2])
+        self.clock.advance(end - self.clock.now_ms)
+
+    def exec_interrupt(self, block):
+        # Обработчику прерывания видны только глобальные переменные
+        scopes, ctypes = self.scopes, self.ctypes
+        self.scopes, self.ctypes = scopes[:1], ctypes[:1]
+        self.in_interrupt = True
+        try:
+            self.exec_body(block)
+        finally:
+            self.scopes, self.ctypes = scopes, ctypes
+            self.in_interrupt = False
+
+    def lookup(self, name):
+        for depth in range(len(self.scopes) - 1, -1, -1):
+            if name in self.scopes[depth]:
+                return depth
+        raise SimulationError(f"Переменная '{name}' не объявлена")
+
+    def value(self, text):
+        type = literal_type(text)
+        if type == INT:
+            return wrap_int32(int(text))
+        if type == FLOAT:
+            return float(text)
+        if type == BOOL:
+            return HIGH if text == 'true' else LOW
+        if type == STRING:
+            return text[1:-1]
+        return self.scopes[self.lookup(text)][text]
+
+    def assign(self, name, value):
+        depth = self.lookup(name)
+        self.scopes[depth][name] = convert(self.ctypes[depth][name], value)
+
+    def array(self, name):
+        """Массив (список значений) и тип его элементов."""
+        depth = self.lookup(name)
+        return self.scopes[depth][name], self.ctypes[depth][name]
+
+    def element_index(self, array, text):
+        index = self.value(text)
+        if not 0 <= index < len(array):
+            raise SimulationError(f"Индекс {index} вне массива (0..{len(array) - 1})")
+        return index
+
+    def compare(self, fields):
+        left = self.value(fields['text_field'])
+        right = self.value(fields['text_field2'])
+        return COMPARISONS[fields['combo_box']](left, right)
+
+    def exec_variable(self, block, fields):
+        name, source = fields['text_field1'], fields['text_field2']
+        ctype = C_TYPES.get(fields.get('combo_box', AUTO_TYPE))
+        if ctype is None and literal_type(source) is None:
+            # auto копирует тип переменной-источника
+            ctype = self.ctypes[self.lookup(source)][source]
+        self.ctypes[-1][name] = ctype
+        self.scopes[-1][name] = convert(ctype, self.value(source))
+
+    def exec_arithmetic(self, block, fields):
+        left = self.value(fields['text_field2'])
+        right = self.value(fields['text_field3'])
+        operation = fields['combo_box']
+        if operation in ('/', '//', '%') and right == 0:
+            raise SimulationError("Деление на ноль")
+        self.assign(fields['text_field1'], calculate(operation, left, right))
+
+    def exec_delay(self, block, fields):
+        self.advance(max(0, self.value(fields['text_field'])))
+
+    def exec_condition(self, block, fields):
+        if self.compare(fields):
+            self.exec_body(block)
+
+    def exec_for_cycle(self, block, fields):
+        counter = 0
+        # Как и в сгенерированном for, граница перечитывается на каждой итерации
+        while counter < self.value(fields['text_field2']):
+            self.step()
+            self.exec_body(block)
+            counter += 1
+
+    def exec_while_cycle(self, block, fields):
+        while self.compare(fields):
+            self.step()
+            self.exec_body(block)
+
+    def exec_program_loop(self, block, fields):
+        # loop() на плате не завершается: выполняем, пока симуляцию не остановят
+        while True:
+            self.step()
+            started = self.clock.now_ms
+            self.exec_body(block)
+            if self.clock.now_ms == started and (self.task_due or self.timers):
+                # Проход не занял виртуального времени: сразу переходим к ближайшему событию
+                upcoming = list(self.task_due.values()) + [timer[0] for timer in self.timers]
+                self.advance(max(1, min(upcoming) - started))
+
+    def exec_digital_read(self, block, fields):
+        self.assign(fields['text_field1'], self.pins.digital_read(self.value(fields['text_field2'])))
+
+    def exec_analog_read(self, block, fields):
+        self.assign(fields['text_field1'], self.pins.analog_read(self.value(fields['text_field2'])))
+
+    def exec_digital_write(self, block, fields):
+        self.pins.digital_write(self.value(fields['text_field']), HIGH if fields['combo_box'] == 'HIGH' else LOW)
+
+    def exec_analog_write(self, block, fields):
+        self.pins.analog_write(self.value(fields['text_field1']), self.value(fields['text_field2']))
+
+    def exec_serial_read(self, block, fields):
+        self.assign(fields['text_field'], self.serial.read())
+
+    def exec_serial_write(self, block, fields):
+        self.serial.print(self.value(fields['text_field']))
+
+    def exec_array(self, block, fields):
+        ctype = C_TYPES[fields['combo_box']]
+        self.ctypes[-1][fields['text_field1']] = ctype
+        self.scopes[-1][fields['text_field1']] = [convert(ctype, 0)] * int(fields['text_field2'])
+
+    def exec_array_get(self, block, fields):
+        array, _ = self.array(fields['text_field2'])
+        self.assign(fields['text_field1'], array[self.element_index(array, fields['text_field3'])])
+
+    def exec_array_set(self, block, fields):
+        array, ctype = self.array(fields['text_field1'])
+        array[self.element_index(array, fields['text_field2'])] = convert(ctype, self.value(fields['text_field3']))
+
+    def exec_sample(self, block, fields):
+        array, ctype = self.array(fields['text_field1'])
+        pin = self.value(fields['text_field2'])
+        rate = self.value(fields['text_field3'])
+        # Частота из переменной проверяется только здесь: анализатор видит лишь литералы
+        if rate <= 0:
+            raise SimulationError(f"Частота оцифровки должна быть больше нуля, а не {rate}")
+        period_ms = 1000 / rate
+        for index in range(len(array)):
+            self.step()
+            # Первый отсчёт берётся сразу, следующие - через период
+            if index:
+                self.advance(period_ms)
+            array[index] = convert(ctype, self.pins.analog_read(pin))
+
+    def exec_every(self, block, fields):
+        now = self.clock.now_ms
+        # Первый запуск сразу, как static-переменная в скетче
+        due = self.task_due.setdefault(block, now)
+        if now >= due:
+            self.task_due[block] = due + self.value(fields['text_field2'])
+            self.exec_body(block)
+
+    def exec_timer(self, block, fields):
+        period_ms = int(fields['text_field2']) / 1000
+        self.timers.append([self.clock.now_ms + period_ms, period_ms, block])
+
+    def poll_line(self):
+        """Дочитать строку из порта без ожидания, как serial_poll_line() в скетче; None - строки ещё нет."""
+        while self.serial.available() > 0:
+            byte = self.serial.read()
+            if byte in b'\r\n':
+                if not self.line_buffer:
+                    continue
+                line = self.line_buffer.decode('ascii', errors='replace')
+                self.line_buffer = bytearray()
+                return line
+            if len(self.line_buffer) < SERIAL_LINE_LENGTH:
+                self.line_buffer.append(byte)
+        return None
+
+    def exec_line_input(self, block, fields):
+        line = self.poll_line()
+        if line is not None:
+            self.assign(fields['text_field2'], line)
+            self.exec_body(block)
+
+    def exec_number_input(self, block, fields):
+        line = self.poll_line()
+        match = NUMBER_PREFIX.match(line) if line is not None else None
+        if match is not None:
+            name = fields['text_field2']
+            number = float(match.group())
+            depth = self.lookup(name)
+            if self.ctypes[depth][name] is None and isinstance(self.scopes[depth][name], int):
+                # (T)number в скетче: для целой переменной "авто" дробная часть отбрасывается
+                number = int(number)
+            self.assign(name, number)
+            self.exec_body(block)
+
+    def exec_bulk_write(self, block, fields):
+        array, ctype = self.array(fields['text_field'])
+        self.serial.write_raw(struct.pack(f"<{len(array)}{PACK_FORMATS[ctype.name]}", *array))
+
+    def exec_function(self, block, fields):
+        # Тело выполняется только при вызове
+        self.functions[fields['text_field']] = block
+
+    def exec_return(self, block, fields):
+        raise FunctionReturn(self.value(fields['text_field']) if fields['text_field'] else None)
+
+    def exec_call(self, block, fields):
+        function = self.functions[fields['text_field']]
+        definition = function.fields()
+        values = [self.value(text) for text in split_list(fields['text_field1'])]
+        scope = {}
+        ctypes = {}
+        for text, value in zip(split_list(definition['text_field1']), values):
+            type_name, name = parse_parameter(text)
+            ctypes[name] = C_TYPES[type_name]
+            scope[name] = convert(ctypes[name], value)
+        if self.call_depth >= MAX_CALL_DEPTH:
+            raise SimulationError(f"Больше {MAX_CALL_DEPTH} вложенных вызовов: возможно, бесконечная рекурсия")
+        # Как и в скетче, функции видны только глобальные переменные и её параметры
+        scopes, saved_ctypes = self.scopes, self.ctypes
+        self.scopes, self.ctypes = scopes[:1] + [scope], saved_ctypes[:1] + [ctypes]
+        self.call_depth += 1
+        result = None
+        try:
+            if function.child_blocks:
+                self.exec_chain(function.child_blocks[0])
+        except FunctionReturn as returned:
+            result = returned.value
+        finally:
+            self.scopes, self.ctypes = scopes, saved_ctypes
+            self.call_depth -= 1
+        result_ctype = C_TYPES.get(definition.get('combo_box', ''))
+        if fields['text_field2'] and result_ctype is not None:
+            # Без "Вернуть" в конце результат не определён; в симуляторе - ноль
+            self.assign(fields['text_field2'], convert(result_ctype, result if result is not None else 0))
+
+
+def simulate(start_block, speed=0, max_steps=1000000):
+    """Выполнить программу на виртуальных часах и вернуть симулятор с результатами."""
+    return Simulator(start_block, clock=VirtualClock(speed), max_steps=max_steps).run()
@@ -0,0 +1,70 @@
+from .analyzer import constant_value, enclosing, find_constants
+from .boards import DEFAULT_BOARD
+from .validation import BOOL, FLOAT, INT, STRING
+
+# Типы C++, которые выводит auto для переменных с типом "авто"
+CPP_TYPES = {INT: 'int', FLOAT: 'double', BOOL: 'bool', STRING: 'const char*'}
+
+
+class Sketch:
+    """
+    Части генерируемого скетча Arduino.
+
+    Блоки при генерации кода добавляют сюда то, что должно оказаться вне
+    setup(): глобальные переменные, вспомогательные функции, тело loop().
+    render() собирает из частей итоговый текст .ino.
+    """
+
+    def __init__(self, analysis=None, board=DEFAULT_BOARD, fast_io=False):
+        self.analysis = analysis
+        self.board = board
+        # Быстрый ввод-вывод: цифровые пины с известным номером - через регистры порта
+        self.fast_io = fast_io
+        self.constants = None
+        # Есть блок "Цикл программы", "Таймер" или "Функция": переменные верхнего уровня должны быть видны
+        # из loop(), обработчиков прерываний и функций
+        self.hoist_globals = analysis is not None and (analysis.program_loop is not None or bool(analysis.timers)
+                                                       or bool(analysis.functions))
+        self.shared = None
+        self.globals = []
+        self.helpers = {}  # ключ -> текст функции, чтобы каждая попадала в скетч один раз
+        self.setup_prologue = []
+        self.setup_code = ''
+        self.loop_code = ''
+
+    def add_global(self, line):
+        if line not in self.globals:
+            self.globals.append(line)
+
+    def add_helper(self, key, code):
+        self.helpers.setdefault(key, code)
+
+    def cpp_type(self, block):
+        """Тип C++ переменной, которую объявляет блок, по результатам анализа."""
+        symbol = self.analysis[block].declares
+        type = symbol.ctype.name if symbol.ctype is not None else CPP_TYPES[symbol.type]
+        return 'volatile ' + type if self.is_shared(block) else type
+
+    def is_shared(self, block):
+        """Используется ли переменная, объявленная блоком, в обработчике прерывания."""
+        if self.shared is None:
+            self.shared = {symbol.block for info in self.analysis.blocks.values()
+                           if enclosing(info, 'Таймер') is not None for symbol in info.uses.values()}
+        return block in self.shared
+
+    def constant(self, block, field):
+        """Значение поля блока, известное до запуска программы, или None."""
+        if self.analysis is None or block not in self.analysis:
+            return None
+        if self.constants is None:
+            self.constants = find_constants(self.analysis)
+        return constant_value(self.analysis[block], field, self.constants)
+
+    def render(self):
+        parts = []
+        if self.globals:
+            parts.append('\n'.join(self.globals) + '\n')
+        parts.extend(code if code.endswith('\n') else code + '\n' for code in self.helpers.values())
+        parts.append('void setup(){\n' + ''.join(line + '\n' for line in self.setup_prologue) + self.setup_code + '}\n')
+        parts.append('void loop(){\n' + self.loop_code + '}\n')
+        return ''.join(parts)
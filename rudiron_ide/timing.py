@@ -0,0 +1,255 @@
+from .analyzer import Analyzer, constant_value, find_constants
+from .boards import DEFAULT_BOARD
+from .validation import FLOAT, STRING, is_string, is_valid_integer
+
+# Скорость последовательного порта, с которой стартует сгенерированный скетч
+BAUD_RATE = 9600
+
+# Оценочная стоимость операций на MDR32F9Qx (Cortex-M3, 80 МГц), в микросекундах.
+# digitalRead/digitalWrite идут через таблицу пинов ядра Arduino, analogRead ждёт
+# окончания преобразования АЦП. Это порядок величин, а не точные такты.
+OP_COSTS_US = {
+    'digitalRead': 2.0,
+    'digitalWrite': 2.5,
+    'port_read': 0.05,  # быстрый режим: чтение регистра порта
+    'port_write': 0.1,  # быстрый режим: чтение-изменение-запись регистра порта
+    'analogRead': 15.0,
+    'analogWrite': 5.0,
+    'Serial.read': 1.0,
+    'Serial.print': 3.0,  # накладные расходы вызова, без передачи символов
+    'Serial.write': 3.0,  # то же для отправки буфера байтов
+    'delay': 1.0,  # накладные расходы вызова, без самой паузы
+    'assign': 0.05,
+    'arithmetic': 0.1,
+    'divide': 0.2,  # деление на Cortex-M3 занимает до 12 тактов
+    'float_arithmetic': 1.5,  # у Cortex-M3 нет FPU: float считается программно
+    'compare': 0.05,
+    'loop': 0.1,  # инкремент счётчика и переход на каждой итерации
+    'index': 0.05,  # вычисление адреса элемента массива
+    'millis': 0.2,  # чтение счётчика миллисекунд для "Каждые"
+    'timer_setup': 1.0,  # настройка регистров таймера
+    'interrupt': 0.5,  # вход в обработчик прерывания и выход из него
+    'call': 0.2,  # вызов функции и возврат, без её тела
+}
+
+# Длина числа в символах, если значение переменной неизвестно заранее
+UNKNOWN_PRINT_WIDTH = 6
+
+
+class BlockCost:
+    """Оценка времени одного блока за проход программы."""
+
+    def __init__(self, block, own_us, count):
+        self.block = block
+        self.own_us = own_us  # одно выполнение самого блока, без тела
+        self.count = count  # сколько раз блок выполняется за проход
+        self.iterations = None  # для циклов: итераций на одно выполнение (None - неизвестно)
+        self.inclusive_us = 0.0  # всё время блока вместе с телом за проход
+        self.share = 0.0  # доля inclusive_us от общего времени
+
+    @property
+    def total_us(self):
+        return self.own_us * self.count
+
+
+class TimingReport:
+    def __init__(self):
+        self.blocks = {}  # блок -> BlockCost, в порядке обхода
+        self.total_us = 0.0
+        self.exact = True  # False, если число итераций какого-то цикла или глубина рекурсии неизвестны
+        self.per_loop_iteration = False  # True, если в программе есть "Цикл программы"
+        self.interrupt_load = {}  # блок "Таймер" -> доля времени процессора в его прерывании
+
+    def __getitem__(self, block):
+        return self.blocks[block]
+
+    def hottest(self, limit=5):
+        """Самые дорогие простые блоки (без учёта вложенности)."""
+        return sorted(self.blocks.values(), key=lambda cost: cost.total_us, reverse=True)[:limit]
+
+
+class TimingEstimator:
+    """
+    Статическая оценка времени выполнения программы из блоков.
+
+    Считает стоимость каждого блока по таблице OP_COSTS_US, умножая на число
+    повторов объемлющих циклов. Для "Повтор" число итераций берётся из
+    литерала или из переменной, которой присвоено число и которая больше не
+    меняется. Для "Цикл" и циклов с неизвестной границей считается одна
+    итерация, то есть оценка получается за итерацию.
+    """
+
+    def __init__(self, baud=BAUD_RATE, costs=None, fast_io=False, board=DEFAULT_BOARD):
+        self.baud = baud
+        self.fast_io = fast_io
+        self.board = board
+        self.costs = dict(OP_COSTS_US, **(costs or {}))
+        self.analysis = None
+        self.constants = {}
+        self.report = None
+        self.function_us = {}  # блок "Функция" -> время одного выполнения её тела
+
+    def estimate(self, start_block):
+        self.analysis = Analyzer().run(start_block)
+        self.constants = find_constants(self.analysis)
+        self.report = TimingReport()
+        self.function_us = {}
+        self.report.total_us = self.estimate_chain(start_block, 1)
+        for cost in self.report.blocks.values():
+            cost.share = cost.inclusive_us / self.report.total_us if self.report.total_us else 0.0
+        return self.report
+
+    def constant_value(self, info, field):
+        return constant_value(info, field, self.constants)
+
+    def estimate_chain(self, block, count):
+        total = 0.0
+        while block is not None:
+            total += self.estimate_block(block, count)
+            block = block.next_block
+        return total
+
+    def estimate_block(self, block, count):
+        info = self.analysis.blocks.get(block)
+        cost = BlockCost(block, self.own_cost(info) if info is not None else 0.0, count)
+        self.report.blocks[block] = cost
+        body_us = 0.0
+        child_blocks = getattr(block, 'child_blocks', [])
+        if block.text == 'Повтор':
+            iterations = self.constant_value(info, 'text_field2') if info is not None else None
+            if iterations is None:
+                self.report.exact = False
+                iterations = 1
+            cost.iterations = max(0, iterations)
+            cost.own_us += self.costs['loop'] * cost.iterations
+        elif block.text == 'Цикл':
+            self.report.exact = False
+            cost.iterations = 1
+        elif block.text == 'Цикл программы':
+            # loop() повторяется бесконечно: тело оцениваем за одну итерацию
+            self.report.per_loop_iteration = True
+            cost.iterations = 1
+        else:
+            # "Каждые" оцениваем за один запуск задачи
+            cost.iterations = 1
+        if child_blocks:
+            body_us = self.estimate_chain(child_blocks[0], count * cost.iterations)
+        if block.text == 'Таймер':
+            # Тело выполняется в прерывании, а не в основной программе
+            period = self.constant_value(info, 'text_field2') if info is not None else None
+            if period:
+                self.report.interrupt_load[block] = (self.costs['interrupt'] + body_us) / period
+            body_us = 0.0
+        if block.text == 'Функция':
+            # Тело выполняется при вызове и учитывается в стоимости блоков "Вызов"
+            self.function_us[block] = body_us
+            body_us = 0.0
+        cost.inclusive_us = cost.total_us + body_us
+        return cost.inclusive_us
+
+    def print_us(self, info):
+        text = info.fields.get('text_field', '')
+        if is_string(text):
+            chars = len(text) - 2
+        elif is_valid_integer(text):
+            chars = len(text)
+        else:
+            value = self.constant_value(info, 'text_field')
+            symbol = info.uses.get('text_field')
+            if value is not None:
+                chars = len(str(value))
+            elif symbol is not None and symbol.type == STRING and symbol.block in self.analysis:
+                chars = max(0, len(self.analysis[symbol.block].fields.get('text_field2', '')) - 2)
+            else:
+                chars = UNKNOWN_PRINT_WIDTH
+        return self.costs['Serial.print'] + self.transmit_us(chars)
+
+    def transmit_us(self, chars):
+        # 8 бит данных + старт и стоп: 10 бит на символ
+        return chars * 10 / self.baud * 1e6
+
+    def sample_us(self, info, array):
+        # Каждый отсчёт ждёт своего момента, но не может быть чаще, чем успевает analogRead
+        costs = self.costs
+        per_sample = costs['analogRead'] + costs['assign'] + costs['loop']
+        rate = self.constant_value(info, 'text_field3')
+        if not rate or rate <= 0:
+            self.report.exact = False
+            return per_sample * array.size
+        return per_sample + max(1e6 / rate, per_sample) * (array.size - 1)
+
+    def own_cost(self, info):
+        text = info.block.text
+        costs = self.costs
+        if text == 'Переменные':
+            return costs['assign']
+        if text == 'Арифметика':
+            if FLOAT in info.types.values():
+                return costs['float_arithmetic'] + costs['assign']
+            divide = info.fields.get('combo_box') in ('/', '//', '%')
+            return costs['divide' if divide else 'arithmetic'] + costs['assign']
+        if text == 'Сон':
+            value = self.constant_value(info, 'text_field')
+            if value is None:
+                self.report.exact = False
+                value = 0
+            return costs['delay'] + max(0, value) * 1000
+        if text in ('Условие', 'Цикл'):
+            return costs['compare']
+        if text == 'Каждые':
+            return costs['millis'] + costs['compare']
+        if text in ('Пришла строка', 'Пришло число'):
+            # Проверка буфера; разбор строки - только когда она пришла
+            return costs['Serial.read'] + costs['compare']
+        if text == 'Таймер':
+            return costs['timer_setup']
+        if text == 'Вызов':
+            function = info.uses.get('text_field')
+            if function is None:
+                return costs['call']
+            if function.block not in self.function_us:
+                # Рекурсивный вызов: время тела функции ещё считается, глубина рекурсии неизвестна
+                self.report.exact = False
+                return costs['call']
+            return costs['call'] + self.function_us[function.block]
+        if text == 'ЦЧтение':
+            if self.fast_io and self.board.fast_pin(self.constant_value(info, 'text_field2')) is not None:
+                return costs['port_read'] + costs['assign']
+            return costs['digitalRead'] + costs['assign']
+        if text == 'АЧтение':
+            return costs['analogRead'] + costs['assign']
+        if text == 'ЦЗапись':
+            if self.fast_io and self.board.fast_pin(self.constant_value(info, 'text_field')) is not None:
+                return costs['port_write']
+            return costs['digitalWrite']
+        if text == 'АЗапись':
+            return costs['analogWrite']
+        if text == 'Слушай':
+            return costs['Serial.read'] + costs['assign']
+        if text == 'Говори':
+            return self.print_us(info)
+        if text == 'Массив':
+            return costs['assign'] * info.declares.size if info.declares is not None else 0.0
+        if text in ('Из массива', 'В массив'):
+            return costs['index'] + costs['assign']
+        array = info.uses.get('text_field1' if text == 'Оцифровка' else 'text_field')
+        if array is None or array.size is None:
+            return 0.0
+        if text == 'Оцифровка':
+            return self.sample_us(info, array)
+        if text == 'Отправить массив':
+            return costs['Serial.write'] + self.transmit_us(array.size * array.ctype.size)
+        return 0.0
+
+
+def estimate_timing(start_block, baud=BAUD_RATE, fast_io=False):
+    """Оценить время одного прохода программы, начиная с блока "Начало"."""
+    return TimingEstimator(baud, fast_io=fast_io).estimate(start_block)
+
+
+def format_duration(us):
+    if us >= 1e6:
+        return f"{us / 1e6:.2f} с"
+    if us >= 1e3:
+        return f"{us / 1e3:.2f} мс"
+    return f"{us:.1f} мкс"
@@ -0,0 +1,84 @@
+"""
+Сохранение скетча, прошивка платы через arduino-cli и сброс платы.
+
+    arduino-cli compile --fqbn Rudiron:MDR32F9Qx:buterbrodR916 sketch/sketch.ino
+    arduino-cli upload -p COM3 --fqbn Rudiron:MDR32F9Qx:buterbrodR916 --verbose sketch/sketch.ino
+"""
+import os
+import subprocess
+import time
+
+from .boards import DEFAULT_BOARD
+
+# Куда среда сохраняет скетч перед прошивкой
+SKETCH_DIR = 'temp'
+SKETCH_NAME = 'temp'
+
+
+def write_sketch(text, directory=SKETCH_DIR, name=SKETCH_NAME):
+    """Сохранить скетч как directory/name/name.ino (arduino-cli требует папку с именем скетча)."""
+    folder = os.path.join(directory, name)
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.abspath(os.path.join(folder, name + '.ino'))
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(text)
+    return path
+
+
+def upload_to_board(port, sketch_path=None):
+    if sketch_path is None:
+        sketch_path = os.path.abspath(os.path.join(SKETCH_DIR, SKETCH_NAME, SKETCH_NAME + '.ino'))
+    print(sketch_path)
+    fqbn = DEFAULT_BOARD.fqbn
+
+    print("Compiling the sketch...")
+    compile_command = ['arduino-cli', 'compile', '--fqbn', fqbn, sketch_path]
+    compile_process = subprocess.run(
+        compile_command, capture_output=True, text=True, encoding='utf-8'
+    )
+
+    if compile_process.returncode != 0:
+        print("Compilation failed:")
+        print(compile_process.stderr)
+        return 0
+    else:
+        print("Compilation successful.")
+
+    print("Uploading the sketch...")
+    upload_command = [
+        'arduino-cli', 'upload', '-p', port, '--fqbn', fqbn, '--verbose', sketch_path
+    ]
+    upload_process = subprocess.run(
+        upload_command, capture_output=True, text=True, encoding='utf-8'
+    )
+
+    if upload_process.returncode != 0:
+        print("Upload failed:")
+        print(upload_process.stderr)
+        return 0
+    else:
+        print("Upload successful.")
+        return 1
+
+
+def reset_arduino(port, baudrate=9600, reset_time=2):
+    """
+    Перезапуск Arduino через последовательный порт.
+
+    :param port: COM-порт, к которому подключена Arduino (например, "COM3").
+    :param baudrate: Скорость порта (по умолчанию 9600).
+    :param reset_time: Время задержки для завершения перезапуска (в секундах).
+    """
+    import serial
+
+    try:
+        # Открываем последовательный порт
+        with serial.Serial(port, baudrate, timeout=1) as ser:
+            # Программный сброс через DTR
+            ser.dtr = False
+            time.sleep(10)  # Небольшая задержка
+            ser.dtr = True
+            time.sleep(reset_time)  # Время на перезапуск Arduino
+            print(f"Arduino на порту {port} успешно перезагружена.")
+    except serial.SerialException as e:
+        print(f"Ошибка работы с последовательным портом: {e}")
@@ -0,0 +1,167 @@
+import re
+import sys
+from functools import lru_cache
+
+# PINS = list(range(0, 18)) + list(range(20, 27)) + list(range(28, 36))
+PINS = list(range(0, 36))
+
+INT = "int"
+STRING = "string"
+FLOAT = "float"
+BOOL = "bool"
+ARRAY = "array"
+FUNCTION = "function"
+
+
+class CType:
+    """Тип C++, который можно выбрать в блоке "Переменные"."""
+
+    def __init__(self, name, kind, size, min=None, max=None):
+        self.name = name
+        self.kind = kind  # INT, FLOAT, BOOL или STRING - для проверки совместимости
+        self.size = size  # байт ОЗУ на контроллере
+        self.min = min
+        self.max = max
+
+    def fits(self, value):
+        return self.min is None or self.min <= value <= self.max
+
+
+# "авто" - тип выводится из значения, как раньше: int или const char*
+AUTO_TYPE = "авто"
+C_TYPES = {ctype.name: ctype for ctype in (
+    CType('uint8_t', INT, 1, 0, 2 ** 8 - 1),
+    CType('int16_t', INT, 2, -2 ** 15, 2 ** 15 - 1),
+    CType('int32_t', INT, 4, -2 ** 31, 2 ** 31 - 1),
+    CType('float', FLOAT, 4),
+    CType('bool', BOOL, 1, 0, 1),
+    CType('String', STRING, 6),  # сам объект; текст лежит в куче
+)}
+VARIABLE_TYPES = [AUTO_TYPE] + list(C_TYPES)
+# Типы элементов массива; первый - по умолчанию, в него помещается результат analogRead
+ARRAY_TYPES = ['int16_t', 'uint8_t', 'int32_t', 'float']
+
+# Тип результата функции; "нет" - функция ничего не возвращает (void)
+NO_RESULT = "нет"
+RESULT_TYPES = [NO_RESULT] + list(C_TYPES)
+# Тип параметра функции, если в списке указано только имя
+DEFAULT_PARAMETER_TYPE = 'int32_t'
+
+# Числовые типы можно смешивать в арифметике и сравнениях
+NUMERIC = frozenset((INT, FLOAT, BOOL))
+
+# Список ключевых слов C++ (строки интернированы, набор неизменяемый)
+cpp_keywords = frozenset(sys.intern(keyword) for keyword in (
+    "alignas", "alignof", "and", "and_eq", "asm", "atomic_cancel", "atomic_commit",
+    "atomic_noexcept", "auto", "bitand", "bitor", "bool", "break", "case", "catch",
+    "char", "char8_t", "char16_t", "char32_t", "class", "compl", "concept", "const",
+    "constexpr", "const_cast", "continue", "co_await", "co_return", "co_yield",
+    "decltype", "default", "delete", "do", "double", "dynamic_cast", "else", "enum",
+    "explicit", "export", "extern", "false", "float", "for", "friend", "goto", "if",
+    "inline", "int", "long", "mutable", "namespace", "new", "noexcept", "not",
+    "not_eq", "nullptr", "operator", "or", "or_eq", "private", "protected", "public",
+    "register", "reinterpret_cast", "requires", "return", "short", "signed", "sizeof",
+    "static", "static_assert", "static_cast", "struct", "switch", "synchronized",
+    "template", "this", "thread_local", "throw", "true", "try", "typedef", "typeid",
+    "typename", "union", "unsigned", "using", "virtual", "void", "volatile",
+    "wchar_t", "while", "xor", "xor_eq"
+))
+
+# Регулярные выражения компилируются один раз при импорте.
+# fullmatch вместо '^...$': '$' допускает завершающий перевод строки.
+ASCII_PATTERN = re.compile(r'[\x20-\x7E]*')
+INTEGER_PATTERN = re.compile(r'[+-]?[0-9]+')
+FLOAT_PATTERN = re.compile(r'[+-]?([0-9]+\.[0-9]*|\.[0-9]+)')
+BOOL_LITERALS = frozenset(('true', 'false'))
+STRING_PATTERN = re.compile(r'"[\x20-\x7E]*"')
+IDENTIFIER_PATTERN = re.compile(r'[a-zA-Z_]\w*', re.ASCII)
+LOOP_COUNTER_PATTERN = re.compile(r'i[0-9]+')  # имена счётчиков, которые генерирует блок "Повтор"
+
+# Размер кэша вердиктов: значения полей в программе повторяются (имена переменных, пины)
+CACHE_SIZE = 4096
+
+
+def is_valid_analog_pin(pin):
+    return 0 <= pin <= 35
+
+
+def is_valid_digital_pin(pin):
+    return 21 <= pin <= 25
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def is_string(value):
+    return STRING_PATTERN.fullmatch(value) is not None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def is_ascii_string(s):
+    return ASCII_PATTERN.fullmatch(s) is not None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def is_valid_integer(value):
+    return INTEGER_PATTERN.fullmatch(value) is not None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def is_float(value):
+    return FLOAT_PATTERN.fullmatch(value) is not None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def is_valid_cpp_variable_name(name):
+    # Проверяем, что имя не является ключевым словом C++ или счётчиком цикла
+    if name in cpp_keywords or LOOP_COUNTER_PATTERN.fullmatch(name):
+        return False
+    # Проверяем формат имени переменной
+    return IDENTIFIER_PATTERN.fullmatch(name) is not None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def literal_type(value):
+    """Тип литерала: INT, FLOAT, BOOL, STRING или None, если значение не литерал."""
+    if is_valid_integer(value):
+        return INT
+    if is_float(value):
+        return FLOAT
+    if value in BOOL_LITERALS:
+        return BOOL
+    if is_string(value):
+        return STRING
+    return None
+
+
+def split_list(text):
+    """Элементы списка через запятую (параметры функции, аргументы вызова); пустая строка - пустой список."""
+    if not text.strip():
+        return []
+    return [part.strip() for part in text.split(',')]
+
+
+def parse_parameter(text):
+    """Тип и имя параметра функции из записи "тип имя" или "имя"; (None, text), если запись не разобрать."""
+    parts = text.split()
+    if len(parts) == 1:
+        return DEFAULT_PARAMETER_TYPE, parts[0]
+    if len(parts) == 2:
+        return parts[0], parts[1]
+    return None, text
+
+
+def validate_names(names):
+    """Проверить сразу много имён переменных; каждое уникальное имя проверяется один раз."""
+    verdicts = {name: is_valid_cpp_variable_name(name) for name in set(names)}
+    return [verdicts[name] for name in names]
+
+
+def validate_literals(values):
+    """Определить типы сразу многих литералов (INT, FLOAT, BOOL, STRING или None, как literal_type)."""
+    verdicts = {value: literal_type(value) for value in set(values)}
+    return [verdicts[value] for value in values]
+
+
+def clear_caches():
+    for predicate in (is_string, is_ascii_string, is_valid_integer, is_float, is_valid_cpp_variable_name,
+                      literal_type):
+        predicate.cache_clear()
@@ -0,0 +1,101 @@
+"""
+Инкрементальная проверка (Analyzer.update_blocks) должна давать те же
+ошибки, что и полный проход анализатора по той же программе.
+
+Запуск: python -m pytest tests или python -m unittest discover tests
+"""
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rudiron_ide.analyzer import ERROR, Analyzer  # noqa: E402
+from rudiron_ide.program import chain_from_data  # noqa: E402
+
+NAMES = ['x', 'y', 'n', 'f', 'g']
+VALUES = NAMES + ['0', '5', '300', '"a"', '1.5']
+TYPES = ['авто', 'uint8_t', 'int32_t', 'String']
+RESULT_TYPES = ['нет', 'int32_t']
+
+
+def random_fields(rng, text):
+    if text == 'Переменные':
+        return {'combo_box': rng.choice(TYPES), 'text_field1': rng.choice(NAMES), 'text_field2': rng.choice(VALUES)}
+    if text == 'Арифметика':
+        return {'text_field1': rng.choice(NAMES), 'text_field2': rng.choice(VALUES), 'combo_box': '+',
+                'text_field3': rng.choice(VALUES)}
+    if text == 'Говори':
+        return {'text_field': rng.choice(VALUES)}
+    if text == 'Условие':
+        return {'text_field': rng.choice(VALUES), 'combo_box': '>', 'text_field2': rng.choice(VALUES)}
+    if text == 'Функция':
+        return {'combo_box': rng.choice(RESULT_TYPES), 'text_field': rng.choice(NAMES),
+                'text_field1': rng.choice(['', 'int32_t n', 'int32_t n, int32_t y'])}
+    if text == 'Вызов':
+        return {'text_field': rng.choice(NAMES), 'text_field1': rng.choice(['', 'n', 'x, 1']),
+                'text_field2': rng.choice(['', 'x', 'n'])}
+    if text == 'Вернуть':
+        return {'text_field': rng.choice(['', 'n', 'x'])}
+    return {}
+
+
+def random_chain(rng, depth=0):
+    chain = []
+    for _ in range(rng.randint(1, 4)):
+        text = rng.choice(['Переменные', 'Переменные', 'Арифметика', 'Говори', 'Вызов', 'Вернуть', 'Условие', 'Функция'])
+        item = {'text': text, 'fields': random_fields(rng, text)}
+        if text in ('Условие', 'Функция') and depth < 2:
+            item['body'] = random_chain(rng, depth + 1)
+        chain.append(item)
+    return chain
+
+
+def program_blocks(block):
+    while block is not None:
+        yield block
+        if block.child_blocks:
+            yield from program_blocks(block.child_blocks[0])
+        block = block.next_block
+
+
+def messages(analysis, blocks):
+    return [(index, diagnostic.field, diagnostic.message)
+            for index, block in enumerate(blocks) for diagnostic in analysis[block].diagnostics]
+
+
+class IncrementalAnalysisTest(unittest.TestCase):
+    def assert_same_as_full(self, start, analyzer):
+        blocks = list(program_blocks(start))
+        self.assertEqual(messages(analyzer.analysis, blocks), messages(Analyzer().run(start), blocks))
+
+    def test_recursive_call_in_function_body(self):
+        start = chain_from_data([
+            {'text': 'Начало', 'fields': {}},
+            {'text': 'Функция', 'fields': {'combo_box': 'нет', 'text_field': 'f', 'text_field1': 'int32_t n'},
+             'body': [{'text': 'Вызов', 'fields': {'text_field': 'f', 'text_field1': 'n', 'text_field2': ''}}]}])
+        analyzer = Analyzer()
+        analyzer.run(start)
+        call = start.next_block.child_blocks[0]
+        call.field_values['text_field1'] = 'n'
+        analyzer.update_blocks([call])
+        self.assertEqual([d.message for d in analyzer.analysis.diagnostics if d.severity == ERROR], [])
+        self.assert_same_as_full(start, analyzer)
+
+    def test_random_edits(self):
+        rng = random.Random(45)
+        for _ in range(300):
+            start = chain_from_data([{'text': 'Начало', 'fields': {}}] + random_chain(rng))
+            analyzer = Analyzer()
+            analyzer.run(start)
+            blocks = list(program_blocks(start))[1:]
+            for _ in range(4):
+                block = rng.choice(blocks)
+                block.field_values = random_fields(rng, block.text)
+                analyzer.update_blocks([block])
+                self.assert_same_as_full(start, analyzer)
+
+
+if __name__ == '__main__':
+    unittest.main()
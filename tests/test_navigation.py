@@ -0,0 +1,62 @@
+"""
+Переименование с учётом областей видимости (navigation.plan_rename).
+
+Запуск: python -m pytest tests или python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rudiron_ide.navigation import RenameError, plan_rename  # noqa: E402
+from rudiron_ide.program import chain_from_data  # noqa: E402
+
+
+def two_functions():
+    return chain_from_data([
+        {'text': 'Начало', 'fields': {}},
+        {'text': 'Функция', 'fields': {'combo_box': 'нет', 'text_field': 'f', 'text_field1': 'int32_t x'},
+         'body': [{'text': 'Говори', 'fields': {'text_field': 'x'}}]},
+        {'text': 'Функция', 'fields': {'combo_box': 'нет', 'text_field': 'g', 'text_field1': 'int32_t x, int32_t y'},
+         'body': [{'text': 'Говори', 'fields': {'text_field': 'x'}}]},
+        {'text': 'Вызов', 'fields': {'text_field': 'f', 'text_field1': '1', 'text_field2': ''}}])
+
+
+def renamed(edits):
+    return sorted((block.text, field, old, new) for block, field, old, new in edits)
+
+
+class RenameTest(unittest.TestCase):
+    def test_parameter_of_one_function(self):
+        start = two_functions()
+        f = start.next_block
+        g = f.next_block
+        edits = plan_rename(start, f.child_blocks[0], 'x', 'a')
+        self.assertEqual(renamed(edits), [('Говори', 'text_field', 'x', 'a'),
+                                          ('Функция', 'text_field1', 'int32_t x', 'int32_t a')])
+        self.assertTrue(all(block in (f, f.child_blocks[0]) for block, _, _, _ in edits))
+        # Тот же параметр другой функции переименовывается отдельно
+        edits = plan_rename(start, g, 'x', 'b')
+        self.assertEqual(renamed(edits), [('Говори', 'text_field', 'x', 'b'),
+                                          ('Функция', 'text_field1', 'int32_t x, int32_t y', 'int32_t b, int32_t y')])
+
+    def test_clash_in_scope(self):
+        start = two_functions()
+        g = start.next_block.next_block
+        with self.assertRaises(RenameError):
+            plan_rename(start, g, 'x', 'y')
+        # В функции f имени y нет, поэтому там переименование возможно
+        self.assertEqual(len(plan_rename(start, start.next_block, 'x', 'y')), 2)
+
+    def test_function_name(self):
+        start = two_functions()
+        call = start.next_block.next_block.next_block
+        self.assertEqual(renamed(plan_rename(start, call, 'f', 'h')),
+                         [('Вызов', 'text_field', 'f', 'h'), ('Функция', 'text_field', 'f', 'h')])
+        with self.assertRaises(RenameError):
+            plan_rename(start, call, 'f', 'g')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+"""
+Ошибки, которые видны только при выполнении программы в симуляторе.
+
+Запуск: python -m pytest tests или python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rudiron_ide.analyzer import analyze_program  # noqa: E402
+from rudiron_ide.program import chain_from_data  # noqa: E402
+from rudiron_ide.simulator import SimulationError, Simulator  # noqa: E402
+
+
+def sample_program(rate):
+    return chain_from_data([
+        {'text': 'Начало', 'fields': {}},
+        {'text': 'Переменные', 'fields': {'combo_box': 'int32_t', 'text_field1': 'rate', 'text_field2': rate}},
+        {'text': 'Массив', 'fields': {'combo_box': 'uint8_t', 'text_field1': 'buf', 'text_field2': '4'}},
+        {'text': 'Оцифровка', 'fields': {'text_field1': 'buf', 'text_field2': '0', 'text_field3': 'rate'}}])
+
+
+class SampleRateTest(unittest.TestCase):
+    def test_zero_rate_from_variable(self):
+        start = sample_program('0')
+        # Анализатор проверяет только литералы: частота из переменной известна лишь при выполнении
+        self.assertTrue(analyze_program(start).ok)
+        with self.assertRaises(SimulationError):
+            Simulator(start).run()
+
+    def test_negative_rate_from_variable(self):
+        with self.assertRaises(SimulationError):
+            Simulator(sample_program('-5')).run()
+
+    def test_positive_rate_from_variable(self):
+        Simulator(sample_program('1000')).run()
+
+
+if __name__ == '__main__':
+    unittest.main()